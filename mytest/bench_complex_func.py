@@ -0,0 +1,301 @@
+"""
+Бенчмарки анализа текста
+Запуск: python bench_complex_func.py [имя_бенчмарка ...] [--sizes 10,100]
+Размеры - объем текста в мегабайтах (миллионах символов)
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from complex_func import (TextStatsAccumulator, analyze_text_statistics, analyze_text_statistics_parallel,
+                          analyze_text_stream)
+
+
+WORDS = ["python", "это", "высокоуровневый", "язык", "программирования", "используется", "для",
+         "веб", "разработки", "анализа", "данных", "и", "машинного", "обучения", "очень", "популярен",
+         "the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "2025", "python3"]
+SEPARATORS = [" ", " ", " ", ", ", " - ", ". ", "! ", "? ", "... ", "!!! ", "?! ", "\n"]
+
+
+def make_text(n_chars: int, seed: int = 42) -> str:
+    """Синтетический текст из n_chars символов: слова в разном регистре и знаки препинания"""
+    rnd = random.Random(seed)
+    words = WORDS + [word.capitalize() for word in WORDS] + [f"слово{i}" for i in range(5000)]
+    parts, size = [], 0
+    while size < n_chars:
+        part = rnd.choice(words) + rnd.choice(SEPARATORS)
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)[:n_chars]
+
+
+def make_zipf_text(n_chars: int, vocabulary: int = 2_000_000, seed: int = 42) -> str:
+    """Текст из n_chars символов с частотами слов по закону Ципфа над большим словарем"""
+    rnd = random.Random(seed)
+    weights = [1 / rank ** 1.1 for rank in range(1, vocabulary + 1)]
+    words = rnd.choices(range(vocabulary), weights, k=n_chars // 8 + 1)
+    return ". ".join(" ".join(f"слово{word}" for word in words[start:start + 12])
+                     for start in range(0, len(words), 12))[:n_chars]
+
+
+def measure(func: Callable, repeat: int = 3) -> float:
+    """Лучшее время выполнения func() за repeat запусков, в секундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def traced_peak(func: Callable) -> tuple:
+    """Результат func() и пиковый объем памяти, выделенной при его выполнении, в байтах"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def write_text_file(path: str, n_chars: int, block_chars: int = 10_000_000) -> None:
+    """Файл из n_chars символов синтетического текста, записанный блоками"""
+    block = make_text(block_chars)
+    with open(path, "w", encoding="utf-8") as file:
+        for start in range(0, n_chars, block_chars):
+            file.write(block[:n_chars - start])
+
+
+def analyze_text_statistics_baseline(text: str, min_word_length: int = 3) -> dict:
+    """Исходная версия analyze_text_statistics: схлопывание знаков циклом replace, сборка слов и
+    предложений посимвольно через +=, отдельные проходы для max, min, sum, частот и уникальных слов"""
+    if not isinstance(text, str):
+        raise TypeError("Текст должен быть строкой")
+    
+    if not text.strip():
+        raise ValueError("Текст не может быть пустым")
+    
+    total_chars = len(text.strip())
+    
+    cleaned_text = text
+    while '!!' in cleaned_text or '??' in cleaned_text or '..' in cleaned_text:
+        cleaned_text = cleaned_text.replace('!!', '!').replace('??', '?').replace('..', '.')
+    
+    sentences = []
+    current_sentence = ""
+    
+    for char in cleaned_text:
+        current_sentence += char
+        if char in '.!?':
+            if current_sentence.strip():
+                sentences.append(current_sentence.strip())
+            current_sentence = ""
+    
+    if current_sentence.strip():
+        sentences.append(current_sentence.strip())
+    
+    sentence_count = len(sentences)
+    
+    words = []
+    current_word = ""
+    for char in text.lower():
+        if char.isalpha() or char.isdigit():
+            current_word += char
+        else:
+            if current_word:
+                words.append(current_word)
+                current_word = ""
+    if current_word:
+        words.append(current_word)
+    
+    if not words:
+        return {
+            "total_characters": total_chars,
+            "total_words": 0,
+            "total_sentences": sentence_count,
+            "longest_word": None,
+            "shortest_word": None,
+            "average_word_length": 0.0,
+            "unique_words_count": 0,
+            "unique_words_percentage": 0.0,
+            "top_3_words": [],
+            "word_frequency": {}
+        }
+    
+    total_words = len(words)
+    longest_word = max(words, key=len)
+    shortest_word = min(words, key=len)
+    total_length = sum(len(word) for word in words)
+    average_length = round(total_length / total_words, 2)
+    
+    word_frequency = {}
+    for word in words:
+        if len(word) >= min_word_length:
+            word_frequency[word] = word_frequency.get(word, 0) + 1
+    
+    sorted_words = sorted(word_frequency.items(), key=lambda x: (-x[1], x[0]))
+    top_3_words = [{"word": word, "count": count} for word, count in sorted_words[:3]]
+    
+    unique_words = set(words)
+    unique_count = len(unique_words)
+    unique_percentage = round((unique_count / total_words) * 100, 2)
+    
+    return {
+        "total_characters": total_chars,
+        "total_words": total_words,
+        "total_sentences": sentence_count,
+        "longest_word": longest_word,
+        "shortest_word": shortest_word,
+        "average_word_length": average_length,
+        "unique_words_count": unique_count,
+        "unique_words_percentage": unique_percentage,
+        "top_3_words": top_3_words,
+        "word_frequency": word_frequency
+    }
+
+
+def bench_onepass(sizes: List[int]) -> None:
+    """Один проход по тексту (split и регулярное выражение на различные куски) против посимвольного разбора"""
+    print(f"{'МБ':>6} {'исходная, с':>12} {'один проход, с':>15} {'ускорение':>10}")
+    for size in sizes:
+        text = make_text(size * 1_000_000)
+        baseline_result = analyze_text_statistics_baseline(text)
+        assert analyze_text_statistics(text) == baseline_result
+        del baseline_result
+        baseline = measure(lambda: analyze_text_statistics_baseline(text), repeat=1)
+        onepass = measure(lambda: analyze_text_statistics(text))
+        print(f"{size:>6} {baseline:>12.2f} {onepass:>15.2f} {baseline / onepass:>9.1f}x")
+
+
+def bench_stream(sizes: List[int]) -> None:
+    """Потоковый анализ файла против чтения всего файла в память"""
+    full_limit = 200
+    print(f"{'МБ':>6} {'read(), с':>10} {'read(), МБ':>11} {'поток, с':>9} {'поток, МБ':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "text.txt")
+            write_text_file(path, size * 1_000_000)
+            
+            def full():
+                with open(path, encoding="utf-8") as file:
+                    return analyze_text_statistics(file.read())
+            
+            def stream():
+                with open(path, encoding="utf-8") as file:
+                    return analyze_text_stream(file)
+            
+            stream_time = measure(stream, repeat=1)
+            stream_result, stream_peak = traced_peak(stream)
+            if size <= full_limit:
+                full_time = measure(full, repeat=1)
+                full_result, full_peak = traced_peak(full)
+                assert stream_result == full_result
+                full_cells = f"{full_time:>10.2f} {full_peak / 1e6:>11.1f}"
+            else:
+                full_cells = f"{'-':>10} {'-':>11}"
+            print(f"{size:>6} {full_cells} {stream_time:>9.2f} {stream_peak / 1e6:>10.1f}")
+
+
+def bench_parallel(sizes: List[int]) -> None:
+    """Масштабирование параллельной версии по числу процессов"""
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, cores})
+    print(f"ядер: {cores}")
+    print(f"{'МБ':>6} {'процессов':>10} {'время, с':>9} {'ускорение':>10}")
+    for size in sizes:
+        text = make_text(size * 1_000_000)
+        expected = analyze_text_statistics(text)
+        serial = measure(lambda: analyze_text_statistics(text), repeat=1)
+        print(f"{size:>6} {'serial':>10} {serial:>9.2f} {1:>9.1f}x")
+        for max_workers in workers:
+            assert analyze_text_statistics_parallel(text, max_workers=max_workers) == expected
+            elapsed = measure(lambda: analyze_text_statistics_parallel(text, max_workers=max_workers), repeat=1)
+            print(f"{size:>6} {max_workers:>10} {elapsed:>9.2f} {serial / elapsed:>9.1f}x")
+
+
+def bench_approximate(sizes: List[int]) -> None:
+    """Точный и приближенный режимы на тексте с большим словарем: память, время и точность"""
+    print(f"{'МБ':>6} {'режим':>8} {'время, с':>9} {'память, МБ':>11} {'уникальных':>11} "
+          f"{'ошибка, %':>10} {'топ-3 совпал':>13}")
+    for size in sizes:
+        text = make_zipf_text(size * 1_000_000)
+        exact, exact_peak = traced_peak(lambda: analyze_text_statistics(text))
+        exact_time = measure(lambda: analyze_text_statistics(text), repeat=1)
+        approximate, approximate_peak = traced_peak(lambda: analyze_text_statistics(text, approximate=True))
+        approximate_time = measure(lambda: analyze_text_statistics(text, approximate=True), repeat=1)
+        
+        unique = exact["unique_words_count"]
+        error = abs(approximate["unique_words_count"] - unique) / unique * 100
+        same_top = ([item["word"] for item in approximate["top_3_words"]]
+                    == [item["word"] for item in exact["top_3_words"]])
+        print(f"{size:>6} {'точный':>8} {exact_time:>9.2f} {exact_peak / 1e6:>11.1f} {unique:>11} "
+              f"{'-':>10} {'-':>13}")
+        print(f"{size:>6} {'прибл.':>8} {approximate_time:>9.2f} {approximate_peak / 1e6:>11.1f} "
+              f"{approximate['unique_words_count']:>11} {error:>10.2f} {str(same_top):>13}")
+
+
+def bench_accumulator(sizes: List[int]) -> None:
+    """Документ, дописываемый абзацами: снимок TextStatsAccumulator против повторного анализа"""
+    print(f"{'абзацев':>8} {'повторный анализ, с':>20} {'накопитель, с':>14} {'последний снимок, мс':>21}")
+    for n in sizes:
+        paragraphs = [make_text(500, seed=i) + "\n" for i in range(n)]
+        
+        def reanalyze():
+            text = ""
+            for paragraph in paragraphs:
+                text += paragraph
+                analyze_text_statistics(text)
+            return analyze_text_statistics(text)
+        
+        def accumulate():
+            accumulator = TextStatsAccumulator()
+            for paragraph in paragraphs:
+                accumulator.feed(paragraph)
+                accumulator.snapshot()
+            return accumulator
+        
+        accumulator = accumulate()
+        assert accumulator.snapshot() == analyze_text_statistics("".join(paragraphs))
+        reanalyze_time = measure(reanalyze, repeat=1)
+        accumulate_time = measure(accumulate, repeat=1)
+        last_snapshot = measure(accumulator.snapshot)
+        print(f"{n:>8} {reanalyze_time:>20.2f} {accumulate_time:>14.2f} {last_snapshot * 1000:>21.2f}")
+
+
+BENCHMARKS: Dict[str, Callable[[List[int]], None]] = {
+    "onepass": bench_onepass,
+    "stream": bench_stream,
+    "parallel": bench_parallel,
+    "approximate": bench_approximate,
+    "accumulator": bench_accumulator,
+}
+
+DEFAULT_SIZES = {
+    "onepass": [10, 100],
+    "stream": [10, 100, 1000],
+    "parallel": [100],
+    "approximate": [10, 50],
+    "accumulator": [500, 2000],
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"бенчмарки из {list(BENCHMARKS)} (по умолчанию все)")
+    parser.add_argument("--sizes", help="размеры данных через запятую")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"неизвестные бенчмарки: {', '.join(sorted(unknown))}")
+    
+    for name in args.names or BENCHMARKS:
+        sizes = ([int(size) for size in args.sizes.split(",")] if args.sizes
+                 else DEFAULT_SIZES[name])
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name](sizes)
@@ -0,0 +1,522 @@
+"""
+Бенчмарки системы управления библиотекой
+Запуск: python bench_library_system.py [имя_бенчмарка ...] [--sizes 10000,100000]
+"""
+
+import argparse
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import library_system
+from library_journal import JournaledLibrary
+from library_sqlite import SQLiteLibrary
+from library_system import (Book, Library, Reader, ReaderHistory,
+                            read_books_csv, read_books_jsonl, write_books_csv, write_books_jsonl)
+
+
+FIRST_NAMES = ["Лев", "Фёдор", "Антон", "Анна", "Марина", "Иван", "Сергей", "Ольга", "John", "Jane"]
+LAST_NAMES = ["Толстой", "Достоевский", "Чехов", "Ахматова", "Цветаева", "Тургенев",
+              "Есенин", "Берггольц", "Smith", "Austen", "Orwell", "Bradbury"]
+TITLE_WORDS = ["война", "мир", "преступление", "наказание", "идиот", "вишнёвый", "сад",
+               "отцы", "дети", "мастер", "маргарита", "остров", "тайна", "дом", "море",
+               "история", "город", "ночь", "путь", "звезда", "garden", "river", "night"]
+
+
+def make_books(n: int, seed: int = 42) -> List[Book]:
+    """Синтетический каталог из n книг"""
+    rnd = random.Random(seed)
+    books = []
+    for i in range(n):
+        author = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}-{i % 5000}"
+        title = " ".join(rnd.choice(TITLE_WORDS) for _ in range(rnd.randint(2, 4))) + f" {i}"
+        books.append(Book(f"978-{i:09d}", title.capitalize(), author, 1900 + i % 120, 1 + i % 3))
+    return books
+
+
+def make_library(n: int) -> Library:
+    """Библиотека с синтетическим каталогом из n книг"""
+    library = Library("Бенчмарк")
+    for book in make_books(n):
+        library.add_book(book)
+    return library
+
+
+class FrozenClock:
+    """Подмена library_system.datetime с управляемым текущим временем"""
+    
+    current = datetime.now()
+    
+    @classmethod
+    def now(cls) -> datetime:
+        return cls.current
+
+
+def make_loans(n_loans: int, overdue_share: float) -> Library:
+    """Библиотека с n_loans займами, часть которых просрочена на текущий момент"""
+    library = make_library(n_loans)
+    for r in range(n_loans // Reader.MAX_BOOKS + 1):
+        library.register_reader(Reader(f"R{r}", f"Читатель {r}", f"r{r}@example.com"))
+    
+    rnd = random.Random(7)
+    start = datetime.now()
+    library_system.datetime = FrozenClock
+    try:
+        for i, isbn in enumerate(library.books):
+            days_ago = 30 if rnd.random() < overdue_share else 0
+            FrozenClock.current = start - timedelta(days=days_ago, minutes=rnd.randrange(1440))
+            library.borrow_book(f"R{i // Reader.MAX_BOOKS}", isbn)
+    finally:
+        library_system.datetime = datetime
+    return library
+
+
+def traced_size(build: Callable) -> tuple:
+    """Результат build() и объем памяти, выделенной при его построении, в байтах"""
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def measure(func: Callable, repeat: int = 5) -> float:
+    """Лучшее время выполнения func() за repeat запусков, в секундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_search(sizes: List[int]) -> None:
+    """Поиск по автору/названию: триграммный индекс против полного перебора"""
+    queries = [("author", "Достоевский-42"), ("author", "чехов"),
+               ("title", "маргарита"), ("title", "сад 12"), ("title", "ор")]
+    
+    def scan(library: Library, field: str, query: str) -> list:
+        query = query.lower()
+        return [book for book in library.books.values()
+                if query in getattr(book, field).lower()]
+    
+    print(f"{'книг':>10} {'поле':>7} {'запрос':>16} {'перебор, мс':>12} {'индекс, мс':>11} {'ускорение':>10}")
+    for n in sizes:
+        start = time.perf_counter()
+        books, books_size = traced_size(lambda: make_books(n))
+        library = Library("Бенчмарк")
+        for book in books:
+            library._load_book(book)
+        _, index_size = traced_size(lambda: library._index_books(books))
+        del books
+        print(f"{n:>10} каталог построен за {time.perf_counter() - start:.1f} с, "
+              f"индексы {index_size / 2 ** 20:.1f} МБ ({index_size / n:.0f} байт/книга, "
+              f"сами книги - {books_size / n:.0f} байт/книга)")
+        for field, query in queries:
+            find = library.find_books_by_author if field == "author" else library.find_books_by_title
+            assert find(query) == scan(library, field, query)
+            scan_time = measure(lambda: scan(library, field, query), repeat=3)
+            index_time = measure(lambda: find(query))
+            print(f"{n:>10} {field:>7} {query:>16} {scan_time * 1000:>12.2f} "
+                  f"{index_time * 1000:>11.3f} {scan_time / index_time:>9.0f}x")
+
+
+def bench_overdue(sizes: List[int]) -> None:
+    """Отчет о просрочках и штрафы читателя: индексы займов против обхода всех займов"""
+    
+    def scan_overdue(library: Library) -> list:
+        now = datetime.now()
+        overdue = [(reader_id, isbn, (now - due).days, library.calculate_fine(due))
+                   for (reader_id, isbn), due in library.active_loans.items() if now > due]
+        return sorted(overdue, key=lambda x: x[2], reverse=True)
+    
+    def scan_fines(library: Library, reader_id: str) -> float:
+        return sum(library.calculate_fine(due) for (rid, _), due in library.active_loans.items()
+                   if rid == reader_id)
+    
+    print(f"{'займов':>10} {'просрочено':>11} {'перебор, мс':>12} {'куча, мс':>9} "
+          f"{'штрафы: перебор, мс':>20} {'индекс, мс':>11}")
+    for n in sizes:
+        library = make_loans(n, overdue_share=0.01)
+        overdue = library.get_overdue_loans()
+        assert overdue == scan_overdue(library)
+        scan_time = measure(lambda: scan_overdue(library), repeat=3)
+        heap_time = measure(library.get_overdue_loans)
+        fines_scan = measure(lambda: scan_fines(library, "R1"), repeat=3)
+        fines_index = measure(lambda: library.get_reader_stats("R1"))
+        print(f"{n:>10} {len(overdue):>11} {scan_time * 1000:>12.2f} {heap_time * 1000:>9.2f} "
+              f"{fines_scan * 1000:>20.2f} {fines_index * 1000:>11.4f}")
+
+
+def make_history(n_events: int, n_books: int = 10_000, n_readers: int = 2_000) -> Library:
+    """Библиотека с историей из n_events выдач (каждая выдача сразу возвращается)"""
+    library = make_library(n_books)
+    for r in range(n_readers):
+        library.register_reader(Reader(f"R{r}", f"Читатель {r}", f"r{r}@example.com"))
+    
+    rnd = random.Random(11)
+    isbns = list(library.books)
+    weights = [1 / (rank + 1) for rank in range(len(isbns))]  # закон Ципфа
+    for isbn in rnd.choices(isbns, weights, k=n_events):
+        reader_id = f"R{rnd.randrange(n_readers)}"
+        if library.borrow_book(reader_id, isbn)[0]:
+            library.return_book(reader_id, isbn)
+    return library
+
+
+def bench_popular(sizes: List[int]) -> None:
+    """Топ популярных книг: счетчики выдач против повторного прохода по истории"""
+    
+    def replay_popular(library: Library, top_n: int) -> list:
+        counts: Dict[str, int] = {}
+        for reader in library.readers.values():
+            for isbn, action, _ in reader.history:
+                if action == 'borrowed':
+                    counts[isbn] = counts.get(isbn, 0) + 1
+        ranking = sorted(((library.books[isbn], count) for isbn, count in counts.items()
+                          if isbn in library.books), key=lambda x: x[1], reverse=True)
+        return ranking[:top_n]
+    
+    print(f"{'событий':>10} {'top_n':>6} {'история, мс':>12} {'счетчики, мс':>13} {'ускорение':>10}")
+    for n in sizes:
+        library = make_history(n)
+        for top_n in (5, 100):
+            expected = [count for _, count in replay_popular(library, top_n)]
+            assert [count for _, count in library.get_popular_books(top_n)] == expected
+            replay_time = measure(lambda: replay_popular(library, top_n), repeat=3)
+            counters_time = measure(lambda: library.get_popular_books(top_n))
+            print(f"{n:>10} {top_n:>6} {replay_time * 1000:>12.2f} {counters_time * 1000:>13.4f} "
+                  f"{replay_time / counters_time:>9.0f}x")
+
+
+def bench_history(sizes: List[int]) -> None:
+    """Журнал читателя: память на событие и подсчет выдач/возвратов"""
+    isbns = [f"978-{i:09d}" for i in range(10_000)]
+    start = datetime(2025, 1, 1)
+    
+    print(f"{'событий':>10} {'список, МБ':>10} {'журнал, МБ':>11} {'байт/событие':>13} "
+          f"{'подсчет: список, мс':>20} {'журнал, мс':>11}")
+    for n in sizes:
+        events = [(isbns[i % len(isbns)], ('borrowed', 'returned')[i % 2],
+                   start + timedelta(seconds=i)) for i in range(n)]
+        as_list, list_size = traced_size(lambda: [(isbn, action, timestamp + timedelta(0))
+                                                  for isbn, action, timestamp in events])
+        history, history_size = traced_size(lambda: ReaderHistory(events))
+        del events
+        
+        def count_list():
+            return (len([h for h in as_list if h[1] == 'borrowed']),
+                    len([h for h in as_list if h[1] == 'returned']))
+        
+        assert count_list() == (history.borrowed_count, history.returned_count)
+        list_time = measure(count_list, repeat=3)
+        history_time = measure(lambda: (history.borrowed_count, history.returned_count))
+        print(f"{n:>10} {list_size / 2 ** 20:>10.1f} {history_size / 2 ** 20:>11.1f} "
+              f"{history_size / n:>13.1f} {list_time * 1000:>20.2f} {history_time * 1000:>11.5f}")
+
+
+def bench_models(sizes: List[int]) -> None:
+    """Загрузка каталога: память и скорость создания книг и читателей (читателей - вдвое меньше)"""
+    print(f"{'книг':>10} {'читателей':>10} {'книги, МБ':>10} {'байт/книга':>11} {'книг/с':>10} "
+          f"{'читатели, МБ':>13} {'байт/читатель':>14} {'читателей/с':>12} {'в Library, с':>13}")
+    for n in sizes:
+        n_readers = n // 2
+        start = time.perf_counter()
+        books, books_size = traced_size(lambda: make_books(n))
+        books_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        readers, readers_size = traced_size(
+            lambda: [Reader(f"R{r:07d}", f"Читатель {r}", f"r{r}@example.com") for r in range(n_readers)])
+        readers_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        library = Library("Бенчмарк")
+        for book in books:
+            library.add_book(book)
+        for reader in readers:
+            library.register_reader(reader)
+        load_time = time.perf_counter() - start
+        
+        print(f"{n:>10} {n_readers:>10} {books_size / 2 ** 20:>10.1f} {books_size / n:>11.0f} "
+              f"{n / books_time:>10.0f} {readers_size / 2 ** 20:>13.1f} {readers_size / n_readers:>14.0f} "
+              f"{n_readers / readers_time:>12.0f} {load_time:>13.1f}")
+        del books, readers, library
+
+
+def bench_threads(sizes: List[int]) -> None:
+    """Выдачи/возвраты из нескольких потоков: одна общая блокировка против полосатых"""
+    n_books, n_readers = 10_000, 2_000
+    
+    def run(library: Library, n_ops: int, n_threads: int, global_lock) -> float:
+        def worker(seed: int) -> None:
+            rnd = random.Random(seed)
+            for _ in range(n_ops // n_threads):
+                reader_id, isbn = f"R{rnd.randrange(n_readers)}", f"978-{rnd.randrange(n_books):09d}"
+                with global_lock:
+                    if not library.borrow_book(reader_id, isbn)[0]:
+                        library.return_book(reader_id, isbn)
+        
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(n_threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+    
+    print(f"{'операций':>10} {'потоков':>8} {'общий lock, оп/с':>17} {'полосы, оп/с':>13}")
+    for n in sizes:
+        for n_threads in (1, 4, 8):
+            results = []
+            for thread_safe, global_lock in ((False, threading.Lock()), (True, _NoLock())):
+                library = Library("Бенчмарк", thread_safe=thread_safe)
+                for book in make_books(n_books):
+                    book.total_copies = book.available_copies = 1_000_000
+                    library.add_book(book)
+                for r in range(n_readers):
+                    library.register_reader(Reader(f"R{r}", f"Читатель {r}", f"r{r}@example.com"))
+                results.append(n / run(library, n, n_threads, global_lock))
+            print(f"{n:>10} {n_threads:>8} {results[0]:>17.0f} {results[1]:>13.0f}")
+
+
+def bench_bulk(sizes: List[int]) -> None:
+    """Загрузка каталога из CSV/JSONL: Book() + add_book против потокового bulk_load_books"""
+    print(f"{'книг':>10} {'формат':>7} {'add_book, с':>12} {'bulk, с':>9} {'ускорение':>10} {'выгрузка, с':>12}")
+    for n in sizes:
+        books = make_books(n)
+        for fmt, write, read in (("csv", write_books_csv, read_books_csv),
+                                 ("jsonl", write_books_jsonl, read_books_jsonl)):
+            buffer = io.StringIO()
+            start = time.perf_counter()
+            write(books, buffer)
+            export_time = time.perf_counter() - start
+            data = buffer.getvalue()
+            
+            def one_by_one() -> Library:
+                library = Library("Бенчмарк")
+                for book in read(io.StringIO(data)):
+                    library.add_book(Book(book.isbn, book.title, book.author, book.year, book.total_copies))
+                return library
+            
+            def bulk() -> Library:
+                library = Library("Бенчмарк")
+                library.bulk_load_books(read(io.StringIO(data)))
+                return library
+            
+            assert list(one_by_one().books) == list(bulk().books)
+            loop_time = measure(one_by_one, repeat=1)
+            bulk_time = measure(bulk, repeat=1)
+            print(f"{n:>10} {fmt:>7} {loop_time:>12.2f} {bulk_time:>9.2f} {loop_time / bulk_time:>9.1f}x "
+                  f"{export_time:>12.2f}")
+        del books
+
+
+def bench_journal(sizes: List[int]) -> None:
+    """Журнал операций: запись и восстановление из журнала, из снимка и из снимка с хвостом 10%"""
+    n_books, n_readers = 10_000, 2_000
+    
+    def fill(library: JournaledLibrary, n_ops: int, seed: int) -> None:
+        # Каждая операция успешна и попадает в журнал: читатель держит до трех книг
+        rnd = random.Random(seed)
+        target = library.lsn + n_ops
+        while library.lsn < target:
+            reader_id = f"R{rnd.randrange(n_readers)}"
+            borrowed = library.readers[reader_id].borrowed_books
+            if len(borrowed) >= 3:
+                library.return_book(reader_id, borrowed[0])
+            else:
+                isbn = f"978-{rnd.randrange(n_books):09d}"
+                if isbn not in borrowed:
+                    library.borrow_book(reader_id, isbn)
+    
+    def recover(directory: str) -> float:
+        start = time.perf_counter()
+        JournaledLibrary("Бенчмарк", directory, snapshot_every=None).close()
+        return time.perf_counter() - start
+    
+    print(f"{'записей':>10} {'запись, оп/с':>13} {'журнал, МБ':>11} {'из журнала, с':>14} "
+          f"{'снимок, с':>10} {'снимок, МБ':>11} {'из снимка, с':>13} {'снимок+10%, с':>14}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            journal_path = os.path.join(directory, JournaledLibrary.JOURNAL_FILE)
+            snapshot_path = os.path.join(directory, JournaledLibrary.SNAPSHOT_FILE)
+            with JournaledLibrary("Бенчмарк", directory, snapshot_every=None) as library:
+                for book in make_books(n_books):
+                    book.total_copies = book.available_copies = 1_000_000
+                    library.add_book(book)
+                for r in range(n_readers):
+                    library.register_reader(Reader(f"R{r}", f"Читатель {r}", f"r{r}@example.com"))
+                start = time.perf_counter()
+                fill(library, n, seed=1)
+                write_time = time.perf_counter() - start
+            journal_size = os.path.getsize(journal_path)
+            journal_time = recover(directory)
+            
+            with JournaledLibrary("Бенчмарк", directory, snapshot_every=None) as library:
+                start = time.perf_counter()
+                library.snapshot()
+                snapshot_time = time.perf_counter() - start
+                snapshot_size = os.path.getsize(snapshot_path)
+                snapshot_only_time = recover(directory)
+                fill(library, n // 10, seed=2)
+            tail_time = recover(directory)
+        
+        print(f"{n:>10} {n / write_time:>13.0f} {journal_size / 2 ** 20:>11.0f} {journal_time:>14.1f} "
+              f"{snapshot_time:>10.1f} {snapshot_size / 2 ** 20:>11.0f} {snapshot_only_time:>13.1f} "
+              f"{tail_time:>14.1f}")
+
+
+def bench_sqlite(sizes: List[int]) -> None:
+    """Словари в памяти против SQLite (в памяти и в файле): загрузка, поиск, выдачи и отчеты"""
+    n_readers, n_ops = 2_000, 20_000
+    print(f"{'книг':>10} {'хранилище':>10} {'загрузка, с':>12} {'поиск, мс':>10} {'выдача, мкс':>12} "
+          f"{'просрочено':>11} {'просрочки, мс':>14} {'топ-10, мс':>11}")
+    for n in sizes:
+        books = make_books(n)
+        with tempfile.TemporaryDirectory() as directory:
+            backends = [
+                ("dict", lambda: Library("Бенчмарк")),
+                ("sqlite", lambda: SQLiteLibrary("Бенчмарк")),
+                ("файл", lambda: SQLiteLibrary("Бенчмарк", path=os.path.join(directory, "bench.sqlite3"))),
+            ]
+            for label, create in backends:
+                start = time.perf_counter()
+                library = create()
+                library.bulk_load_books(Book(b.isbn, b.title, b.author, b.year, 1_000_000) for b in books)
+                library.bulk_register_readers(
+                    Reader(f"R{r}", f"Читатель {r}", f"r{r}@example.com") for r in range(n_readers))
+                load_time = time.perf_counter() - start
+                
+                search_time = measure(lambda: (library.find_books_by_author("толст"),
+                                               library.find_books_by_title("мастер")), repeat=3)
+                
+                rnd = random.Random(1)
+                pairs = [(f"R{rnd.randrange(n_readers)}", books[rnd.randrange(n)].isbn) for _ in range(n_ops)]
+                start = time.perf_counter()
+                for reader_id, isbn in pairs:
+                    if not library.borrow_book(reader_id, isbn)[0]:
+                        library.return_book(reader_id, isbn)
+                ops_time = time.perf_counter() - start
+                
+                # Через 20 дней просрочены все открытые займы
+                FrozenClock.current = datetime.now() + timedelta(days=20)
+                library_system.datetime = FrozenClock
+                try:
+                    overdue_time = measure(library.get_overdue_loans, repeat=3)
+                    n_overdue = len(library.get_overdue_loans())
+                finally:
+                    library_system.datetime = datetime
+                popular_time = measure(lambda: library.get_popular_books(top_n=10), repeat=3)
+                print(f"{n:>10} {label:>10} {load_time:>12.1f} {search_time * 1000:>10.1f} "
+                      f"{ops_time / n_ops * 1e6:>12.1f} {n_overdue:>11} {overdue_time * 1000:>14.2f} "
+                      f"{popular_time * 1000:>11.2f}")
+                if isinstance(library, SQLiteLibrary):
+                    library.close()
+                del library
+        del books
+
+
+def bench_batch(sizes: List[int]) -> None:
+    """Выдачи/возвраты: цикл borrow_book/return_book против apply_batch (в памяти и в SQLite)"""
+    n_books, n_readers = 10_000, 2_000
+    
+    def make(create: Callable[[], Library]) -> Library:
+        library = create()
+        library.bulk_load_books(Book(b.isbn, b.title, b.author, b.year, 1_000_000) for b in make_books(n_books))
+        library.bulk_register_readers(Reader(f"R{r}", f"Читатель {r}", f"r{r}@example.com") for r in range(n_readers))
+        return library
+    
+    def make_ops(n_ops: int) -> List[tuple]:
+        # Каждый читатель по кругу берет книгу и через одну операцию возвращает ее
+        rnd = random.Random(3)
+        ops, held = [], {}
+        for i in range(n_ops):
+            reader_id = f"R{i % n_readers}"
+            if reader_id in held:
+                ops.append(('return', reader_id, held.pop(reader_id)))
+            else:
+                held[reader_id] = f"978-{rnd.randrange(n_books):09d}"
+                ops.append(('borrow', reader_id, held[reader_id]))
+        return ops
+    
+    print(f"{'операций':>10} {'хранилище':>10} {'цикл, оп/с':>11} {'пакет, оп/с':>12} {'ускорение':>10}")
+    for n in sizes:
+        ops = make_ops(n)
+        for label, create in (("dict", lambda: Library("Бенчмарк")), ("sqlite", lambda: SQLiteLibrary("Бенчмарк"))):
+            library = make(create)
+            start = time.perf_counter()
+            loop_results = [library.borrow_book(reader_id, isbn)[0] if action == 'borrow'
+                            else library.return_book(reader_id, isbn)[0]
+                            for action, reader_id, isbn in ops]
+            loop_time = time.perf_counter() - start
+            
+            library = make(create)
+            start = time.perf_counter()
+            batch_results = library.apply_batch(ops)
+            batch_time = time.perf_counter() - start
+            
+            assert loop_results == [success for success, _ in batch_results]
+            print(f"{n:>10} {label:>10} {n / loop_time:>11.0f} {n / batch_time:>12.0f} "
+                  f"{loop_time / batch_time:>9.1f}x")
+
+
+class _NoLock:
+    """Пустая блокировка для режима без общего lock"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+BENCHMARKS: Dict[str, Callable[[List[int]], None]] = {
+    "search": bench_search,
+    "overdue": bench_overdue,
+    "popular": bench_popular,
+    "history": bench_history,
+    "models": bench_models,
+    "threads": bench_threads,
+    "bulk": bench_bulk,
+    "journal": bench_journal,
+    "sqlite": bench_sqlite,
+    "batch": bench_batch,
+}
+
+DEFAULT_SIZES = {
+    "search": [10_000, 100_000, 1_000_000],
+    "overdue": [10_000, 100_000, 500_000],
+    "popular": [10_000, 100_000, 1_000_000],
+    "history": [100_000, 1_000_000],
+    "models": [1_000_000],
+    "threads": [200_000],
+    "bulk": [100_000, 1_000_000],
+    "journal": [1_000_000, 10_000_000],
+    "sqlite": [100_000, 1_000_000],
+    "batch": [10_000, 100_000],
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"бенчмарки из {list(BENCHMARKS)} (по умолчанию все)")
+    parser.add_argument("--sizes", help="размеры данных через запятую")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"неизвестные бенчмарки: {', '.join(sorted(unknown))}")
+    
+    for name in args.names or BENCHMARKS:
+        sizes = ([int(size) for size in args.sizes.split(",")] if args.sizes
+                 else DEFAULT_SIZES[name])
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name](sizes)
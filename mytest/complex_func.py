@@ -1,4 +1,327 @@
-def analyze_text_statistics(text: str, min_word_length: int = 3) -> dict:
+import heapq
+import math
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Hashable, Iterator, List, Optional, TextIO, Tuple
+
+
+# Слово - серия букв и цифр, знаки конца предложения собираются в серии одинаковых знаков,
+# как после схлопывания "!!", "??" и ".."
+TOKEN_PATTERN = re.compile(r'[^\W_]+|\.+|!+|\?+')
+SENTENCE_MARKS = '.!?'
+# Текст режется по пробельным символам: они не входят ни в слово, ни в серию знаков
+# и обрывают контекст конечной сигмы, поэтому куски можно переводить в нижний регистр по отдельности
+WHITESPACE_PATTERN = re.compile(r'\s')
+SCAN_CHUNK_SIZE = 1 << 20
+# Разборы кусков, повторяющихся между вызовами одного анализа: не длиннее и не больше
+CHUNK_CACHE_MAX_LENGTH = 32
+CHUNK_CACHE_SIZE = 1 << 14
+
+
+@lru_cache(maxsize=None)
+def _numeric_only_chars() -> frozenset:
+    """Символы, которые \\w считает буквенно-цифровыми, а isalpha() и isdigit() - нет (½, Ⅻ)"""
+    return frozenset(char for char in map(chr, range(sys.maxunicode + 1))
+                     if char.isnumeric() and not (char.isalpha() or char.isdigit()))
+
+
+@lru_cache(maxsize=None)
+def _strict_token_pattern() -> re.Pattern:
+    """TOKEN_PATTERN, в котором такие символы разделяют слова, как в исходном посимвольном разборе"""
+    excluded = ''.join(map(re.escape, sorted(_numeric_only_chars())))
+    return re.compile(rf'[^\W_{excluded}]+|\.+|!+|\?+')
+
+
+def _iter_pieces(text: str) -> Iterator[str]:
+    """Куски текста примерно по SCAN_CHUNK_SIZE символов, разрезанные перед пробельными символами"""
+    start, size = 0, len(text)
+    while start < size:
+        end = start + SCAN_CHUNK_SIZE
+        if end < size:
+            space = WHITESPACE_PATTERN.search(text, end)
+            end = space.start() if space else size
+        yield text[start:end]
+        start = end
+
+
+def _count_chunks(text: str, chunks: Optional[Counter] = None) -> Counter:
+    """Частоты кусков текста в нижнем регистре между пробельными символами"""
+    if chunks is None:
+        chunks = Counter()
+    for piece in _iter_pieces(text):
+        chunks.update(piece.lower().split())
+    return chunks
+
+
+def _chunk_tokens(chunk: str) -> Tuple[str, ...]:
+    """Токены куска текста между пробелами"""
+    pattern = TOKEN_PATTERN
+    if not chunk.isascii() and not _numeric_only_chars().isdisjoint(chunk):
+        pattern = _strict_token_pattern()
+    return tuple(pattern.findall(chunk))
+
+
+def _scan_chunks(chunks: Counter, cache: Optional[Dict[str, Tuple[str, ...]]] = None) -> Tuple[Counter, int]:
+    """
+    Разбор кусков текста в нижнем регистре на слова и серии знаков конца предложения.
+    
+    cache - словарь разборов кусков, общий для нескольких вызовов одного анализа: в нем
+    запоминаются только куски до CHUNK_CACHE_MAX_LENGTH символов, а при CHUNK_CACHE_SIZE
+    записях он очищается, так что память под него ограничена и уходит вместе с анализом.
+    
+    Returns:
+        tuple: (частоты слов в порядке первого появления, число серий знаков конца предложения)
+    """
+    tokens = Counter()
+    for chunk, count in chunks.items():
+        if cache is None or len(chunk) > CHUNK_CACHE_MAX_LENGTH:
+            chunk_tokens = _chunk_tokens(chunk)
+        else:
+            chunk_tokens = cache.get(chunk)
+            if chunk_tokens is None:
+                if len(cache) >= CHUNK_CACHE_SIZE:
+                    cache.clear()
+                chunk_tokens = cache[chunk] = _chunk_tokens(chunk)
+        for token in chunk_tokens:
+            tokens[token] += count
+    
+    mark_runs = 0
+    for mark in [token for token in tokens if token[0] in SENTENCE_MARKS]:
+        mark_runs += tokens.pop(mark)
+    return tokens, mark_runs
+
+
+def _has_sentence_tail(text: str) -> bool:
+    """Есть ли непробельный текст после последнего знака конца предложения"""
+    last_mark = max(text.rfind(mark) for mark in SENTENCE_MARKS)
+    return bool(text[last_mark + 1:].strip())
+
+
+HASH_MASK = (1 << 64) - 1
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: оценка частот в памяти фиксированного размера.
+    
+    Оценка никогда не меньше настоящей частоты и с вероятностью 1 - error_probability
+    превышает ее не больше чем на error * total. Таблица - depth строк по width счетчиков,
+    строки адресуются двойным хешированием по одному hash() элемента. Счетчики обновляются
+    консервативно: растут только те, что меньше новой оценки.
+    """
+    
+    def __init__(self, error: float = 0.001, error_probability: float = 0.01):
+        if not 0 < error < 1 or not 0 < error_probability < 1:
+            raise ValueError("Погрешность и вероятность ошибки должны быть в интервале (0, 1)")
+        self.width = math.ceil(math.e / error)
+        self.depth = math.ceil(math.log(1 / error_probability))
+        self.table = array('q', bytes(8 * self.width * self.depth))
+        self.total = 0
+    
+    def _cells(self, item: Hashable) -> List[int]:
+        value = hash(item) & HASH_MASK
+        first, step = value & 0xFFFFFFFF, (value >> 32) | 1
+        return [row * self.width + (first + row * step) % self.width for row in range(self.depth)]
+    
+    def add(self, item: Hashable, count: int = 1) -> int:
+        """Добавляет count вхождений item и возвращает новую оценку его частоты"""
+        cells = self._cells(item)
+        table = self.table
+        estimate = min(table[cell] for cell in cells) + count
+        for cell in cells:
+            if table[cell] < estimate:
+                table[cell] = estimate
+        self.total += count
+        return estimate
+    
+    def estimate(self, item: Hashable) -> int:
+        """Оценка частоты item сверху"""
+        return min(self.table[cell] for cell in self._cells(item))
+    
+    def memory_size(self) -> int:
+        """Размер таблицы счетчиков в байтах"""
+        return self.table.itemsize * len(self.table)
+
+
+class HeavyHitters:
+    """
+    Самые частые элементы по оценкам Count-Min Sketch.
+    
+    Хранится не больше capacity кандидатов с наибольшими оценками на момент добавления;
+    новый элемент вытесняет кандидата с наименьшей оценкой, только если его оценка больше.
+    """
+    
+    def __init__(self, sketch: CountMinSketch, capacity: int = 100):
+        if capacity <= 0:
+            raise ValueError("Число кандидатов должно быть положительным")
+        self.sketch = sketch
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self._floor = 0
+    
+    def add(self, item: Hashable, count: int = 1) -> None:
+        estimate = self.sketch.add(item, count)
+        counts = self.counts
+        if item in counts or len(counts) < self.capacity:
+            counts[item] = estimate
+            return
+        # _floor - нижняя граница оценок кандидатов, минимум ищется только когда ее превысили
+        if estimate <= self._floor:
+            return
+        weakest = min(counts, key=counts.get)
+        self._floor = counts[weakest]
+        if estimate > self._floor:
+            del counts[weakest]
+            counts[item] = estimate
+            self._floor = min(counts.values())
+    
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Кандидаты с текущими оценками частоты по убыванию оценки, при равенстве - по возрастанию"""
+        ranked = sorted(((item, self.sketch.estimate(item)) for item in self.counts), key=lambda x: (-x[1], x[0]))
+        return ranked if n is None else ranked[:n]
+
+
+class HyperLogLog:
+    """
+    HyperLogLog: оценка числа различных элементов в памяти фиксированного размера.
+    
+    2 ** precision однобайтовых регистров, относительная стандартная ошибка около
+    1.04 / sqrt(2 ** precision); precision подбирается по заданной error.
+    """
+    
+    def __init__(self, error: float = 0.01):
+        if not 0 < error < 1:
+            raise ValueError("Погрешность должна быть в интервале (0, 1)")
+        self.precision = min(18, max(4, math.ceil(math.log2((1.04 / error) ** 2))))
+        self.registers = bytearray(1 << self.precision)
+    
+    def add(self, item: Hashable) -> None:
+        value = hash(item) & HASH_MASK
+        index = value & (len(self.registers) - 1)
+        rank = 65 - self.precision - (value >> self.precision).bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def __len__(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / math.fsum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+    
+    def memory_size(self) -> int:
+        """Размер регистров в байтах"""
+        return len(self.registers)
+
+
+def _top_word_key(item: Tuple[str, int]) -> Tuple[int, str]:
+    """Порядок top_3_words: по убыванию частоты, при равной частоте - по алфавиту"""
+    return -item[1], item[0]
+
+
+def _text_statistics_result(total_chars: int, sentence_count: int, total_words: int, total_length: int,
+                            unique_count: int, longest_word: str, shortest_word: str,
+                            top_words: List[Tuple[str, int]], word_frequency: Dict[str, int]) -> dict:
+    """Словарь статистики analyze_text_statistics по уже посчитанным величинам (total_words > 0)"""
+    return {
+        "total_characters": total_chars,
+        "total_words": total_words,
+        "total_sentences": sentence_count,
+        "longest_word": longest_word,
+        "shortest_word": shortest_word,
+        "average_word_length": round(total_length / total_words, 2),
+        "unique_words_count": unique_count,
+        "unique_words_percentage": round((unique_count / total_words) * 100, 2),
+        "top_3_words": [{"word": word, "count": count} for word, count in top_words],
+        "word_frequency": word_frequency
+    }
+
+
+def _build_text_statistics(total_chars: int, sentence_count: int, words: Counter,
+                          min_word_length: int = 3) -> dict:
+    """
+    Словарь статистики analyze_text_statistics по частотам слов.
+    
+    Порядок ключей words - порядок первого появления слов в тексте: от него зависят
+    longest_word и shortest_word при равной длине и порядок word_frequency.
+    """
+    if not words:
+        return {
+            "total_characters": total_chars,
+            "total_words": 0,
+            "total_sentences": sentence_count,
+            "longest_word": None,
+            "shortest_word": None,
+            "average_word_length": 0.0,
+            "unique_words_count": 0,
+            "unique_words_percentage": 0.0,
+            "top_3_words": [],
+            "word_frequency": {}
+        }
+    
+    word_frequency = {word: count for word, count in words.items() if len(word) >= min_word_length}
+    return _text_statistics_result(
+        total_chars, sentence_count, words.total(), sum(len(word) * count for word, count in words.items()),
+        len(words), max(words, key=len), min(words, key=len),
+        heapq.nsmallest(3, word_frequency.items(), key=_top_word_key), word_frequency)
+
+
+def _approximate_text_statistics(text: str, total_chars: int, sentence_tail: bool, min_word_length: int,
+                                 frequency_error: float, error_probability: float, unique_error: float,
+                                 top_candidates: int) -> dict:
+    """
+    Статистика по кускам текста в памяти фиксированного размера.
+    
+    Счетчики слов, средняя длина, самое длинное и короткое слово и число предложений точные.
+    Частоты - оценки HeavyHitters по CountMinSketch, уникальные слова - оценка HyperLogLog.
+    """
+    frequent = HeavyHitters(CountMinSketch(frequency_error, error_probability), top_candidates)
+    unique = HyperLogLog(unique_error)
+    total_words = total_length = mark_runs = 0
+    longest_word = shortest_word = None
+    chunk_cache: Dict[str, Tuple[str, ...]] = {}
+    
+    for piece in _iter_pieces(text):
+        words, piece_mark_runs = _scan_chunks(Counter(piece.lower().split()), chunk_cache)
+        mark_runs += piece_mark_runs
+        if not words:
+            continue
+        
+        # Строгие сравнения сохраняют первое по тексту слово при равной длине
+        piece_longest, piece_shortest = max(words, key=len), min(words, key=len)
+        if longest_word is None or len(piece_longest) > len(longest_word):
+            longest_word = piece_longest
+        if shortest_word is None or len(piece_shortest) < len(shortest_word):
+            shortest_word = piece_shortest
+        
+        total_words += words.total()
+        for word, count in words.items():
+            total_length += len(word) * count
+            unique.add(word)
+            if len(word) >= min_word_length:
+                frequent.add(word, count)
+    
+    sentence_count = mark_runs + sentence_tail
+    if not total_words:
+        return _build_text_statistics(total_chars, sentence_count, Counter(), min_word_length)
+    
+    unique_count = min(max(len(unique), 1), total_words)
+    return _text_statistics_result(total_chars, sentence_count, total_words, total_length, unique_count,
+                                   longest_word, shortest_word, frequent.most_common(3),
+                                   dict(frequent.most_common()))
+
+
+def analyze_text_statistics(text: str, min_word_length: int = 3, *, approximate: bool = False,
+                            frequency_error: float = 0.0001, error_probability: float = 0.01,
+                            unique_error: float = 0.01, top_candidates: int = 100) -> dict:
     """
     Анализирует текст и возвращает подробную статистику.
     
@@ -11,15 +334,28 @@ def analyze_text_statistics(text: str, min_word_length: int = 3) -> dict:
     - Подсчитывает количество уникальных слов
     - Определяет процент уникальных слов от общего количества
     
+    В приближенном режиме (approximate=True) память не зависит от словаря текста:
+    частоты оцениваются Count-Min Sketch, и word_frequency содержит только top_candidates
+    самых частых слов с оценками сверху, завышенными не больше чем на
+    frequency_error * (число слов) с вероятностью 1 - error_probability. Число уникальных слов
+    оценивается HyperLogLog с относительной ошибкой около unique_error.
+    Остальные поля считаются точно.
+    
     Args:
         text (str): Текст для анализа
         min_word_length (int): Минимальная длина слова для подсчета частоты (по умолчанию 3)
+        approximate (bool): Приближенный режим с памятью фиксированного размера
+        frequency_error (float): Допустимая ошибка частот как доля числа слов
+        error_probability (float): Вероятность превысить frequency_error
+        unique_error (float): Относительная ошибка числа уникальных слов
+        top_candidates (int): Сколько самых частых слов хранить в приближенном режиме
     
     Returns:
         dict: Словарь со статистикой текста
     
     Raises:
-        ValueError: Если текст пустой или содержит только пробелы
+        ValueError: Если текст пустой или содержит только пробелы, или параметры
+            приближенного режима вне допустимых границ
         TypeError: Если text не является строкой
     """
     
@@ -33,92 +369,262 @@ def analyze_text_statistics(text: str, min_word_length: int = 3) -> dict:
     # Подсчет общего количества символов (без пробелов в начале и конце)
     total_chars = len(text.strip())
     
-    # Разделение на предложения (по точкам, восклицательным и вопросительным знакам)
-    # Сначала заменяем множественные знаки препинания на одиночные
-    cleaned_text = text
-    while '!!' in cleaned_text or '??' in cleaned_text or '..' in cleaned_text:
-        cleaned_text = cleaned_text.replace('!!', '!').replace('??', '?').replace('..', '.')
-    
-    sentences = []
-    current_sentence = ""
-    
-    for char in cleaned_text:
-        current_sentence += char
-        if char in '.!?':
-            if current_sentence.strip():
-                sentences.append(current_sentence.strip())
-            current_sentence = ""
-    
-    if current_sentence.strip():
-        sentences.append(current_sentence.strip())
-    
-    sentence_count = len(sentences)
-    
-    # Обработка слов
-    words = []
-    current_word = ""
-    for char in text.lower():
-        if char.isalpha() or char.isdigit():
-            current_word += char
-        else:
-            if current_word:
-                words.append(current_word)
-                current_word = ""
-    if current_word:
-        words.append(current_word)
+    if approximate:
+        return _approximate_text_statistics(text, total_chars, _has_sentence_tail(text), min_word_length,
+                                            frequency_error, error_probability, unique_error, top_candidates)
     
-    # Проверка наличия слов
-    if not words:
-        return {
-            "total_characters": total_chars,
-            "total_words": 0,
-            "total_sentences": sentence_count,
-            "longest_word": None,
-            "shortest_word": None,
-            "average_word_length": 0.0,
-            "unique_words_count": 0,
-            "unique_words_percentage": 0.0,
-            "top_3_words": [],
-            "word_frequency": {}
-        }
+    # Слова и серии знаков препинания за один проход: серия одинаковых знаков
+    # "!!!", "???" или "..." - конец одного предложения
+    words, mark_runs = _scan_chunks(_count_chunks(text))
+    sentence_count = mark_runs + _has_sentence_tail(text)
     
-    total_words = len(words)
+    return _build_text_statistics(total_chars, sentence_count, words, min_word_length)
+
+
+class TextStatsAccumulator:
+    """
+    Статистика документа, к которому дописывается текст.
     
-    # Поиск самого длинного и короткого слова
-    longest_word = max(words, key=len)
-    shortest_word = min(words, key=len)
+    feed(text) режет добавленный текст по пробелам и копит частоты кусков, snapshot()
+    разбирает на слова только куски, добавленные после прошлого снимка, и возвращает то же,
+    что analyze_text_statistics для всего переданного в feed() текста. Хранятся частоты
+    слов и несколько счетчиков, а не сам документ.
     
-    # Вычисление средней длины слова
-    total_length = sum(len(word) for word in words)
-    average_length = round(total_length / total_words, 2)
+    Добавленный текст режется до последнего пробельного символа, хвост после него
+    ждет следующего feed(): так слово или серия знаков, разрезанные между вызовами,
+    считаются один раз.
+    """
     
-    # Подсчет частоты слов (только слова >= min_word_length)
-    word_frequency = {}
-    for word in words:
-        if len(word) >= min_word_length:
-            word_frequency[word] = word_frequency.get(word, 0) + 1
+    def __init__(self, min_word_length: int = 3):
+        self.min_word_length = min_word_length
+        self._mark_runs = 0
+        self._pending_chunks = Counter()
+        self._total_length = self._leading_spaces = self._trailing_spaces = 0
+        self._has_text = self._has_tail = False
+        self._carry = ""
+        self._chunk_cache: Dict[str, Tuple[str, ...]] = {}  # разборы кусков между снимками
+        
+        # Частоты разобранных слов и величины снимка, обновляемые при добавлении слов
+        self._words: Dict[str, int] = {}  # в порядке первого появления
+        self._word_frequency: Dict[str, int] = {}
+        self._top_words: List[Tuple[str, int]] = []
+        self._total_words = self._words_length = 0
+        self._longest_word = self._shortest_word = None
     
-    # Поиск топ-3 самых частых слов
-    sorted_words = sorted(word_frequency.items(), key=lambda x: (-x[1], x[0]))
-    top_3_words = [{"word": word, "count": count} for word, count in sorted_words[:3]]
+    def feed(self, text: str) -> None:
+        """Учитывает текст, дописанный в конец документа"""
+        if not isinstance(text, str):
+            raise TypeError("Текст должен быть строкой")
+        if not text:
+            return
+        
+        # Пробелы в начале и конце для total_characters
+        self._total_length += len(text)
+        if not self._has_text:
+            content = text.lstrip()
+            self._leading_spaces += len(text) - len(content)
+            self._has_text = bool(content)
+        content = text.rstrip()
+        self._trailing_spaces = len(text) - len(content) if content else self._trailing_spaces + len(text)
+        
+        # Непробельный текст после последнего знака конца предложения
+        last_mark = max(text.rfind(mark) for mark in SENTENCE_MARKS)
+        if last_mark >= 0:
+            self._has_tail = bool(text[last_mark + 1:].strip())
+        elif content:
+            self._has_tail = True
+        
+        # Копим куски до последнего пробельного символа: на нем не обрываются ни слова,
+        # ни серии знаков, ни контекст конечной сигмы в lower()
+        buffer = self._carry + text
+        self._carry = "" if buffer[-1].isspace() else buffer.rsplit(None, 1)[-1]
+        _count_chunks(buffer[:len(buffer) - len(self._carry)], self._pending_chunks)
     
-    # Подсчет уникальных слов
-    unique_words = set(words)
-    unique_count = len(unique_words)
-    unique_percentage = round((unique_count / total_words) * 100, 2)
+    def _add_words(self, words: Counter) -> None:
+        """Добавляет частоты слов, идущих в тексте после уже учтенных (в порядке первого появления)"""
+        known, frequency, min_word_length = self._words, self._word_frequency, self.min_word_length
+        longest, shortest = self._longest_word, self._shortest_word
+        words_length = 0
+        for word, count in words.items():
+            total = known.get(word)
+            if total is None:
+                total = count
+                # Новые слова идут в тексте после известных: строгие сравнения сохраняют первое слово
+                if longest is None:
+                    longest = shortest = word
+                elif len(word) > len(longest):
+                    longest = word
+                elif len(word) < len(shortest):
+                    shortest = word
+            else:
+                total += count
+            known[word] = total
+            words_length += len(word) * count
+            if len(word) >= min_word_length:
+                frequency[word] = total
+        
+        self._longest_word, self._shortest_word = longest, shortest
+        self._total_words += words.total()
+        self._words_length += words_length
+        # Частоты только растут, поэтому новый топ - среди прежнего топа и изменившихся слов
+        candidates = chain((item for item in self._top_words if item[0] not in words),
+                           ((word, frequency[word]) for word in words if len(word) >= min_word_length))
+        self._top_words = heapq.nsmallest(3, candidates, key=_top_word_key)
     
-    return {
-        "total_characters": total_chars,
-        "total_words": total_words,
-        "total_sentences": sentence_count,
-        "longest_word": longest_word,
-        "shortest_word": shortest_word,
-        "average_word_length": average_length,
-        "unique_words_count": unique_count,
-        "unique_words_percentage": unique_percentage,
-        "top_3_words": top_3_words,
-        "word_frequency": word_frequency
-    }
+    def _remove_words(self, words: Counter) -> None:
+        """Отменяет _add_words(words) в частотах слов; остальные величины восстанавливает вызывающий"""
+        known, frequency = self._words, self._word_frequency
+        for word, count in words.items():
+            total = known[word] - count
+            if total:
+                known[word] = total
+                if word in frequency:
+                    frequency[word] = total
+            else:
+                del known[word]
+                frequency.pop(word, None)
+    
+    def snapshot(self) -> dict:
+        """
+        Статистика всего добавленного текста в формате analyze_text_statistics.
+        
+        Стоимость снимка зависит от текста, добавленного после прошлого снимка, а не от
+        размера словаря; исключение - копия word_frequency в результате.
+        
+        Raises:
+            ValueError: Если текст пустой или содержит только пробелы
+        """
+        if not self._has_text:
+            raise ValueError("Текст не может быть пустым")
+        
+        if self._pending_chunks:
+            words, mark_runs = _scan_chunks(self._pending_chunks, self._chunk_cache)
+            self._add_words(words)
+            self._mark_runs += mark_runs
+            self._pending_chunks = Counter()
+        
+        total_chars = self._total_length - self._leading_spaces - self._trailing_spaces
+        if not self._carry:
+            return self._statistics(total_chars, self._mark_runs + self._has_tail)
+        
+        # Недописанный кусок в конце учитывается на время снимка
+        carry_words, carry_mark_runs = _scan_chunks(_count_chunks(self._carry), self._chunk_cache)
+        saved = (self._total_words, self._words_length, self._longest_word, self._shortest_word, self._top_words)
+        self._add_words(carry_words)
+        try:
+            return self._statistics(total_chars, self._mark_runs + carry_mark_runs + self._has_tail)
+        finally:
+            self._remove_words(carry_words)
+            (self._total_words, self._words_length, self._longest_word, self._shortest_word,
+             self._top_words) = saved
+    
+    def _statistics(self, total_chars: int, sentence_count: int) -> dict:
+        if not self._total_words:
+            return _build_text_statistics(total_chars, sentence_count, Counter(), self.min_word_length)
+        return _text_statistics_result(total_chars, sentence_count, self._total_words, self._words_length,
+                                       len(self._words), self._longest_word, self._shortest_word,
+                                       self._top_words, dict(self._word_frequency))
+
+
+def analyze_text_stream(file_like: TextIO, min_word_length: int = 3,
+                        chunk_size: int = SCAN_CHUNK_SIZE) -> dict:
+    """
+    Статистика текста из файла, который читается кусками по chunk_size символов.
+    
+    Результат совпадает с analyze_text_statistics(file_like.read(), min_word_length),
+    но в памяти держатся только частоты слов и один кусок файла, а не весь текст,
+    поэтому функция подходит для файлов в гигабайты. Куски передаются в TextStatsAccumulator.
+    
+    Args:
+        file_like: Файл, открытый в текстовом режиме, или другой объект с методом read(size)
+        min_word_length (int): Минимальная длина слова для подсчета частоты (по умолчанию 3)
+        chunk_size (int): Сколько символов читать за раз
+    
+    Returns:
+        dict: Словарь со статистикой текста
+    
+    Raises:
+        ValueError: Если текст пустой или содержит только пробелы, или chunk_size не положителен
+        TypeError: Если файл возвращает не строки
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер куска должен быть положительным")
+    
+    accumulator = TextStatsAccumulator(min_word_length)
+    while True:
+        piece = file_like.read(chunk_size)
+        if not piece:
+            break
+        accumulator.feed(piece)
+    return accumulator.snapshot()
+
+
+def _split_shards(text: str, shards: int) -> List[str]:
+    """Примерно равные части текста, каждая кроме последней заканчивается пробельным символом"""
+    shard_size = -(-len(text) // shards)
+    bounds = [0]
+    while bounds[-1] < len(text):
+        space = WHITESPACE_PATTERN.search(text, bounds[-1] + shard_size)
+        bounds.append(space.end() if space else len(text))
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _shard_text_tokens(shard: str) -> Tuple[Counter, int]:
+    """Частичная статистика части текста: частоты слов и число серий знаков конца предложения"""
+    return _scan_chunks(_count_chunks(shard))
+
+
+def analyze_text_statistics_parallel(text: str, min_word_length: int = 3, max_workers: Optional[int] = None,
+                                     shards: Optional[int] = None) -> dict:
+    """
+    Статистика текста, посчитанная по частям в пуле процессов.
+    
+    Текст режется после пробельных символов, поэтому ни слово, ни серия знаков конца
+    предложения не попадают в две части. Каждый процесс возвращает частоты слов своей части
+    в порядке первого появления и число серий знаков; частоты сливаются в порядке частей,
+    так что порядок первого появления, а с ним longest_word, shortest_word и порядок
+    word_frequency, совпадают с analyze_text_statistics.
+    
+    Args:
+        text (str): Текст для анализа
+        min_word_length (int): Минимальная длина слова для подсчета частоты (по умолчанию 3)
+        max_workers (int): Число процессов (по умолчанию число ядер)
+        shards (int): Число частей текста (по умолчанию max_workers)
+    
+    Returns:
+        dict: Словарь со статистикой текста, равный analyze_text_statistics(text, min_word_length)
+    
+    Raises:
+        ValueError: Если текст пустой или содержит только пробелы, или max_workers или shards
+            не положительны
+        TypeError: Если text не является строкой
+    """
+    if not isinstance(text, str):
+        raise TypeError("Текст должен быть строкой")
+    
+    if not text.strip():
+        raise ValueError("Текст не может быть пустым")
+    
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    elif max_workers < 1:
+        raise ValueError("Число процессов должно быть положительным")
+    if shards is None:
+        shards = max_workers
+    elif shards < 1:
+        raise ValueError("Число частей должно быть положительным")
+    
+    parts = _split_shards(text, shards)
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(parts))) as executor:
+        partials = list(executor.map(_shard_text_tokens, parts))
+    
+    words, mark_runs = Counter(), 0
+    for shard_words, shard_mark_runs in partials:
+        words.update(shard_words)
+        mark_runs += shard_mark_runs
+    
+    sentence_count = mark_runs + _has_sentence_tail(text)
+    return _build_text_statistics(len(text.strip()), sentence_count, words, min_word_length)
 
 
 # Пример использования
@@ -0,0 +1,447 @@
+"""
+Бенчмарки анализа турнира
+Запуск: python bench_tournament_analysis.py [имя_бенчмарка ...] [--sizes 100000,1000000]
+"""
+
+import argparse
+import datetime
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from tournament_analysis import (MatchLog, MatchTable, ReportCache, TeamRanking, TeamStatsAccumulator,
+                                 analyze_match_file, calculate_advanced_team_stats, calculate_team_stats_parallel,
+                                 filter_matches_by_criteria, generate_analytics_report, parse_match_lines,
+                                 parse_match_records, rank_teams_advanced)
+
+
+TEAMS = ["Team_A", "Team_B", "Real Madrid", "FC Barcelona", "Bayern", "Juventus", "Ajax",
+         "Porto", "Celtic", "Spartak", "Zenit", "Dynamo", "Benfica", "Inter", "Milan", "Lyon"]
+STADIUMS = ["Stadium_X", "Stadium_Y", "Santiago Bernabéu", "Camp Nou", "Allianz Arena",
+            "San Siro", "Luzhniki", "Celtic Park"]
+
+
+def make_lines(n: int, invalid_share: float = 0.01, seed: int = 42) -> List[str]:
+    """Синтетический журнал из n строк матчей с долей ошибочных строк"""
+    rnd = random.Random(seed)
+    start = datetime.date(2020, 1, 1)
+    lines = []
+    for i in range(n):
+        team1, team2 = rnd.sample(TEAMS, 2)
+        date = start + datetime.timedelta(days=i % 1500)
+        line = (f"{date.isoformat()} | {team1} ({rnd.randint(0, 5)}:{rnd.randint(0, 5)}) {team2} | "
+                f"{rnd.choice(STADIUMS)} | {rnd.randint(1_000, 90_000)}")
+        if rnd.random() < invalid_share:
+            line = line.replace(" | ", " / ", 1)
+        lines.append(line + "\n")
+    return lines
+
+
+def make_matches(n: int) -> List[Dict[str, Any]]:
+    """n разобранных матчей без ошибочных строк"""
+    return list(parse_match_lines(make_lines(n, invalid_share=0.0)))
+
+
+def measure(func: Callable, repeat: int = 3) -> float:
+    """Лучшее время выполнения func() за repeat запусков, в секундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def traced_peak(func: Callable) -> tuple:
+    """Результат func() и пиковый объем памяти, выделенной при его выполнении, в байтах"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def parse_match_data_baseline(match_string: str) -> Dict[str, Any]:
+    """Исходная версия parse_match_data: split, datetime.date и re.match на каждый вызов"""
+    parts = match_string.split(" | ")
+    if len(parts) != 4:
+        raise ValueError("Invalid format: expected 4 parts separated by ' | '")
+    
+    date_str, teams_score_str, stadium_str, attendance_str = parts
+    
+    try:
+        year, month, day = map(int, date_str.split("-"))
+        datetime.date(year, month, day)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid date format: expected YYYY-MM-DD")
+    
+    teams_score_pattern = r'^\s*(.+?)\s*\(\s*(\S+)\s*:\s*(\S+)\s*\)\s*(.+?)\s*$'
+    match = re.match(teams_score_pattern, teams_score_str)
+    if not match:
+        raise ValueError("Invalid teams/score format: expected 'Team1 (X:Y) Team2'")
+    
+    team1, score1_str, score2_str, team2 = match.groups()
+    
+    if not team1.strip() or not team2.strip() or not stadium_str.strip():
+        raise ValueError("Team names and stadium cannot be empty")
+    
+    try:
+        score1 = int(score1_str)
+        score2 = int(score2_str)
+        if score1 < 0 or score2 < 0:
+            raise ValueError("Score cannot be negative")
+    except ValueError:
+        raise ValueError("Invalid score: must be non-negative integers")
+    
+    try:
+        attendance = int(attendance_str)
+        if attendance <= 0:
+            raise ValueError("Attendance must be positive")
+    except ValueError:
+        raise ValueError("Invalid attendance: must be a positive integer")
+    
+    return {
+        "date": date_str,
+        "team1": team1.strip(),
+        "score1": score1,
+        "team2": team2.strip(),
+        "score2": score2,
+        "stadium": stadium_str.strip(),
+        "attendance": attendance
+    }
+
+
+def parse_lines_baseline(lines: List[str]) -> List[Dict[str, Any]]:
+    """Построчный разбор исходной версией с пропуском ошибочных строк"""
+    matches = []
+    for line in lines:
+        try:
+            matches.append(parse_match_data_baseline(line.rstrip("\r\n")))
+        except ValueError:
+            pass
+    return matches
+
+
+def generate_analytics_report_baseline(matches_list: List[Dict[str, Any]],
+                                     team_stats: Dict[str, Dict[str, Any]],
+                                     tournament_table: List[Tuple[int, str, int, int]]) -> Dict[str, Any]:
+    """Исходная версия generate_analytics_report: четыре прохода по матчам"""
+    if not matches_list or not team_stats or not tournament_table:
+        return {
+            "tournament_leader": "",
+            "most_goals_match": {},
+            "highest_attendance_match": {},
+            "most_efficient_team": "",
+            "biggest_upset": None,
+            "goal_distribution": {},
+            "attendance_by_team": {}
+        }
+    
+    rank_dict = {}
+    for rank, team, points, goal_diff in tournament_table:
+        rank_dict[team] = rank
+    
+    tournament_leader = tournament_table[0][1] if tournament_table else ""
+    
+    most_goals_match = None
+    max_goals = -1
+    for match in matches_list:
+        total_goals = match["score1"] + match["score2"]
+        if total_goals > max_goals:
+            max_goals = total_goals
+            most_goals_match = match
+    
+    highest_attendance_match = None
+    max_attendance = -1
+    for match in matches_list:
+        if match["attendance"] > max_attendance:
+            max_attendance = match["attendance"]
+            highest_attendance_match = match
+    
+    most_efficient_team = ""
+    max_efficiency = -1.0
+    for team, stats in team_stats.items():
+        if stats["matches_played"] > 0:
+            efficiency = round(stats["points"] / stats["matches_played"], 2)
+            if efficiency > max_efficiency:
+                max_efficiency = efficiency
+                most_efficient_team = team
+    
+    biggest_upset = None
+    max_rank_diff = -1
+    
+    for match in matches_list:
+        team1 = match["team1"]
+        team2 = match["team2"]
+        score1 = match["score1"]
+        score2 = match["score2"]
+        
+        if score1 == score2 or team1 not in rank_dict or team2 not in rank_dict:
+            continue
+        
+        if score1 > score2:
+            winner = team1
+            loser = team2
+        else:
+            winner = team2
+            loser = team1
+        
+        winner_rank = rank_dict[winner]
+        loser_rank = rank_dict[loser]
+        
+        if winner_rank > loser_rank:
+            rank_diff = winner_rank - loser_rank
+            if rank_diff > max_rank_diff:
+                max_rank_diff = rank_diff
+                biggest_upset = {
+                    "match": match,
+                    "winner_rank": winner_rank,
+                    "loser_rank": loser_rank
+                }
+    
+    goal_distribution = {}
+    for match in matches_list:
+        total_goals = match["score1"] + match["score2"]
+        goal_distribution[total_goals] = goal_distribution.get(total_goals, 0) + 1
+    
+    attendance_by_team = {}
+    for team, stats in team_stats.items():
+        attendance_by_team[team] = stats["avg_attendance"]
+    
+    return {
+        "tournament_leader": tournament_leader,
+        "most_goals_match": most_goals_match or {},
+        "highest_attendance_match": highest_attendance_match or {},
+        "most_efficient_team": most_efficient_team,
+        "biggest_upset": biggest_upset,
+        "goal_distribution": goal_distribution,
+        "attendance_by_team": attendance_by_team
+    }
+
+
+def bench_parse(sizes: List[int]) -> None:
+    """Разбор строк матчей: исходный парсер против parse_match_lines"""
+    print(f"{'строк':>10} {'исходный, строк/с':>18} {'parse_match_lines, строк/с':>27} {'ускорение':>10}")
+    for n in sizes:
+        lines = make_lines(n)
+        errors = []
+        assert list(parse_match_lines(lines, errors)) == parse_lines_baseline(lines)
+        assert len(errors) == n - len(parse_lines_baseline(lines))
+        baseline_time = measure(lambda: parse_lines_baseline(lines))
+        fast_time = measure(lambda: list(parse_match_lines(lines, [])))
+        print(f"{n:>10} {n / baseline_time:>18,.0f} {n / fast_time:>27,.0f} {baseline_time / fast_time:>9.1f}x")
+
+
+def bench_filter(sizes: List[int]) -> None:
+    """Фильтрация матчей: filter_matches_by_criteria против масок MatchTable"""
+    queries = [
+        {"team": "Ajax"},
+        {"stadium": "Camp Nou", "min_total_goals": 6},
+        {"date_from": "2021-01-01", "date_to": "2021-03-31"},
+        {"team": "Zenit", "date_from": "2022-01-01", "min_attendance": 50_000},
+        {"team": "Porto", "date_from": "2021-08-01", "date_to": "2022-05-31"},
+        {"min_attendance": 30_000, "max_attendance": 40_000},
+    ]
+    print(f"{'матчей':>10} {'критерии':>48} {'функция, мс':>12} {'MatchTable, мс':>15} {'ускорение':>10}")
+    for n in sizes:
+        matches = make_matches(n)
+        start = time.perf_counter()
+        table = MatchTable(matches)
+        print(f"{n:>10} таблица построена за {time.perf_counter() - start:.2f} с")
+        for criteria in queries:
+            assert table.filter(**criteria) == filter_matches_by_criteria(matches, **criteria)
+            function_time = measure(lambda: filter_matches_by_criteria(matches, **criteria))
+            table_time = measure(lambda: table.filter(**criteria))
+            print(f"{n:>10} {', '.join(criteria):>48} {function_time * 1000:>12.1f} "
+                  f"{table_time * 1000:>15.1f} {function_time / table_time:>9.1f}x")
+
+
+def bench_stats(sizes: List[int]) -> None:
+    """Статистика команд по ходу турнира: пересчет calculate_advanced_team_stats против TeamStatsAccumulator"""
+    updates = 1_000
+    print(f"{'матчей':>10} {'пересчет, мс':>13} {'накопление, мс':>15} {'обновление, мкс':>16} {'ускорение':>10}")
+    for n in sizes:
+        matches = make_matches(n + updates)
+        history, live = matches[:n], matches[n:]
+        batch_time = measure(lambda: calculate_advanced_team_stats(history), repeat=1)
+        build_time = measure(lambda: TeamStatsAccumulator(history), repeat=1)
+        
+        accumulator = TeamStatsAccumulator(history)
+        start = time.perf_counter()
+        for match in live:
+            accumulator.add(match)
+            accumulator.stats()
+        update_time = (time.perf_counter() - start) / updates
+        assert accumulator.stats() == calculate_advanced_team_stats(matches)
+        print(f"{n:>10} {batch_time * 1000:>13.1f} {build_time * 1000:>15.1f} "
+              f"{update_time * 1e6:>16.1f} {batch_time / update_time:>9.0f}x")
+
+
+def bench_parallel(sizes: List[int]) -> None:
+    """Статистика команд по шардам дат в пуле процессов: масштабирование по числу процессов"""
+    print(f"ядер: {os.cpu_count()}")
+    print(f"{'матчей':>10} {'процессов':>10} {'время, с':>9} {'ускорение':>10}")
+    for n in sizes:
+        matches = make_matches(n)
+        batch_time = measure(lambda: calculate_advanced_team_stats(matches), repeat=1)
+        expected = calculate_advanced_team_stats(matches)
+        print(f"{n:>10} {'функция':>10} {batch_time:>9.2f} {1:>9.1f}x")
+        for workers in (1, 2, 4, 8):
+            assert calculate_team_stats_parallel(matches, max_workers=workers) == expected
+            parallel_time = measure(lambda: calculate_team_stats_parallel(matches, max_workers=workers), repeat=1)
+            print(f"{n:>10} {workers:>10} {parallel_time:>9.2f} {batch_time / parallel_time:>9.1f}x")
+
+
+def bench_ranking(sizes: List[int]) -> None:
+    """Таблица после каждого матча: rank_teams_advanced против TeamRanking (размер - число команд)"""
+    updates = 200
+    print(f"{'команд':>10} {'rank_teams_advanced, мс':>24} {'TeamRanking, мкс':>17} {'ускорение':>10}")
+    for n in sizes:
+        rnd = random.Random(n)
+        team_stats = {f"Team_{i}": {"points": rnd.randint(0, 100), "goal_diff": rnd.randint(-50, 50),
+                                    "goals_for": rnd.randint(0, 150), "wins": rnd.randint(0, 30)}
+                      for i in range(n)}
+        ranking = TeamRanking(team_stats)
+        changes = [(f"Team_{rnd.randrange(n)}", rnd.choice((0, 1, 3))) for _ in range(updates)]
+        
+        def full_rebuild():
+            for team, points in changes:
+                team_stats[team]["points"] += points
+                rank_teams_advanced(team_stats)[:10]
+        
+        def maintained():
+            for team, points in changes:
+                team_stats[team]["points"] += points
+                ranking.update(team, team_stats[team])
+                ranking.top(10)
+                ranking.rank_of(team)
+        
+        full_time = measure(full_rebuild, repeat=1) / updates
+        maintained_time = measure(maintained, repeat=1) / updates
+        assert ranking.table() == rank_teams_advanced(team_stats)
+        print(f"{n:>10} {full_time * 1000:>24.2f} {maintained_time * 1e6:>17.1f} {full_time / maintained_time:>9.0f}x")
+
+
+def bench_report(sizes: List[int]) -> None:
+    """Отчет турнира: четыре прохода исходной версии против одного прохода MatchReportAggregator"""
+    print(f"{'матчей':>10} {'исходный, мс':>13} {'один проход, мс':>16} {'ускорение':>10}")
+    for n in sizes:
+        matches = make_matches(n)
+        team_stats = calculate_advanced_team_stats(matches)
+        table = rank_teams_advanced(team_stats)
+        assert generate_analytics_report(matches, team_stats, table) == \
+            generate_analytics_report_baseline(matches, team_stats, table)
+        baseline_time = measure(lambda: generate_analytics_report_baseline(matches, team_stats, table))
+        fused_time = measure(lambda: generate_analytics_report(matches, team_stats, table))
+        print(f"{n:>10} {baseline_time * 1000:>13.1f} {fused_time * 1000:>16.1f} {baseline_time / fused_time:>9.1f}x")
+
+
+def bench_pipeline(sizes: List[int]) -> None:
+    """Файл матчей -> отчет: список в памяти против потокового analyze_match_file"""
+    
+    def in_memory(path: str) -> tuple:
+        with open(path, encoding="utf-8") as file:
+            matches = list(parse_match_lines(file))
+        team_stats = calculate_advanced_team_stats(matches)
+        table = rank_teams_advanced(team_stats)
+        return team_stats, table, generate_analytics_report(matches, team_stats, table)
+    
+    print(f"{'матчей':>10} {'список, МБ':>11} {'поток, МБ':>10} {'список, с':>10} {'поток, с':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            path = os.path.join(directory, f"matches_{n}.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.writelines(make_lines(n))
+            
+            expected, list_peak = traced_peak(lambda: in_memory(path))
+            result, stream_peak = traced_peak(lambda: analyze_match_file(path))
+            assert result == expected
+            list_time = measure(lambda: in_memory(path), repeat=1)
+            stream_time = measure(lambda: analyze_match_file(path), repeat=1)
+            print(f"{n:>10} {list_peak / 2**20:>11.1f} {stream_peak / 2**20:>10.2f} "
+                  f"{list_time:>10.2f} {stream_time:>9.2f}")
+
+
+def bench_cache(sizes: List[int]) -> None:
+    """Повторные отрисовки дашборда: generate_analytics_report против ReportCache"""
+    renders = 50
+    print(f"{'матчей':>10} {'вход':>8} {'без кэша, мс':>13} {'кэш, мс':>8} {'ускорение':>10} {'попаданий':>10} {'промахов':>9}")
+    for n in sizes:
+        matches = make_matches(n)
+        team_stats = calculate_advanced_team_stats(matches)
+        table = rank_teams_advanced(team_stats)
+        uncached_time = measure(lambda: generate_analytics_report(matches, team_stats, table), repeat=1)
+        
+        for kind, matches_list in (("list", matches), ("MatchLog", MatchLog(matches))):
+            cache = ReportCache()
+            assert cache.report(matches_list, team_stats, table) == generate_analytics_report(matches, team_stats, table)
+            start = time.perf_counter()
+            for _ in range(renders):
+                cache.report(matches_list, team_stats, table)
+            cached_time = (time.perf_counter() - start) / renders
+            print(f"{n:>10} {kind:>8} {uncached_time * 1000:>13.1f} {cached_time * 1000:>8.3f} "
+                  f"{uncached_time / cached_time:>9.0f}x {cache.hits:>10} {cache.misses:>9}")
+
+
+def bench_records(sizes: List[int]) -> None:
+    """Память и скорость: словари матчей против MatchRecord с общей таблицей символов"""
+    print(f"{'матчей':>10} {'формат':>12} {'байт/матч':>10} {'фильтр, мс':>11} {'статистика, мс':>15} {'отчет, мс':>10}")
+    for n in sizes:
+        lines = make_lines(n, invalid_share=0.0)
+        for kind, parse in (("dict", parse_match_lines), ("MatchRecord", parse_match_records)):
+            matches, size = traced_peak(lambda: list(parse(lines)))
+            team_stats = calculate_advanced_team_stats(matches)
+            table = rank_teams_advanced(team_stats)
+            filter_time = measure(lambda: filter_matches_by_criteria(matches, team="Ajax"), repeat=1)
+            stats_time = measure(lambda: calculate_advanced_team_stats(matches), repeat=1)
+            report_time = measure(lambda: generate_analytics_report(matches, team_stats, table), repeat=1)
+            print(f"{n:>10} {kind:>12} {size / n:>10.0f} {filter_time * 1000:>11.1f} "
+                  f"{stats_time * 1000:>15.1f} {report_time * 1000:>10.1f}")
+            del matches
+
+
+BENCHMARKS: Dict[str, Callable[[List[int]], None]] = {
+    "parse": bench_parse,
+    "filter": bench_filter,
+    "stats": bench_stats,
+    "parallel": bench_parallel,
+    "ranking": bench_ranking,
+    "report": bench_report,
+    "pipeline": bench_pipeline,
+    "cache": bench_cache,
+    "records": bench_records,
+}
+
+DEFAULT_SIZES = {
+    "parse": [100_000, 1_000_000],
+    "filter": [100_000, 1_000_000],
+    "stats": [100_000, 1_000_000],
+    "parallel": [1_000_000],
+    "ranking": [100, 10_000, 100_000],
+    "report": [100_000, 1_000_000],
+    "pipeline": [10_000, 100_000, 1_000_000],
+    "cache": [100_000, 1_000_000],
+    "records": [100_000, 1_000_000],
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"бенчмарки из {list(BENCHMARKS)} (по умолчанию все)")
+    parser.add_argument("--sizes", help="размеры данных через запятую")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"неизвестные бенчмарки: {', '.join(sorted(unknown))}")
+    
+    for name in args.names or BENCHMARKS:
+        sizes = ([int(size) for size in args.sizes.split(",")] if args.sizes
+                 else DEFAULT_SIZES[name])
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name](sizes)
@@ -1,11 +1,24 @@
 import pytest
 import datetime
+import pickle
 from tournament_analysis import (
     parse_match_data,
+    parse_match_lines,
     filter_matches_by_criteria,
+    MatchTable,
     calculate_advanced_team_stats,
+    TeamStatsAccumulator,
+    calculate_team_stats_parallel,
     rank_teams_advanced,
-    generate_analytics_report
+    TeamRanking,
+    generate_analytics_report,
+    MatchReportAggregator,
+    analyze_match_file,
+    MatchLog,
+    ReportCache,
+    MatchRecord,
+    SymbolTable,
+    parse_match_records
 )
 
 
@@ -90,6 +103,61 @@ class TestParseMatchData:
         result = parse_match_data(input_str)
         assert result["score1"] == 10
         assert result["score2"] == 15
+    
+    @pytest.mark.parametrize("input_str, expected", [
+        ("2024-03-15 |   Real Madrid(2 : 0)  FC Köln  |  Santiago Bernabéu  | 050",
+         ("Real Madrid", 2, "FC Köln", 0, "Santiago Bernabéu", 50)),
+        ("2024-3-5 | St. Pauli (007:1) Team (B) | Millerntor | 29546",
+         ("St. Pauli", 7, "Team (B)", 1, "Millerntor", 29546)),
+    ])
+    def test_non_canonical_spacing_valid(self, input_str, expected):
+        """Тест строк вне канонического формата: разбор совпадает с общим случаем"""
+        result = parse_match_data(input_str)
+        assert (result["team1"], result["score1"], result["team2"],
+                result["score2"], result["stadium"], result["attendance"]) == expected
+    
+    @pytest.mark.parametrize("input_str, message", [
+        ("2024-02-30 | TeamA (3:1) TeamB | Stadium | 1000", "Invalid date format"),
+        ("2024-03-15 | TeamA (3:1) )TeamB | Stadium | 1000", "Invalid score"),
+        ("2024-03-15 | TeamA (3:1) TeamB | Stadium | 0", "Invalid attendance"),
+        ("2024-03-15 | TeamA (3:1) TeamB | Stadium | 1000 | Extra", "Invalid format"),
+    ])
+    def test_canonical_looking_invalid(self, input_str, message):
+        """Тест почти канонических строк с ошибками"""
+        with pytest.raises(ValueError, match=message):
+            parse_match_data(input_str)
+
+
+class TestParseMatchLines:
+    """Тесты для функции parse_match_lines"""
+    
+    def test_parses_lines_and_collects_errors(self):
+        """Тест построчного разбора с накоплением ошибок"""
+        lines = [
+            "2024-03-15 | TeamA (3:1) TeamB | Stadium | 1000\r\n",
+            "\n",
+            "2024-13-01 | TeamA (3:1) TeamB | Stadium | 1000\n",
+            "2024-03-16 | TeamB (0:0) TeamC | Stadium | 2000",
+        ]
+        errors = []
+        result = list(parse_match_lines(lines, errors))
+        
+        assert result == [parse_match_data(lines[0].strip()), parse_match_data(lines[3])]
+        assert errors == [(3, "2024-13-01 | TeamA (3:1) TeamB | Stadium | 1000",
+                           "Invalid date format: expected YYYY-MM-DD")]
+    
+    def test_skips_invalid_lines_without_error_list(self):
+        """Тест пропуска ошибочных строк без списка ошибок"""
+        lines = ["garbage", "2024-03-15 | TeamA (3:1) TeamB | Stadium | 1000"]
+        assert [match["team1"] for match in parse_match_lines(lines)] == ["TeamA"]
+    
+    def test_is_lazy(self):
+        """Тест ленивого разбора итератора строк"""
+        def lines():
+            yield "2024-03-15 | TeamA (3:1) TeamB | Stadium | 1000"
+            raise AssertionError("прочитана лишняя строка")
+        
+        assert next(parse_match_lines(lines()))["score1"] == 3
 
 
 class TestFilterMatchesByCriteria:
@@ -185,6 +253,104 @@ class TestFilterMatchesByCriteria:
         assert result == sample_matches
 
 
+class TestMatchTable:
+    """Тесты для колоночной таблицы матчей MatchTable"""
+    
+    @pytest.fixture
+    def sample_matches(self):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD"]
+        stadiums = ["StadiumX", "StadiumY", "StadiumZ"]
+        return [
+            {
+                "date": f"2024-03-{10 + i % 15:02d}",
+                "team1": teams[i % 4],
+                "score1": i % 5,
+                "team2": teams[(i + 1 + i // 4) % 4],
+                "score2": i % 3,
+                "stadium": stadiums[i % 3],
+                "attendance": 1000 * (i % 50 + 1)
+            }
+            for i in range(200)
+        ]
+    
+    @pytest.mark.parametrize("criteria", [
+        {},
+        {"team": "TeamA"},
+        {"team": "Unknown"},
+        {"stadium": "StadiumY"},
+        {"stadium": "Unknown"},
+        {"date_from": "2024-03-15"},
+        {"date_to": "2024-03-15"},
+        {"date_from": "2024-03-12", "date_to": "2024-03-20"},
+        {"date_from": "2024-03-1"},
+        {"min_attendance": 20000},
+        {"max_attendance": 20000.5},
+        {"min_total_goals": 4},
+        {"min_total_goals": 2.5},
+        {"team": "TeamB", "stadium": "StadiumX", "min_total_goals": 2, "max_attendance": 40000},
+        {"unknown_key": 1, "team": "TeamC"},
+        {"team": "TeamA", "date_from": "2024-03-20", "date_to": "2024-03-22", "min_attendance": 10000},
+        {"team": "TeamD", "stadium": "StadiumZ", "date_to": "2024-03-11"},
+        {"team": "Unknown", "date_from": "2024-03-12"},
+    ])
+    @pytest.mark.parametrize("index_share", [0.0, 0.25, 1.0])
+    def test_filter_matches_function(self, sample_matches, criteria, index_share):
+        """Тест совпадения результатов с filter_matches_by_criteria при сканировании и по индексам"""
+        table = MatchTable(sample_matches)
+        table.INDEX_SCAN_SHARE = index_share
+        expected = filter_matches_by_criteria(sample_matches, **criteria)
+        result = table.filter(**criteria)
+        
+        assert result == expected
+        assert all(match is expected_match for match, expected_match in zip(result, expected))
+    
+    def test_non_canonical_dates(self, sample_matches):
+        """Тест дат вне формата YYYY-MM-DD: сравнение строк как в исходной функции"""
+        sample_matches[0]["date"] = "2024-3-9"
+        table = MatchTable(sample_matches)
+        
+        assert table.dates is None
+        for criteria in ({"date_from": "2024-03-15"}, {"date_to": "2024-3-5"}):
+            assert table.filter(**criteria) == filter_matches_by_criteria(sample_matches, **criteria)
+    
+    def test_many_teams_and_goals(self):
+        """Тест более 255 команд и крупных счетов"""
+        matches = [
+            {"date": "2024-03-15", "team1": f"Team{i}", "score1": i, "team2": f"Team{i + 1}",
+             "score2": 1, "stadium": "StadiumX", "attendance": 1000}
+            for i in range(300)
+        ]
+        table = MatchTable(matches[:100])
+        table.extend(matches[100:])
+        
+        assert len(table) == 300
+        assert table.filter(team="Team280") == filter_matches_by_criteria(matches, team="Team280")
+        assert table.filter(min_total_goals=290) == filter_matches_by_criteria(matches, min_total_goals=290)
+    
+    def test_planner_starts_with_most_selective_index(self, sample_matches):
+        """Тест выбора самого селективного индекса"""
+        table = MatchTable(sample_matches)
+        
+        plans = table._index_plans({"team": "TeamA", "stadium": "StadiumX", "date_from": "2024-03-24"})
+        assert [keys for _, keys, _ in plans] == [("date_from", "date_to"), ("stadium",), ("team",)]
+        assert plans[0][0] == len(filter_matches_by_criteria(sample_matches, date_from="2024-03-24"))
+    
+    def test_indexes_follow_extend(self, sample_matches):
+        """Тест обновления индексов при дозагрузке матчей в произвольном порядке дат"""
+        table = MatchTable(sample_matches[:150])
+        for match in reversed(sample_matches[150:]):
+            table.extend([match])
+        matches = sample_matches[:150] + sample_matches[:149:-1]
+        table.INDEX_SCAN_SHARE = 1.0
+        
+        for criteria in ({"team": "TeamB"}, {"stadium": "StadiumZ"}, {"date_from": "2024-03-14", "date_to": "2024-03-16"}):
+            assert table.filter(**criteria) == filter_matches_by_criteria(matches, **criteria)
+    
+    def test_empty_table(self):
+        """Тест пустой таблицы"""
+        assert MatchTable([]).filter(team="TeamA") == []
+
+
 class TestCalculateAdvancedTeamStats:
     """Тесты для функции calculate_advanced_team_stats"""
     
@@ -298,6 +464,157 @@ class TestCalculateAdvancedTeamStats:
         assert stats["TeamB"]["points"] == 0
 
 
+class TestTeamStatsAccumulator:
+    """Тесты для инкрементального расчёта статистики TeamStatsAccumulator"""
+    
+    @pytest.fixture
+    def sample_matches(self):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD", "TeamE"]
+        return [
+            {
+                "date": f"2024-03-{10 + (i * 7) % 12:02d}",
+                "team1": teams[i % 5],
+                "score1": (i * 3) % 4,
+                "team2": teams[(i + 1 + i // 5) % 5],
+                "score2": (i * 5) % 3,
+                "stadium": "StadiumX",
+                "attendance": 1000 + 137 * i
+            }
+            for i in range(60)
+        ]
+    
+    def assert_same_stats(self, accumulator, matches):
+        """Проверка совпадения с calculate_advanced_team_stats, включая порядок команд"""
+        expected = calculate_advanced_team_stats(matches)
+        result = accumulator.stats()
+        assert result == expected
+        assert list(result) == list(expected)
+    
+    def test_add_matches_batch_function(self, sample_matches):
+        """Тест: после каждого добавленного матча статистика совпадает с пакетным расчётом"""
+        accumulator = TeamStatsAccumulator()
+        for i, match in enumerate(sample_matches, 1):
+            accumulator.add(match)
+            self.assert_same_stats(accumulator, sample_matches[:i])
+    
+    def test_bulk_load_matches_batch_function(self, sample_matches):
+        """Тест: начальная загрузка и дозагрузка совпадают с пакетным расчётом"""
+        accumulator = TeamStatsAccumulator(sample_matches[:40])
+        self.assert_same_stats(accumulator, sample_matches[:40])
+        
+        accumulator.extend(sample_matches[40:])
+        self.assert_same_stats(accumulator, sample_matches)
+        assert accumulator.team_stats("TeamA") == calculate_advanced_team_stats(sample_matches)["TeamA"]
+    
+    def test_retract_corrected_result(self, sample_matches):
+        """Тест отзыва матча и замены исправленным результатом"""
+        accumulator = TeamStatsAccumulator(sample_matches)
+        corrected = dict(sample_matches[25], score1=9)
+        
+        accumulator.retract(dict(sample_matches[25]))
+        accumulator.add(corrected)
+        self.assert_same_stats(accumulator, sample_matches[:25] + sample_matches[26:] + [corrected])
+    
+    def test_retract_latest_win_updates_streak(self):
+        """Тест: отзыв последней победы уменьшает серию побед"""
+        matches = [
+            {"date": f"2024-03-1{i}", "team1": "TeamA", "score1": 2, "team2": "TeamB",
+             "score2": 0, "stadium": "StadiumX", "attendance": 1000}
+            for i in range(3)
+        ]
+        accumulator = TeamStatsAccumulator(matches)
+        assert accumulator.team_stats("TeamA")["win_streak"] == 3
+        
+        accumulator.retract(matches[2])
+        assert accumulator.team_stats("TeamA")["win_streak"] == 2
+        self.assert_same_stats(accumulator, matches[:2])
+    
+    def test_retract_last_match_removes_team(self, sample_matches):
+        """Тест: команда без матчей исчезает из статистики"""
+        match = {"date": "2024-03-15", "team1": "TeamX", "score1": 1, "team2": "TeamA",
+                 "score2": 1, "stadium": "StadiumX", "attendance": 1000}
+        accumulator = TeamStatsAccumulator(sample_matches)
+        accumulator.add(match)
+        accumulator.retract(match)
+        
+        assert "TeamX" not in accumulator
+        self.assert_same_stats(accumulator, sample_matches)
+    
+    def test_retract_unknown_match(self, sample_matches):
+        """Тест отзыва матча, которого не было"""
+        accumulator = TeamStatsAccumulator(sample_matches)
+        with pytest.raises(ValueError, match="Match not found"):
+            accumulator.retract(dict(sample_matches[0], score1=99))
+    
+    def test_unknown_team(self):
+        """Тест статистики неизвестной команды"""
+        with pytest.raises(KeyError):
+            TeamStatsAccumulator().team_stats("TeamA")
+    
+    def test_empty(self):
+        """Тест пустого накопителя"""
+        assert TeamStatsAccumulator().stats() == calculate_advanced_team_stats([])
+
+
+class TestCalculateTeamStatsParallel:
+    """Тесты для параллельного расчёта calculate_team_stats_parallel"""
+    
+    @pytest.fixture
+    def sample_matches(self):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD"]
+        return [
+            {
+                "date": f"2024-03-{10 + (i * 7) % 12:02d}",
+                "team1": teams[i % 4],
+                "score1": 2 if i % 3 else 0,
+                "team2": teams[(i + 1 + i // 4) % 4],
+                "score2": i % 2,
+                "stadium": "StadiumX",
+                "attendance": 1000 + 137 * i
+            }
+            for i in range(50)
+        ]
+    
+    @pytest.mark.parametrize("shards", [1, 2, 3, 7, 50, 80])
+    def test_matches_batch_function(self, sample_matches, shards):
+        """Тест совпадения с calculate_advanced_team_stats при разном числе шардов"""
+        expected = calculate_advanced_team_stats(sample_matches)
+        result = calculate_team_stats_parallel(sample_matches, max_workers=2, shards=shards)
+        
+        assert result == expected
+        assert list(result) == list(expected)
+    
+    def test_win_streak_across_shards(self):
+        """Тест серии побед, проходящей через границы шардов"""
+        matches = [
+            {"date": f"2024-03-{10 + i}", "team1": "TeamA", "score1": 0 if i == 0 else 2, "team2": "TeamB",
+             "score2": 1, "stadium": "StadiumX", "attendance": 1000}
+            for i in range(9)
+        ]
+        stats = calculate_team_stats_parallel(matches, max_workers=2, shards=4)
+        
+        assert stats["TeamA"]["win_streak"] == 8
+        assert stats["TeamB"]["win_streak"] == 0
+    
+    def test_empty_matches_list(self):
+        """Тест пустого списка матчей"""
+        assert calculate_team_stats_parallel([]) == {}
+    
+    @pytest.mark.parametrize("shards", [0, -1])
+    def test_invalid_shards(self, sample_matches, shards):
+        """Тест неположительного числа шардов"""
+        with pytest.raises(ValueError, match="Number of shards must be positive"):
+            calculate_team_stats_parallel(sample_matches, max_workers=2, shards=shards)
+    
+    @pytest.mark.parametrize("max_workers", [0, -1])
+    def test_invalid_max_workers(self, sample_matches, max_workers):
+        """Тест неположительного числа процессов, в том числе при явном числе шардов"""
+        with pytest.raises(ValueError, match="Number of workers must be positive"):
+            calculate_team_stats_parallel(sample_matches, max_workers=max_workers)
+        with pytest.raises(ValueError, match="Number of workers must be positive"):
+            calculate_team_stats_parallel(sample_matches, max_workers=max_workers, shards=2)
+
+
 class TestRankTeamsAdvanced:
     """Тесты для функции rank_teams_advanced"""
     
@@ -358,6 +675,77 @@ class TestRankTeamsAdvanced:
         assert result == []
 
 
+class TestTeamRanking:
+    """Тесты для поддерживаемой таблицы TeamRanking"""
+    
+    @pytest.fixture
+    def sample_stats(self):
+        return {
+            "TeamA": {"points": 7, "goal_diff": 4, "goals_for": 7, "wins": 2},
+            "TeamB": {"points": 7, "goal_diff": 4, "goals_for": 7, "wins": 1},
+            "TeamC": {"points": 9, "goal_diff": 2, "goals_for": 5, "wins": 3},
+            "TeamD": {"points": 7, "goal_diff": 5, "goals_for": 6, "wins": 2},
+            "TeamE": {"points": 1, "goal_diff": -6, "goals_for": 1, "wins": 0}
+        }
+    
+    @pytest.mark.parametrize("tiebreaker_order", [None, ['points', 'wins'], ['goals_for', 'goal_diff', 'points']])
+    def test_matches_rank_teams_advanced(self, sample_stats, tiebreaker_order):
+        """Тест совпадения таблицы, мест и первых K с rank_teams_advanced"""
+        expected = rank_teams_advanced(sample_stats, tiebreaker_order)
+        ranking = TeamRanking(sample_stats, tiebreaker_order)
+        
+        assert ranking.table() == expected
+        assert ranking.top(3) == expected[:3]
+        assert [ranking.rank_of(team) for _, team, _, _ in expected] == [rank for rank, _, _, _ in expected]
+    
+    def test_update_repositions_team(self, sample_stats):
+        """Тест перестановки команды после изменения статистики"""
+        ranking = TeamRanking(sample_stats)
+        sample_stats["TeamE"] = {"points": 10, "goal_diff": 0, "goals_for": 3, "wins": 3}
+        ranking.update("TeamE", sample_stats["TeamE"])
+        
+        assert ranking.rank_of("TeamE") == 1
+        assert ranking.table() == rank_teams_advanced(sample_stats)
+    
+    def test_live_updates_from_accumulator(self):
+        """Тест обновления таблицы по ходу турнира вместе с TeamStatsAccumulator"""
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD"]
+        accumulator = TeamStatsAccumulator()
+        ranking = TeamRanking()
+        for i in range(30):
+            match = {"date": f"2024-03-{1 + i:02d}", "team1": teams[i % 4], "score1": i % 3,
+                     "team2": teams[(i + 1 + i // 4) % 4], "score2": i % 2, "stadium": "StadiumX", "attendance": 1000}
+            accumulator.add(match)
+            for team in (match["team1"], match["team2"]):
+                ranking.update(team, accumulator.team_stats(team))
+            
+            assert ranking.table() == rank_teams_advanced(accumulator.stats())
+    
+    def test_remove_team(self, sample_stats):
+        """Тест удаления команды из таблицы"""
+        ranking = TeamRanking(sample_stats)
+        ranking.remove("TeamC")
+        del sample_stats["TeamC"]
+        
+        assert "TeamC" not in ranking
+        assert len(ranking) == 4
+        assert ranking.table() == rank_teams_advanced(sample_stats)
+    
+    def test_unknown_team(self, sample_stats):
+        """Тест места неизвестной команды"""
+        with pytest.raises(KeyError):
+            TeamRanking(sample_stats).rank_of("TeamX")
+    
+    def test_unknown_criterion(self):
+        """Тест неизвестного критерия сортировки"""
+        with pytest.raises(ValueError, match="Unknown tiebreaker criterion: name"):
+            TeamRanking(tiebreaker_order=['points', 'name'])
+    
+    def test_empty(self):
+        """Тест пустой таблицы"""
+        assert TeamRanking().table() == rank_teams_advanced({})
+
+
 class TestGenerateAnalyticsReport:
     """Тесты для функции generate_analytics_report"""
     
@@ -557,6 +945,404 @@ class TestGenerateAnalyticsReport:
         assert report["biggest_upset"] is None
 
 
+class TestMatchReportAggregator:
+    """Тесты для потокового агрегатора отчёта MatchReportAggregator"""
+    
+    @pytest.fixture
+    def sample_data(self):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD", "TeamE"]
+        matches = [
+            {
+                "date": f"2024-03-{10 + i % 20:02d}",
+                "team1": teams[i % 5],
+                "score1": (i * 3) % 5,
+                "team2": teams[(i + 1 + i // 5) % 5],
+                "score2": (i * 7) % 4,
+                "stadium": "StadiumX",
+                "attendance": 1000 + (i * 7919) % 5000
+            }
+            for i in range(80)
+        ]
+        team_stats = calculate_advanced_team_stats(matches[:60])
+        return matches, team_stats, rank_teams_advanced(team_stats)
+    
+    def test_stream_matches_report(self, sample_data):
+        """Тест: поток матчей по частям даёт те же поля, что и generate_analytics_report"""
+        matches, team_stats, table = sample_data
+        report = generate_analytics_report(matches, team_stats, table)
+        
+        aggregator = MatchReportAggregator(table)
+        aggregator.add_many(iter(matches[:30]))
+        for match in matches[30:]:
+            aggregator.add(match)
+        result = aggregator.result()
+        
+        assert aggregator.matches_seen == len(matches)
+        for key in ("most_goals_match", "highest_attendance_match", "biggest_upset", "goal_distribution"):
+            assert result[key] == report[key]
+        assert list(result["goal_distribution"]) == list(report["goal_distribution"])
+        assert result["most_goals_match"] is report["most_goals_match"]
+    
+    def test_first_match_wins_ties(self):
+        """Тест: при равенстве остаётся первый матч, как в исходном отчёте"""
+        matches = [
+            {"date": "2024-03-15", "team1": "TeamA", "score1": 2, "team2": "TeamB",
+             "score2": 1, "stadium": "StadiumX", "attendance": 1000},
+            {"date": "2024-03-16", "team1": "TeamB", "score1": 1, "team2": "TeamA",
+             "score2": 2, "stadium": "StadiumX", "attendance": 1000}
+        ]
+        aggregator = MatchReportAggregator([])
+        aggregator.add_many(matches)
+        
+        assert aggregator.result()["most_goals_match"] is matches[0]
+        assert aggregator.result()["highest_attendance_match"] is matches[0]
+        assert aggregator.result()["biggest_upset"] is None
+    
+    def test_empty(self):
+        """Тест агрегатора без матчей"""
+        assert MatchReportAggregator([(1, "TeamA", 0, 0)]).result() == {
+            "most_goals_match": {},
+            "highest_attendance_match": {},
+            "biggest_upset": None,
+            "goal_distribution": {}
+        }
+
+
+class TestAnalyzeMatchFile:
+    """Тесты для потокового конвейера analyze_match_file"""
+    
+    @pytest.fixture
+    def match_file(self, tmp_path):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD"]
+        lines = [
+            f"2024-03-{10 + (i * 7) % 15:02d} | {teams[i % 4]} ({(i * 3) % 4}:{(i * 5) % 3}) "
+            f"{teams[(i + 1 + i // 4) % 4]} | Stadium_{i % 3} | {1000 + 97 * i}"
+            for i in range(60)
+        ]
+        lines[10] = "2024-13-01 | TeamA (1:0) TeamB | Stadium_0 | 1000"
+        lines[20] = ""
+        path = tmp_path / "matches.txt"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+    
+    @pytest.mark.parametrize("tiebreaker_order", [None, ['wins', 'goals_for']])
+    def test_matches_batch_workflow(self, match_file, tiebreaker_order):
+        """Тест совпадения с последовательным вызовом всех этапов над списком матчей"""
+        with open(match_file, encoding="utf-8") as file:
+            matches = list(parse_match_lines(file))
+        team_stats = calculate_advanced_team_stats(matches)
+        table = rank_teams_advanced(team_stats, tiebreaker_order)
+        report = generate_analytics_report(matches, team_stats, table)
+        
+        errors = []
+        result = analyze_match_file(str(match_file), tiebreaker_order, errors)
+        
+        assert result == (team_stats, table, report)
+        assert list(result[0]) == list(team_stats)
+        assert errors == [(11, "2024-13-01 | TeamA (1:0) TeamB | Stadium_0 | 1000",
+                           "Invalid date format: expected YYYY-MM-DD")]
+    
+    def test_win_streak_with_unsorted_dates(self, tmp_path):
+        """Тест серии побед, когда матчи в файле не упорядочены по дате"""
+        path = tmp_path / "matches.txt"
+        path.write_text("2024-03-17 | TeamA (2:0) TeamB | Stadium | 1000\n"
+                        "2024-03-15 | TeamA (0:1) TeamB | Stadium | 1000\n"
+                        "2024-03-16 | TeamB (0:3) TeamA | Stadium | 1000\n", encoding="utf-8")
+        
+        team_stats, _, _ = analyze_match_file(str(path))
+        assert team_stats["TeamA"]["win_streak"] == 2
+        assert team_stats["TeamB"]["win_streak"] == 0
+    
+    def test_file_without_valid_matches(self, tmp_path):
+        """Тест файла без корректных матчей"""
+        path = tmp_path / "matches.txt"
+        path.write_text("garbage\n\n", encoding="utf-8")
+        
+        assert analyze_match_file(str(path)) == ({}, [], generate_analytics_report([], {}, []))
+
+
+class TestReportCache:
+    """Тесты для кэша отчётов ReportCache"""
+    
+    @pytest.fixture
+    def sample_data(self):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD"]
+        matches = MatchLog(
+            {
+                "date": f"2024-03-{10 + i:02d}",
+                "team1": teams[i % 4],
+                "score1": (i * 3) % 4,
+                "team2": teams[(i + 1) % 4],
+                "score2": (i * 5) % 3,
+                "stadium": "StadiumX",
+                "attendance": 1000 + 97 * i
+            }
+            for i in range(20)
+        )
+        team_stats = calculate_advanced_team_stats(matches)
+        return matches, team_stats, rank_teams_advanced(team_stats)
+    
+    def test_repeated_calls_hit_cache(self, sample_data):
+        """Тест: повторный вызов с теми же данными берётся из кэша"""
+        cache = ReportCache()
+        report = cache.report(*sample_data)
+        
+        assert report == generate_analytics_report(*sample_data)
+        assert cache.report(*sample_data) == report
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_changed_result_does_not_affect_cache(self, sample_data):
+        """Тест: изменение возвращённого отчёта не портит закэшированный"""
+        cache = ReportCache()
+        expected = generate_analytics_report(*sample_data)
+        
+        first = cache.report(*sample_data)
+        first["goal_distribution"].clear()
+        second = cache.report(*sample_data)
+        second["biggest_upset"]["winner_rank"] = 0
+        second.clear()
+        
+        assert cache.report(*sample_data) == expected
+        assert (cache.hits, cache.misses) == (2, 1)
+    
+    def test_stored_matches_are_read_only(self, sample_data):
+        """Тест: матчи в MatchLog нельзя изменить на месте, только заменить"""
+        matches, team_stats, table = sample_data
+        cache = ReportCache()
+        cache.report(matches, team_stats, table)
+        
+        with pytest.raises(TypeError, match="read-only"):
+            matches[0]["score1"] = 9
+        with pytest.raises(TypeError, match="read-only"):
+            matches[0].update(score1=9)
+        
+        matches[0] = dict(matches[0], score1=9)
+        matches[1:3] = [dict(match, score2=9) for match in matches[1:3]]
+        matches.insert(0, dict(matches[0]))
+        with pytest.raises(TypeError):
+            matches[0]["score1"] = 0
+        with pytest.raises(TypeError):
+            matches[2]["score2"] = 0
+        assert cache.report(matches, team_stats, table) == generate_analytics_report(list(matches), team_stats, table)
+        assert (cache.hits, cache.misses) == (0, 2)
+    
+    def test_appended_match_changes_fingerprint(self, sample_data):
+        """Тест: добавленный матч меняет отпечаток так же, как полный пересчёт"""
+        matches, team_stats, table = sample_data
+        cache = ReportCache()
+        cache.report(matches, team_stats, table)
+        
+        matches.append(dict(matches[0], score1=7))
+        assert cache.fingerprint(matches, team_stats, table) == cache.fingerprint(list(matches), team_stats, table)
+        assert cache.report(matches, team_stats, table) == generate_analytics_report(matches, team_stats, table)
+        assert (cache.hits, cache.misses) == (0, 2)
+    
+    def test_changed_match_changes_fingerprint(self, sample_data):
+        """Тест: замена или удаление матча меняет отпечаток"""
+        matches, team_stats, table = sample_data
+        fingerprint = ReportCache.fingerprint(matches, team_stats, table)
+        
+        matches[3] = dict(matches[3], attendance=99999)
+        changed = ReportCache.fingerprint(matches, team_stats, table)
+        assert changed != fingerprint
+        assert changed == ReportCache.fingerprint(list(matches), team_stats, table)
+        
+        matches.pop()
+        assert ReportCache.fingerprint(matches, team_stats, table) == \
+            ReportCache.fingerprint(list(matches), team_stats, table)
+    
+    def test_changed_stats_miss_cache(self, sample_data):
+        """Тест: другая статистика команд или таблица - промах кэша"""
+        matches, team_stats, table = sample_data
+        cache = ReportCache()
+        cache.report(matches, team_stats, table)
+        
+        cache.report(matches, team_stats, table[::-1])
+        team_stats["TeamA"] = dict(team_stats["TeamA"], avg_attendance=1.0)
+        cache.report(matches, team_stats, table)
+        assert (cache.hits, cache.misses) == (0, 3)
+    
+    def test_fingerprint_collision_misses_cache(self, sample_data, monkeypatch):
+        """Тест: при совпадении отпечатков другое число матчей или другая таблица - промах кэша"""
+        matches, team_stats, table = sample_data
+        monkeypatch.setattr(ReportCache, "fingerprint", staticmethod(lambda *args: (0, 0, 0)))
+        cache = ReportCache()
+        
+        assert cache.report(matches, team_stats, table) == generate_analytics_report(matches, team_stats, table)
+        assert cache.report(MatchLog(matches[:5]), team_stats, table) == \
+            generate_analytics_report(matches[:5], team_stats, table)
+        assert cache.report(MatchLog(matches[:5]), team_stats, table) == \
+            generate_analytics_report(matches[:5], team_stats, table)
+        assert cache.report(matches, team_stats, table[::-1]) == \
+            generate_analytics_report(matches, team_stats, table[::-1])
+        assert (cache.hits, cache.misses) == (1, 3)
+    
+    def test_hit_does_not_walk_matches(self, sample_data, monkeypatch):
+        """Тест: попадание в кэш не перебирает и не сравнивает матчи"""
+        class WatchedLog(MatchLog):
+            walks = 0
+            
+            def __iter__(self):
+                WatchedLog.walks += 1
+                return super().__iter__()
+            
+            def __eq__(self, other):
+                WatchedLog.walks += 1
+                return super().__eq__(other)
+        
+        matches, team_stats, table = sample_data
+        matches = WatchedLog(matches)
+        cache = ReportCache()
+        expected = cache.report(matches, team_stats, table)
+        
+        WatchedLog.walks = 0
+        monkeypatch.setattr("tournament_analysis._match_hash", lambda match: pytest.fail("match hashed on hit"))
+        report = cache.report(matches, team_stats, table)
+        assert WatchedLog.walks == 0
+        assert report == expected
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_plain_list_bypasses_cache(self, sample_data):
+        """Тест: обычный список не кэшируется - ключ по нему стоил бы полного прохода"""
+        matches, team_stats, table = sample_data
+        cache = ReportCache()
+        
+        assert cache.report(list(matches), team_stats, table) == generate_analytics_report(matches, team_stats, table)
+        assert cache.report(list(matches), team_stats, table) == generate_analytics_report(matches, team_stats, table)
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 2)
+    
+    def test_lru_eviction(self, sample_data):
+        """Тест вытеснения давно не использованного отчёта"""
+        matches, team_stats, table = sample_data
+        first_half, first_quarter = MatchLog(matches[:10]), MatchLog(matches[:5])
+        cache = ReportCache(maxsize=2)
+        cache.report(matches, team_stats, table)
+        cache.report(first_half, team_stats, table)
+        cache.report(matches, team_stats, table)
+        cache.report(first_quarter, team_stats, table)
+        
+        assert len(cache) == 2
+        cache.report(matches, team_stats, table)
+        cache.report(first_half, team_stats, table)
+        assert (cache.hits, cache.misses) == (2, 4)
+    
+    def test_ttl_expiration(self, sample_data):
+        """Тест устаревания отчёта по времени"""
+        now = [100.0]
+        cache = ReportCache(ttl=10, clock=lambda: now[0])
+        cache.report(*sample_data)
+        
+        now[0] = 109.0
+        cache.report(*sample_data)
+        now[0] = 111.0
+        cache.report(*sample_data)
+        assert (cache.hits, cache.misses) == (1, 2)
+    
+    @pytest.mark.parametrize("kwargs, message", [
+        ({"maxsize": 0}, "Cache size must be positive"),
+        ({"ttl": 0}, "TTL must be positive"),
+    ])
+    def test_invalid_parameters(self, kwargs, message):
+        """Тест некорректных параметров кэша"""
+        with pytest.raises(ValueError, match=message):
+            ReportCache(**kwargs)
+
+
+class TestMatchRecord:
+    """Тесты для компактной записи матча MatchRecord"""
+    
+    @pytest.fixture
+    def sample_lines(self):
+        teams = ["TeamA", "TeamB", "TeamC", "TeamD"]
+        return [
+            f"2024-03-{10 + i % 15:02d} | {teams[i % 4]} ({(i * 3) % 4}:{(i * 5) % 3}) "
+            f"{teams[(i + 1 + i // 4) % 4]} | Stadium_{i % 3} | {1000 + 97 * i}"
+            for i in range(40)
+        ]
+    
+    def test_record_behaves_like_match_dict(self):
+        """Тест: запись читается как словарь матча и равна ему"""
+        match = parse_match_data("2024-03-15 | Team_A (3:1) Team_B | Stadium_X | 45000")
+        symbols = SymbolTable()
+        record = MatchRecord.from_dict(match, symbols)
+        
+        assert record == match
+        assert dict(record) == match
+        assert record.to_dict() == match
+        assert record["team2"] == "Team_B"
+        assert record.team1_id == symbols.ids["Team_A"]
+        with pytest.raises(KeyError):
+            record["winner"]
+    
+    def test_names_are_shared(self):
+        """Тест: одинаковые названия хранятся в общей таблице символов один раз"""
+        symbols = SymbolTable()
+        first = MatchRecord(symbols, "2024-03-15", "Team" + "A", 1, "TeamB", 0, "Stadium", 1000)
+        second = MatchRecord(symbols, "2024-03-15", "TeamB", 2, "Team" + "A", 2, "Stadium", 2000)
+        
+        assert first.team1_id == second.team2_id
+        assert first.stadium_id == second.stadium_id
+        assert first.team1 is second.team2
+        assert first.date is second.date
+        assert len(symbols) == 3
+    
+    def test_symbol_tables_are_not_shared(self, sample_lines):
+        """Тест: каждый разбор заводит свою таблицу символов, записи переносятся в другой процесс вместе с ней"""
+        first = list(parse_match_records(sample_lines))
+        second = list(parse_match_records(sample_lines[:1]))
+        
+        assert first[0].symbols is first[-1].symbols
+        assert first[0].symbols is not second[0].symbols
+        assert len(second[0].symbols) == 3
+        
+        restored = pickle.loads(pickle.dumps(first))
+        assert restored == first
+        assert restored[0].symbols is restored[-1].symbols
+    
+    def test_table_and_log_keep_own_symbols(self, sample_lines):
+        """Тест: MatchTable и MatchLog хранят названия в собственных таблицах символов"""
+        symbols = SymbolTable()
+        records = list(parse_match_records(sample_lines, symbols=symbols))
+        matches = list(parse_match_lines(sample_lines))
+        
+        shared = MatchTable(records, symbols=symbols)
+        own = MatchTable(records)
+        assert shared.symbols is symbols and own.symbols is not symbols
+        for criteria in ({"team": "TeamA"}, {"stadium": "Stadium_1"}, {"team": "TeamX"}):
+            assert shared.filter(**criteria) == own.filter(**criteria) == \
+                filter_matches_by_criteria(matches, **criteria)
+        
+        next(parse_match_records(["2024-03-15 | TeamX (1:0) TeamA | Stadium_9 | 1000"], symbols=symbols))
+        assert shared.filter(team="TeamX") == []
+        
+        log = MatchLog(matches)
+        assert log == matches
+        assert log[0]["team1"] is log.symbols.canonical(matches[0]["team1"])
+        assert log.symbols is not MatchLog(matches).symbols
+    
+    def test_functions_accept_records(self, sample_lines):
+        """Тест: фильтрация, статистика и отчёт работают с записями так же, как со словарями"""
+        matches = list(parse_match_lines(sample_lines))
+        records = list(parse_match_records(sample_lines))
+        team_stats = calculate_advanced_team_stats(matches)
+        table = rank_teams_advanced(team_stats)
+        
+        assert filter_matches_by_criteria(records, team="TeamA", date_from="2024-03-15") == \
+            filter_matches_by_criteria(matches, team="TeamA", date_from="2024-03-15")
+        assert calculate_advanced_team_stats(records) == team_stats
+        assert generate_analytics_report(records, team_stats, table) == \
+            generate_analytics_report(matches, team_stats, table)
+    
+    def test_parse_records_collects_errors(self):
+        """Тест построчного разбора в записи с накоплением ошибок"""
+        errors = []
+        records = list(parse_match_records(["2024-03-15 | TeamA (3:1) TeamB | Stadium | 1000", "garbage"], errors))
+        
+        assert [record.score1 for record in records] == [3]
+        assert errors == [(2, "garbage", "Invalid format: expected 4 parts separated by ' | '")]
+
+
 def test_integration_full_workflow():
     """Интеграционный тест полного рабочего процесса"""
     # Шаг 1: Парсинг матчей
@@ -1,23 +1,63 @@
+import bisect
+import copy
 import datetime
+import functools
+import operator
+import os
 import re
-from typing import List, Dict, Any, Tuple
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, count, repeat
+from typing import List, Dict, Any, Tuple, Iterable, Iterator, Optional, Callable, Sequence
+
+
+TEAMS_SCORE_PATTERN = re.compile(r'^\s*(.+?)\s*\(\s*(\S+)\s*:\s*(\S+)\s*\)\s*(.+?)\s*$')
+
+_TEAM = r'[^\s|():]+(?: [^\s|():]+)*'
+_NAME = r'[^\s|]+(?: [^\s|]+)*'
+CANONICAL_MATCH_PATTERN = re.compile(
+    rf'([0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}) \| ({_TEAM}) \(([0-9]+):([0-9]+)\) ({_TEAM}) \| ({_NAME}) \| ([1-9][0-9]*)'
+)
+
+
+@functools.lru_cache(maxsize=65536)
+def _is_valid_date(date_str: str) -> bool:
+    try:
+        year, month, day = map(int, date_str.split("-"))
+        datetime.date(year, month, day)
+    except (ValueError, TypeError):
+        return False
+    return True
 
 
 def parse_match_data(match_string: str) -> Dict[str, Any]:
+    canonical = CANONICAL_MATCH_PATTERN.fullmatch(match_string)
+    if canonical is not None and _is_valid_date(canonical[1]):
+        date_str, team1, score1_str, score2_str, team2, stadium_str, attendance_str = canonical.groups()
+        return {
+            "date": date_str,
+            "team1": team1,
+            "score1": int(score1_str),
+            "team2": team2,
+            "score2": int(score2_str),
+            "stadium": stadium_str,
+            "attendance": int(attendance_str)
+        }
+    
     parts = match_string.split(" | ")
     if len(parts) != 4:
         raise ValueError("Invalid format: expected 4 parts separated by ' | '")
     
     date_str, teams_score_str, stadium_str, attendance_str = parts
     
-    try:
-        year, month, day = map(int, date_str.split("-"))
-        datetime.date(year, month, day)
-    except (ValueError, TypeError):
+    if not _is_valid_date(date_str):
         raise ValueError("Invalid date format: expected YYYY-MM-DD")
 
-    teams_score_pattern = r'^\s*(.+?)\s*\(\s*(\S+)\s*:\s*(\S+)\s*\)\s*(.+?)\s*$'
-    match = re.match(teams_score_pattern, teams_score_str)
+    match = TEAMS_SCORE_PATTERN.match(teams_score_str)
     if not match:
         raise ValueError("Invalid teams/score format: expected 'Team1 (X:Y) Team2'")
     
@@ -52,6 +92,110 @@ def parse_match_data(match_string: str) -> Dict[str, Any]:
     }
 
 
+def parse_match_lines(lines: Iterable[str],
+                      errors: Optional[List[Tuple[int, str, str]]] = None) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        try:
+            match = parse_match_data(line)
+        except ValueError as error:
+            if errors is not None:
+                errors.append((line_number, line, str(error)))
+            continue
+        yield match
+
+
+class SymbolTable:
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def intern(self, name: str) -> int:
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return symbol_id
+    
+    def canonical(self, name: str) -> str:
+        return self.names[self.intern(name)]
+
+
+class MatchRecord(Mapping):
+    __slots__ = ('symbols', 'date', 'team1_id', 'score1', 'team2_id', 'score2', 'stadium_id', 'attendance')
+    
+    KEYS = ("date", "team1", "score1", "team2", "score2", "stadium", "attendance")
+    
+    def __init__(self, symbols: SymbolTable, date: str, team1: str, score1: int, team2: str, score2: int,
+                 stadium: str, attendance: int):
+        intern = symbols.intern
+        self.symbols = symbols
+        self.date = sys.intern(date)
+        self.team1_id = intern(team1)
+        self.score1 = score1
+        self.team2_id = intern(team2)
+        self.score2 = score2
+        self.stadium_id = intern(stadium)
+        self.attendance = attendance
+    
+    @classmethod
+    def from_dict(cls, match: Dict[str, Any], symbols: SymbolTable) -> "MatchRecord":
+        return cls(symbols, match["date"], match["team1"], match["score1"], match["team2"],
+                   match["score2"], match["stadium"], match["attendance"])
+    
+    @property
+    def team1(self) -> str:
+        return self.symbols.names[self.team1_id]
+    
+    @property
+    def team2(self) -> str:
+        return self.symbols.names[self.team2_id]
+    
+    @property
+    def stadium(self) -> str:
+        return self.symbols.names[self.stadium_id]
+    
+    def __getitem__(self, key: str) -> Any:
+        return _MATCH_RECORD_GETTERS[key](self)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+    
+    def __len__(self) -> int:
+        return len(self.KEYS)
+    
+    def __repr__(self) -> str:
+        return f"MatchRecord({', '.join(repr(self[key]) for key in self.KEYS)})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+
+_MATCH_RECORD_GETTERS: Dict[str, Callable[[MatchRecord], Any]] = {
+    "date": MatchRecord.date.__get__,
+    "team1": MatchRecord.team1.fget,
+    "score1": MatchRecord.score1.__get__,
+    "team2": MatchRecord.team2.fget,
+    "score2": MatchRecord.score2.__get__,
+    "stadium": MatchRecord.stadium.fget,
+    "attendance": MatchRecord.attendance.__get__
+}
+
+
+def parse_match_records(lines: Iterable[str],
+                        errors: Optional[List[Tuple[int, str, str]]] = None,
+                        symbols: Optional[SymbolTable] = None) -> Iterator[MatchRecord]:
+    if symbols is None:
+        symbols = SymbolTable()
+    for match in parse_match_lines(lines, errors):
+        yield MatchRecord.from_dict(match, symbols)
+
+
 def filter_matches_by_criteria(matches_list: List[Dict[str, Any]], **criteria) -> List[Dict[str, Any]]:
     if not matches_list:
         return []
@@ -104,6 +248,207 @@ def filter_matches_by_criteria(matches_list: List[Dict[str, Any]], **criteria) -
     return filtered_matches
 
 
+@functools.lru_cache(maxsize=65536)
+def _date_ordinal(date_str: str) -> Optional[int]:
+    try:
+        date = datetime.date.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+    return date.toordinal() if date.isoformat() == date_str else None
+
+
+def _extend_codes(column: array, values: List[int]) -> array:
+    if column.typecode == 'B' and values and (min(values) < 0 or max(values) > 255):
+        column = array('q', column)
+    column.extend(values)
+    return column
+
+
+def _column_values(column: array, positions: Optional[Sequence[int]]) -> Iterable[int]:
+    if positions is None:
+        return column
+    return map(column.__getitem__, positions)
+
+
+def _code_mask(column: array, predicate, positions: Optional[Sequence[int]] = None) -> bytes:
+    if column.typecode == 'B':
+        codes = column.tobytes() if positions is None else bytes(map(column.__getitem__, positions))
+        return codes.translate(bytes(map(predicate, range(256))))
+    return bytes(map(predicate, _column_values(column, positions)))
+
+
+def _range_mask(values: Iterable, value, lower_bound: bool) -> bytes:
+    if type(value) is int:
+        return bytes(map(value.__le__ if lower_bound else value.__ge__, values))
+    return bytes(map(operator.not_, map(operator.lt if lower_bound else operator.gt, values, repeat(value))))
+
+
+def _combine_masks(mask: bytes, other: bytes, combine) -> bytes:
+    return combine(int.from_bytes(mask, 'little'), int.from_bytes(other, 'little')).to_bytes(len(mask), 'little')
+
+
+def _index_positions(index: List[array], size: int, codes: Iterable[int], start: int,
+                     other_codes: Optional[Iterable[int]] = None) -> None:
+    index.extend(array('I') for _ in range(size - len(index)))
+    if other_codes is None:
+        for position, code in zip(count(start), codes):
+            index[code].append(position)
+        return
+    for position, code, other_code in zip(count(start), codes, other_codes):
+        index[code].append(position)
+        if other_code != code:
+            index[other_code].append(position)
+
+
+class MatchTable:
+    INDEX_SCAN_SHARE = 0.25
+    
+    def __init__(self, matches: Iterable[Dict[str, Any]] = (), symbols: Optional[SymbolTable] = None):
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.matches: List[Dict[str, Any]] = []
+        self.dates: Optional[array] = array('i')
+        self.team1 = array('B')
+        self.team2 = array('B')
+        self.score1 = array('q')
+        self.score2 = array('q')
+        self.total_goals = array('B')
+        self.attendance = array('q')
+        self.stadium = array('B')
+        self.teams: List[str] = []
+        self.stadiums: List[str] = []
+        self._team_positions: List[array] = []
+        self._stadium_positions: List[array] = []
+        self._date_keys: List[str] = []
+        self._date_order: List[int] = []
+        self.extend(matches)
+    
+    def __len__(self) -> int:
+        return len(self.matches)
+    
+    def extend(self, matches: Iterable[Dict[str, Any]]) -> None:
+        matches = list(matches)
+        start = len(self.matches)
+        self.matches.extend(matches)
+        self.team1 = _extend_codes(self.team1, self._symbol_ids(matches, "team1"))
+        self.team2 = _extend_codes(self.team2, self._symbol_ids(matches, "team2"))
+        self.stadium = _extend_codes(self.stadium, self._symbol_ids(matches, "stadium"))
+        _index_positions(self._team_positions, len(self.symbols), self.team1[start:], start, self.team2[start:])
+        _index_positions(self._stadium_positions, len(self.symbols), self.stadium[start:], start)
+        names = self.symbols.names
+        self.teams = [names[code] for code, positions in enumerate(self._team_positions) if positions]
+        self.stadiums = [names[code] for code, positions in enumerate(self._stadium_positions) if positions]
+        self._index_dates([match["date"] for match in matches], start)
+        
+        score1 = [match["score1"] for match in matches]
+        score2 = [match["score2"] for match in matches]
+        self.score1.extend(score1)
+        self.score2.extend(score2)
+        self.total_goals = _extend_codes(self.total_goals, list(map(operator.add, score1, score2)))
+        self.attendance.extend([match["attendance"] for match in matches])
+        
+        if self.dates is not None:
+            ordinals = [_date_ordinal(match["date"]) for match in matches]
+            if None in ordinals:
+                self.dates = None
+            else:
+                self.dates.extend(ordinals)
+    
+    def _symbol_ids(self, matches: List[Dict[str, Any]], key: str) -> List[int]:
+        symbols = self.symbols
+        get_id = operator.attrgetter(f"{key}_id")
+        return [get_id(match) if type(match) is MatchRecord and match.symbols is symbols
+                else symbols.intern(match[key]) for match in matches]
+    
+    def _symbol_id(self, name: str, index: List[array]) -> int:
+        code = self.symbols.ids.get(name, -1)
+        return code if code < len(index) else -1
+    
+    def _index_dates(self, dates: List[str], start: int) -> None:
+        if len(dates) > len(self._date_keys):
+            dates = [match["date"] for match in self.matches]
+            self._date_order = sorted(range(len(dates)), key=dates.__getitem__)
+            self._date_keys = [dates[position] for position in self._date_order]
+            return
+        for position, date in zip(count(start), dates):
+            index = bisect.bisect_right(self._date_keys, date)
+            self._date_keys.insert(index, date)
+            self._date_order.insert(index, position)
+    
+    def _date_mask(self, value, lower_bound: bool, positions: Optional[Sequence[int]] = None) -> bytes:
+        ordinal = _date_ordinal(value) if isinstance(value, str) else None
+        if self.dates is not None and ordinal is not None:
+            return _range_mask(_column_values(self.dates, positions), ordinal, lower_bound)
+        matches = self.matches if positions is None else map(self.matches.__getitem__, positions)
+        return _range_mask([match["date"] for match in matches], value, lower_bound)
+    
+    def _criterion_mask(self, key: str, value, positions: Optional[Sequence[int]] = None) -> Optional[bytes]:
+        if key == "team":
+            team_id = self._symbol_id(value, self._team_positions)
+            return _combine_masks(_code_mask(self.team1, team_id.__eq__, positions),
+                                  _code_mask(self.team2, team_id.__eq__, positions), operator.or_)
+        if key == "stadium":
+            return _code_mask(self.stadium, self._symbol_id(value, self._stadium_positions).__eq__, positions)
+        if key == "date_from":
+            return self._date_mask(value, True, positions)
+        if key == "date_to":
+            return self._date_mask(value, False, positions)
+        if key == "min_attendance":
+            return _range_mask(_column_values(self.attendance, positions), value, True)
+        if key == "max_attendance":
+            return _range_mask(_column_values(self.attendance, positions), value, False)
+        if key == "min_total_goals":
+            return _code_mask(self.total_goals, lambda goals: not goals < value, positions)
+        return None
+    
+    def _index_plans(self, criteria: Dict[str, Any]) -> List[Tuple[int, Tuple[str, ...], Callable[[], Sequence[int]]]]:
+        plans = []
+        for key, index in (("team", self._team_positions), ("stadium", self._stadium_positions)):
+            if key in criteria:
+                code = self._symbol_id(criteria[key], index)
+                positions = index[code] if code >= 0 else array('I')
+                plans.append((len(positions), (key,), lambda positions=positions: positions))
+        
+        if "date_from" in criteria or "date_to" in criteria:
+            keys = self._date_keys
+            low = bisect.bisect_left(keys, criteria["date_from"]) if "date_from" in criteria else 0
+            high = bisect.bisect_right(keys, criteria["date_to"]) if "date_to" in criteria else len(keys)
+            plans.append((max(high - low, 0), ("date_from", "date_to"),
+                          lambda: self._date_order[low:high]))
+        
+        plans.sort(key=operator.itemgetter(0))
+        return plans
+    
+    def filter(self, **criteria) -> List[Dict[str, Any]]:
+        plans = self._index_plans(criteria)
+        positions = None
+        resolved = set()
+        
+        if plans and plans[0][0] <= len(self.matches) * self.INDEX_SCAN_SHARE:
+            for estimate, keys, candidates in plans:
+                if positions is None:
+                    positions = sorted(candidates())
+                elif estimate <= len(positions):
+                    selected = set(candidates())
+                    positions = [position for position in positions if position in selected]
+                else:
+                    break
+                resolved.update(keys)
+        
+        mask = None
+        for key, value in criteria.items():
+            if key in resolved:
+                continue
+            criterion = self._criterion_mask(key, value, positions)
+            if criterion is not None:
+                mask = criterion if mask is None else _combine_masks(mask, criterion, operator.and_)
+        
+        if positions is None:
+            return list(self.matches) if mask is None else list(compress(self.matches, mask))
+        if mask is not None:
+            positions = compress(positions, mask)
+        return list(map(self.matches.__getitem__, positions))
+
+
 def calculate_advanced_team_stats(matches_list: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     if not matches_list:
         return {}
@@ -209,6 +554,234 @@ def calculate_advanced_team_stats(matches_list: List[Dict[str, Any]]) -> Dict[st
     return team_stats
 
 
+class _TeamTotals:
+    __slots__ = ('points', 'matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+                 'home_points', 'away_points', 'total_attendance', 'results', 'win_streak', 'first')
+    
+    def __init__(self):
+        self.points = 0
+        self.matches_played = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.goals_for = 0
+        self.goals_against = 0
+        self.home_points = 0
+        self.away_points = 0
+        self.total_attendance = 0
+        self.results: List[Tuple[str, int, int, bool, Dict[str, Any]]] = []
+        self.win_streak: Optional[int] = 0
+        self.first: Optional[Tuple[int, int]] = None
+    
+    def apply(self, match: Dict[str, Any], side: int, sign: int) -> None:
+        if side == 0:
+            team_score, opponent_score = match["score1"], match["score2"]
+        else:
+            team_score, opponent_score = match["score2"], match["score1"]
+        
+        self.matches_played += sign
+        self.total_attendance += sign * match["attendance"]
+        self.goals_for += sign * team_score
+        self.goals_against += sign * opponent_score
+        
+        if team_score > opponent_score:
+            self.wins += sign
+            match_points = 3
+        elif team_score == opponent_score:
+            self.draws += sign
+            match_points = 1
+        else:
+            self.losses += sign
+            match_points = 0
+        
+        self.points += sign * match_points
+        if side == 0:
+            self.home_points += sign * match_points
+        else:
+            self.away_points += sign * match_points
+    
+    def merge(self, later: "_TeamTotals") -> None:
+        self.points += later.points
+        self.matches_played += later.matches_played
+        self.wins += later.wins
+        self.draws += later.draws
+        self.losses += later.losses
+        self.goals_for += later.goals_for
+        self.goals_against += later.goals_against
+        self.home_points += later.home_points
+        self.away_points += later.away_points
+        self.total_attendance += later.total_attendance
+        if later.win_streak == later.matches_played:
+            self.win_streak += later.win_streak
+        else:
+            self.win_streak = later.win_streak
+    
+    def current_win_streak(self) -> int:
+        if self.win_streak is None:
+            streak = 0
+            for result in reversed(self.results):
+                if not result[3]:
+                    break
+                streak += 1
+            self.win_streak = streak
+        return self.win_streak
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "points": self.points,
+            "matches_played": self.matches_played,
+            "wins": self.wins,
+            "draws": self.draws,
+            "losses": self.losses,
+            "goals_for": self.goals_for,
+            "goals_against": self.goals_against,
+            "goal_diff": self.goals_for - self.goals_against,
+            "home_points": self.home_points,
+            "away_points": self.away_points,
+            "win_streak": self.current_win_streak(),
+            "avg_attendance": round(self.total_attendance / self.matches_played, 2) if self.matches_played > 0 else 0.0
+        }
+
+
+class TeamStatsAccumulator:
+    def __init__(self, matches: Iterable[Dict[str, Any]] = ()):
+        self._teams: Dict[str, _TeamTotals] = {}
+        self._next_seq = 0
+        self.extend(matches)
+    
+    def __len__(self) -> int:
+        return len(self._teams)
+    
+    def __contains__(self, team: str) -> bool:
+        return team in self._teams
+    
+    def _record(self, match: Dict[str, Any], seq: int, side: int) -> Tuple[_TeamTotals, Tuple]:
+        team = match["team1"] if side == 0 else match["team2"]
+        totals = self._teams.get(team)
+        if totals is None:
+            totals = self._teams[team] = _TeamTotals()
+            totals.first = (seq, side)
+        totals.apply(match, side, 1)
+        
+        if side == 0:
+            won = match["score1"] > match["score2"]
+        else:
+            won = match["score2"] > match["score1"]
+        return totals, (match["date"], seq, side, won, match)
+    
+    def add(self, match: Dict[str, Any]) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        for side in (0, 1):
+            totals, result = self._record(match, seq, side)
+            index = bisect.bisect_right(totals.results, result[:3])
+            totals.results.insert(index, result)
+            if totals.win_streak is not None and index == len(totals.results) - 1:
+                totals.win_streak = totals.win_streak + 1 if result[3] else 0
+            else:
+                totals.win_streak = None
+    
+    def extend(self, matches: Iterable[Dict[str, Any]]) -> None:
+        touched = set()
+        for match in matches:
+            seq = self._next_seq
+            self._next_seq += 1
+            for side in (0, 1):
+                totals, result = self._record(match, seq, side)
+                totals.results.append(result)
+                touched.add(totals)
+        
+        for totals in touched:
+            totals.results.sort(key=operator.itemgetter(0, 1, 2))
+            totals.win_streak = None
+    
+    def retract(self, match: Dict[str, Any]) -> None:
+        seq = self._find(match)
+        for side, team in enumerate((match["team1"], match["team2"])):
+            totals = self._teams[team]
+            index = bisect.bisect_left(totals.results, (match["date"], seq, side))
+            del totals.results[index]
+            totals.apply(match, side, -1)
+            
+            if not totals.results:
+                del self._teams[team]
+                continue
+            totals.win_streak = None
+            if totals.first == (seq, side):
+                totals.first = min(result[1:3] for result in totals.results)
+    
+    def _find(self, match: Dict[str, Any]) -> int:
+        totals = self._teams.get(match["team1"])
+        if totals is not None:
+            results = totals.results
+            low = bisect.bisect_left(results, (match["date"],))
+            high = bisect.bisect_right(results, (match["date"], self._next_seq))
+            candidates = [result for result in results[low:high] if result[2] == 0 and result[4] == match]
+            for result in reversed(candidates):
+                if result[4] is match:
+                    return result[1]
+            if candidates:
+                return candidates[-1][1]
+        raise ValueError(f"Match not found: {match!r}")
+    
+    def team_stats(self, team: str) -> Dict[str, Any]:
+        if team not in self._teams:
+            raise KeyError(team)
+        return self._teams[team].as_dict()
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        teams = sorted(self._teams.items(), key=lambda item: item[1].first)
+        return {team: totals.as_dict() for team, totals in teams}
+
+
+def _shard_team_totals(rows: List[Tuple[str, str, int, str, int, int]]) -> Dict[str, _TeamTotals]:
+    teams = {}
+    for date, team1, score1, team2, score2, attendance in rows:
+        match = {"score1": score1, "score2": score2, "attendance": attendance}
+        for side, team in ((0, team1), (1, team2)):
+            totals = teams.get(team)
+            if totals is None:
+                totals = teams[team] = _TeamTotals()
+            totals.apply(match, side, 1)
+            won = score1 > score2 if side == 0 else score2 > score1
+            totals.win_streak = totals.win_streak + 1 if won else 0
+    return teams
+
+
+def calculate_team_stats_parallel(matches_list: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                                  shards: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    elif max_workers < 1:
+        raise ValueError("Number of workers must be positive")
+    if shards is None:
+        shards = max_workers
+    elif shards < 1:
+        raise ValueError("Number of shards must be positive")
+    
+    if not matches_list:
+        return {}
+    
+    teams = dict.fromkeys(team for match in matches_list for team in (match["team1"], match["team2"]))
+    rows = sorted(((match["date"], match["team1"], match["score1"], match["team2"], match["score2"], match["attendance"])
+                   for match in matches_list), key=operator.itemgetter(0))
+    shard_size = -(-len(rows) // shards)
+    chunks = [rows[start:start + shard_size] for start in range(0, len(rows), shard_size)]
+    
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        partials = list(executor.map(_shard_team_totals, chunks))
+    
+    merged: Dict[str, _TeamTotals] = {}
+    for partial in partials:
+        for team, totals in partial.items():
+            if team in merged:
+                merged[team].merge(totals)
+            else:
+                merged[team] = totals
+    
+    return {team: merged[team].as_dict() for team in teams}
+
+
 def rank_teams_advanced(team_stats: Dict[str, Dict[str, Any]], 
                        tiebreaker_order: List[str] = None) -> List[Tuple[int, str, int, int]]:
     if not team_stats:
@@ -268,41 +841,181 @@ def rank_teams_advanced(team_stats: Dict[str, Dict[str, Any]],
     return result
 
 
+class TeamRanking:
+    CRITERIA = ('points', 'goal_diff', 'goals_for', 'wins')
+    
+    def __init__(self, team_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+                 tiebreaker_order: List[str] = None):
+        if tiebreaker_order is None:
+            tiebreaker_order = ['points', 'goal_diff', 'goals_for']
+        for criterion in tiebreaker_order:
+            if criterion not in self.CRITERIA:
+                raise ValueError(f"Unknown tiebreaker criterion: {criterion}")
+        
+        self.tiebreaker_order = list(tiebreaker_order)
+        self._entries: List[Tuple[Tuple[int, ...], int, str]] = []
+        self._teams: Dict[str, Tuple[Tuple[Tuple[int, ...], int, str], int, int]] = {}
+        self._next_seq = 0
+        if team_stats:
+            self.update_many(team_stats)
+    
+    def __len__(self) -> int:
+        return len(self._teams)
+    
+    def __contains__(self, team: str) -> bool:
+        return team in self._teams
+    
+    def _key(self, stats: Dict[str, Any]) -> Tuple[int, ...]:
+        return tuple(-stats[criterion] for criterion in self.tiebreaker_order)
+    
+    def update(self, team: str, stats: Dict[str, Any]) -> None:
+        key = self._key(stats)
+        current = self._teams.get(team)
+        if current is None:
+            entry = (key, self._next_seq, team)
+            self._next_seq += 1
+            bisect.insort(self._entries, entry)
+        elif current[0][0] != key:
+            del self._entries[bisect.bisect_left(self._entries, current[0])]
+            entry = (key, current[0][1], team)
+            bisect.insort(self._entries, entry)
+        else:
+            entry = current[0]
+        self._teams[team] = (entry, stats['points'], stats['goal_diff'])
+    
+    def update_many(self, team_stats: Dict[str, Dict[str, Any]]) -> None:
+        for team, stats in team_stats.items():
+            self.update(team, stats)
+    
+    def remove(self, team: str) -> None:
+        entry = self._teams.pop(team)[0]
+        del self._entries[bisect.bisect_left(self._entries, entry)]
+    
+    def rank_of(self, team: str) -> int:
+        return bisect.bisect_left(self._entries, (self._teams[team][0][0],)) + 1
+    
+    def top(self, k: int) -> List[Tuple[int, str, int, int]]:
+        result = []
+        current_rank = 1
+        prev_key = None
+        
+        for i, (key, seq, team) in enumerate(self._entries[:max(k, 0)]):
+            if key != prev_key:
+                current_rank = i + 1
+                prev_key = key
+            _, points, goal_diff = self._teams[team]
+            result.append((current_rank, team, points, goal_diff))
+        
+        return result
+    
+    def table(self) -> List[Tuple[int, str, int, int]]:
+        return self.top(len(self._entries))
+
+
+class MatchReportAggregator:
+    def __init__(self, tournament_table: List[Tuple[int, str, int, int]]):
+        self.rank_dict: Dict[str, int] = {team: rank for rank, team, points, goal_diff in tournament_table}
+        self.matches_seen = 0
+        self.most_goals_match: Optional[Dict[str, Any]] = None
+        self.max_goals = -1
+        self.highest_attendance_match: Optional[Dict[str, Any]] = None
+        self.max_attendance = -1
+        self.biggest_upset: Optional[Dict[str, Any]] = None
+        self.max_rank_diff = -1
+        self.goal_distribution: Dict[int, int] = {}
+    
+    def add(self, match: Dict[str, Any]) -> None:
+        self.add_many((match,))
+    
+    def add_many(self, matches: Iterable[Dict[str, Any]]) -> None:
+        rank_of = self.rank_dict.get
+        goal_distribution = self.goal_distribution
+        goal_count = goal_distribution.get
+        matches_seen = self.matches_seen
+        most_goals_match, max_goals = self.most_goals_match, self.max_goals
+        highest_attendance_match, max_attendance = self.highest_attendance_match, self.max_attendance
+        biggest_upset, max_rank_diff = self.biggest_upset, self.max_rank_diff
+        
+        try:
+            for match in matches:
+                matches_seen += 1
+                score1 = match["score1"]
+                score2 = match["score2"]
+                total_goals = score1 + score2
+                goal_distribution[total_goals] = goal_count(total_goals, 0) + 1
+                
+                if total_goals > max_goals:
+                    max_goals = total_goals
+                    most_goals_match = match
+                
+                attendance = match["attendance"]
+                if attendance > max_attendance:
+                    max_attendance = attendance
+                    highest_attendance_match = match
+                
+                if score1 == score2:
+                    continue
+                rank1 = rank_of(match["team1"])
+                rank2 = rank_of(match["team2"])
+                if rank1 is None or rank2 is None:
+                    continue
+                
+                if score1 > score2:
+                    winner_rank, loser_rank = rank1, rank2
+                else:
+                    winner_rank, loser_rank = rank2, rank1
+                
+                rank_diff = winner_rank - loser_rank
+                if rank_diff > 0 and rank_diff > max_rank_diff:
+                    max_rank_diff = rank_diff
+                    biggest_upset = {
+                        "match": match,
+                        "winner_rank": winner_rank,
+                        "loser_rank": loser_rank
+                    }
+        finally:
+            self.matches_seen = matches_seen
+            self.most_goals_match, self.max_goals = most_goals_match, max_goals
+            self.highest_attendance_match, self.max_attendance = highest_attendance_match, max_attendance
+            self.biggest_upset, self.max_rank_diff = biggest_upset, max_rank_diff
+    
+    def result(self) -> Dict[str, Any]:
+        return {
+            "most_goals_match": self.most_goals_match or {},
+            "highest_attendance_match": self.highest_attendance_match or {},
+            "biggest_upset": self.biggest_upset,
+            "goal_distribution": dict(self.goal_distribution)
+        }
+
+
 def generate_analytics_report(matches_list: List[Dict[str, Any]], 
                             team_stats: Dict[str, Dict[str, Any]], 
                             tournament_table: List[Tuple[int, str, int, int]]) -> Dict[str, Any]:
     if not matches_list or not team_stats or not tournament_table:
-        return {
-            "tournament_leader": "",
-            "most_goals_match": {},
-            "highest_attendance_match": {},
-            "most_efficient_team": "",
-            "biggest_upset": None,
-            "goal_distribution": {},
-            "attendance_by_team": {}
-        }
-    
-    rank_dict = {}
-    for rank, team, points, goal_diff in tournament_table:
-        rank_dict[team] = rank
+        return _empty_report()
     
+    aggregator = MatchReportAggregator(tournament_table)
+    aggregator.add_many(matches_list)
+    return _assemble_report(aggregator, team_stats, tournament_table)
+
+
+def _empty_report() -> Dict[str, Any]:
+    return {
+        "tournament_leader": "",
+        "most_goals_match": {},
+        "highest_attendance_match": {},
+        "most_efficient_team": "",
+        "biggest_upset": None,
+        "goal_distribution": {},
+        "attendance_by_team": {}
+    }
+
+
+def _assemble_report(aggregator: MatchReportAggregator,
+                     team_stats: Dict[str, Dict[str, Any]],
+                     tournament_table: List[Tuple[int, str, int, int]]) -> Dict[str, Any]:
     tournament_leader = tournament_table[0][1] if tournament_table else ""
     
-    most_goals_match = None
-    max_goals = -1
-    for match in matches_list:
-        total_goals = match["score1"] + match["score2"]
-        if total_goals > max_goals:
-            max_goals = total_goals
-            most_goals_match = match
-    
-    highest_attendance_match = None
-    max_attendance = -1
-    for match in matches_list:
-        if match["attendance"] > max_attendance:
-            max_attendance = match["attendance"]
-            highest_attendance_match = match
-    
     most_efficient_team = ""
     max_efficiency = -1.0
     for team, stats in team_stats.items():
@@ -312,53 +1025,244 @@ def generate_analytics_report(matches_list: List[Dict[str, Any]],
                 max_efficiency = efficiency
                 most_efficient_team = team
     
-    biggest_upset = None
-    max_rank_diff = -1
-    
-    for match in matches_list:
-        team1 = match["team1"]
-        team2 = match["team2"]
-        score1 = match["score1"]
-        score2 = match["score2"]
-        
-        if score1 == score2 or team1 not in rank_dict or team2 not in rank_dict:
-            continue
-        
-        if score1 > score2:
-            winner = team1
-            loser = team2
-        else:
-            winner = team2
-            loser = team1
-        
-        winner_rank = rank_dict[winner]
-        loser_rank = rank_dict[loser]
-        
-        if winner_rank > loser_rank:
-            rank_diff = winner_rank - loser_rank
-            if rank_diff > max_rank_diff:
-                max_rank_diff = rank_diff
-                biggest_upset = {
-                    "match": match,
-                    "winner_rank": winner_rank,
-                    "loser_rank": loser_rank
-                }
-    
-    goal_distribution = {}
-    for match in matches_list:
-        total_goals = match["score1"] + match["score2"]
-        goal_distribution[total_goals] = goal_distribution.get(total_goals, 0) + 1
-    
     attendance_by_team = {}
     for team, stats in team_stats.items():
         attendance_by_team[team] = stats["avg_attendance"]
     
+    matches_report = aggregator.result()
     return {
         "tournament_leader": tournament_leader,
-        "most_goals_match": most_goals_match or {},
-        "highest_attendance_match": highest_attendance_match or {},
+        "most_goals_match": matches_report["most_goals_match"],
+        "highest_attendance_match": matches_report["highest_attendance_match"],
         "most_efficient_team": most_efficient_team,
-        "biggest_upset": biggest_upset,
-        "goal_distribution": goal_distribution,
+        "biggest_upset": matches_report["biggest_upset"],
+        "goal_distribution": matches_report["goal_distribution"],
         "attendance_by_team": attendance_by_team
-    }
\ No newline at end of file
+    }
+
+
+def _read_match_file(path: str, errors: Optional[List[Tuple[int, str, str]]] = None) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        yield from parse_match_lines(file, errors)
+
+
+def _team_sides(match: Dict[str, Any]) -> Tuple[Tuple[str, int, bool], Tuple[str, int, bool]]:
+    return ((match["team1"], 0, match["score1"] > match["score2"]),
+            (match["team2"], 1, match["score2"] > match["score1"]))
+
+
+def analyze_match_file(path: str, tiebreaker_order: List[str] = None,
+                       errors: Optional[List[Tuple[int, str, str]]] = None
+                       ) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[int, str, int, int]], Dict[str, Any]]:
+    teams: Dict[str, _TeamTotals] = {}
+    last_non_wins: Dict[str, Tuple[str, int, int]] = {}
+    
+    for seq, match in enumerate(_read_match_file(path, errors)):
+        for team, side, won in _team_sides(match):
+            totals = teams.get(team)
+            if totals is None:
+                totals = teams[team] = _TeamTotals()
+            totals.apply(match, side, 1)
+            if not won:
+                key = (match["date"], seq, side)
+                if team not in last_non_wins or key > last_non_wins[team]:
+                    last_non_wins[team] = key
+    
+    if not teams:
+        return {}, [], _empty_report()
+    
+    tournament_table = rank_teams_advanced({team: totals.as_dict() for team, totals in teams.items()},
+                                           tiebreaker_order)
+    win_streaks = dict.fromkeys(teams, 0)
+    
+    def count_win_streaks(matches: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for seq, match in enumerate(matches):
+            for team, side, won in _team_sides(match):
+                if won and (team not in last_non_wins or (match["date"], seq, side) > last_non_wins[team]):
+                    win_streaks[team] += 1
+            yield match
+    
+    aggregator = MatchReportAggregator(tournament_table)
+    aggregator.add_many(count_win_streaks(_read_match_file(path)))
+    for team, totals in teams.items():
+        totals.win_streak = win_streaks[team]
+    
+    team_stats = {team: totals.as_dict() for team, totals in teams.items()}
+    return team_stats, tournament_table, _assemble_report(aggregator, team_stats, tournament_table)
+
+
+def _match_hash(match: Dict[str, Any]) -> int:
+    return hash(tuple(match.items()))
+
+
+def _fingerprint_matches(matches: Iterable[Dict[str, Any]], fingerprint: int = 0) -> int:
+    for match in matches:
+        fingerprint = hash((fingerprint, _match_hash(match)))
+    return fingerprint
+
+
+class _FrozenMatch(dict):
+    __slots__ = ()
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Matches in MatchLog are read-only, replace the match instead")
+    
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+    
+    def __copy__(self) -> "_FrozenMatch":
+        return self
+    
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_FrozenMatch":
+        return self
+    
+    def __reduce__(self):
+        return _FrozenMatch, (dict(self),)
+
+
+_SYMBOL_KEYS = ("team1", "team2", "stadium")
+
+
+def _freeze_match(match: Dict[str, Any], symbols: SymbolTable) -> _FrozenMatch:
+    if type(match) is _FrozenMatch:
+        return match
+    frozen = _FrozenMatch(match)
+    for key in _SYMBOL_KEYS:
+        name = frozen.get(key)
+        if type(name) is str:
+            dict.__setitem__(frozen, key, symbols.canonical(name))
+    return frozen
+
+
+class MatchLog(list):
+    def __init__(self, matches: Iterable[Dict[str, Any]] = (), symbols: Optional[SymbolTable] = None):
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        super().__init__(self._freeze(match) for match in matches)
+        self._fingerprint: Optional[int] = None
+    
+    def _freeze(self, match: Dict[str, Any]) -> _FrozenMatch:
+        return _freeze_match(match, self.symbols)
+    
+    @property
+    def fingerprint(self) -> int:
+        if self._fingerprint is None:
+            self._fingerprint = _fingerprint_matches(self)
+        return self._fingerprint
+    
+    def append(self, match: Dict[str, Any]) -> None:
+        match = self._freeze(match)
+        super().append(match)
+        if self._fingerprint is not None:
+            self._fingerprint = hash((self._fingerprint, _match_hash(match)))
+    
+    def extend(self, matches: Iterable[Dict[str, Any]]) -> None:
+        start = len(self)
+        super().extend(map(self._freeze, matches))
+        if self._fingerprint is not None:
+            self._fingerprint = _fingerprint_matches(self[start:], self._fingerprint)
+    
+    def __iadd__(self, matches: Iterable[Dict[str, Any]]) -> "MatchLog":
+        self.extend(matches)
+        return self
+    
+    def __setitem__(self, index, value) -> None:
+        self._fingerprint = None
+        if isinstance(index, slice):
+            value = [self._freeze(match) for match in value]
+        else:
+            value = self._freeze(value)
+        super().__setitem__(index, value)
+    
+    def __delitem__(self, index) -> None:
+        self._fingerprint = None
+        super().__delitem__(index)
+    
+    def __imul__(self, count: int) -> "MatchLog":
+        self._fingerprint = None
+        return super().__imul__(count)
+    
+    def insert(self, index: int, match: Dict[str, Any]) -> None:
+        self._fingerprint = None
+        super().insert(index, self._freeze(match))
+    
+    def pop(self, index: int = -1) -> Dict[str, Any]:
+        self._fingerprint = None
+        return super().pop(index)
+    
+    def remove(self, match: Dict[str, Any]) -> None:
+        self._fingerprint = None
+        super().remove(match)
+    
+    def clear(self) -> None:
+        self._fingerprint = None
+        super().clear()
+    
+    def sort(self, *args, **kwargs) -> None:
+        self._fingerprint = None
+        super().sort(*args, **kwargs)
+    
+    def reverse(self) -> None:
+        self._fingerprint = None
+        super().reverse()
+
+
+class ReportCache:
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("TTL must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._reports: "OrderedDict[Tuple[int, int, int, int], Tuple[Dict[str, Any], Optional[float], Tuple]]" = \
+            OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._reports)
+    
+    def clear(self) -> None:
+        self._reports.clear()
+    
+    @staticmethod
+    def fingerprint(matches_list: List[Dict[str, Any]],
+                    team_stats: Dict[str, Dict[str, Any]],
+                    tournament_table: List[Tuple[int, str, int, int]]) -> Tuple[int, int, int]:
+        if isinstance(matches_list, MatchLog):
+            matches_fingerprint = matches_list.fingerprint
+        else:
+            matches_fingerprint = _fingerprint_matches(matches_list)
+        stats_fingerprint = hash(tuple((team, tuple(stats.items())) for team, stats in team_stats.items()))
+        return matches_fingerprint, stats_fingerprint, hash(tuple(tournament_table))
+    
+    def report(self, matches_list: List[Dict[str, Any]],
+               team_stats: Dict[str, Dict[str, Any]],
+               tournament_table: List[Tuple[int, str, int, int]]) -> Dict[str, Any]:
+        # Only a MatchLog is cached: its rolling fingerprint identifies the matches without
+        # walking them. Keying any other sequence costs a full pass over it, as much as the
+        # report itself, so it is computed directly and counted as a miss.
+        if not isinstance(matches_list, MatchLog):
+            self.misses += 1
+            return generate_analytics_report(matches_list, team_stats, tournament_table)
+        
+        key = (len(matches_list), *self.fingerprint(matches_list, team_stats, tournament_table))
+        now = self._clock()
+        cached = self._reports.get(key)
+        if cached is not None:
+            report, expires_at, (stats, table) = cached
+            # Statistics and table are per team, so comparing them is cheap
+            if (expires_at is None or now < expires_at) and table == tournament_table and stats == team_stats:
+                self._reports.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(report)
+            del self._reports[key]
+        
+        self.misses += 1
+        report = generate_analytics_report(matches_list, team_stats, tournament_table)
+        inputs = ({team: dict(stats) for team, stats in team_stats.items()}, list(tournament_table))
+        self._reports[key] = (copy.deepcopy(report), now + self.ttl if self.ttl is not None else None, inputs)
+        if len(self._reports) > self.maxsize:
+            self._reports.popitem(last=False)
+        return report
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""
+Журналируемая библиотека: журнал операций и снимки состояния
+
+Каждая успешная операция (add_book, register_reader, borrow_book, return_book)
+дописывается строкой JSON в journal.jsonl вместе с номером (LSN) и временем
+операции; неуспешная выдача или возврат, успевшие изменить число доступных
+копий, тоже пишутся - проигрывание повторяет их с тем же результатом. Раз в snapshot_every операций все состояние сохраняется в снимок
+SQLite с LSN последней вошедшей в него операции, а журнал очищается. При
+запуске загружается снимок и проигрываются только операции журнала после него.
+"""
+
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from library_system import Book, Library, Reader, ReaderHistory, _from_micros, _to_micros
+
+
+_decode_record = json.JSONDecoder().decode  # без определения кодировки, как в json.loads(bytes)
+
+_SNAPSHOT_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE books (isbn TEXT NOT NULL, title TEXT NOT NULL, author TEXT NOT NULL,
+                    year INTEGER NOT NULL, total_copies INTEGER NOT NULL, available_copies INTEGER NOT NULL);
+CREATE TABLE readers (reader_id TEXT NOT NULL, name TEXT NOT NULL, email TEXT NOT NULL, borrowed TEXT NOT NULL,
+                      history_isbns BLOB NOT NULL, history_actions BLOB NOT NULL, history_times BLOB NOT NULL);
+CREATE TABLE isbns (id INTEGER PRIMARY KEY, isbn TEXT NOT NULL);
+CREATE TABLE loans (seq INTEGER PRIMARY KEY, reader_id TEXT NOT NULL, isbn TEXT NOT NULL, due INTEGER NOT NULL);
+CREATE TABLE popularity (count INTEGER NOT NULL, position INTEGER NOT NULL, isbn TEXT NOT NULL);
+"""
+
+
+class JournaledLibrary(Library):
+    """
+    Библиотека, переживающая перезапуск
+    
+    Состояние хранится в каталоге directory: snapshot.sqlite3 и journal.jsonl.
+    fsync=True дополнительно сбрасывает каждую запись журнала на диск.
+    snapshot_every=None отключает автоматические снимки (см. snapshot()).
+    Снимки хранят журналы читателей в машинном порядке байтов, поэтому
+    переносить их между архитектурами нельзя - только журнал.
+    """
+    
+    JOURNAL_FILE = "journal.jsonl"
+    SNAPSHOT_FILE = "snapshot.sqlite3"
+    
+    def __init__(self, name: str, directory: str, snapshot_every: Optional[int] = 100_000,
+                 fsync: bool = False, thread_safe: bool = False):
+        super().__init__(name, thread_safe)
+        if snapshot_every is not None and snapshot_every < 1:
+            raise ValueError("Интервал снимков должен быть положительным")
+        
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._journal_path = os.path.join(directory, self.JOURNAL_FILE)
+        self._snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self._journal_lock = threading.Lock()
+        self._lsn = 0  # номер последней операции
+        self._since_snapshot = 0  # операций в журнале после снимка
+        
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self._snapshot_path):
+            self._restore_snapshot()
+        if os.path.exists(self._journal_path):
+            self._replay_journal()
+        self._journal = open(self._journal_path, 'ab')
+    
+    @property
+    def lsn(self) -> int:
+        """Номер последней записанной операции"""
+        return self._lsn
+    
+    def close(self) -> None:
+        """Закрытие журнала"""
+        if not self._journal.closed:
+            self._journal.close()
+    
+    def __enter__(self) -> 'JournaledLibrary':
+        return self
+    
+    def __exit__(self, *exc_info) -> bool:
+        self.close()
+        return False
+    
+    # ============= ЗАПИСЬ ОПЕРАЦИЙ =============
+    
+    def add_book(self, book: Book) -> bool:
+        result = super().add_book(book)
+        self._maybe_snapshot()
+        return result
+    
+    def register_reader(self, reader: Reader) -> bool:
+        result = super().register_reader(reader)
+        self._maybe_snapshot()
+        return result
+    
+    def bulk_load_books(self, books) -> int:
+        result = super().bulk_load_books(books)
+        self._maybe_snapshot()
+        return result
+    
+    def bulk_register_readers(self, readers) -> int:
+        result = super().bulk_register_readers(readers)
+        self._maybe_snapshot()
+        return result
+    
+    def borrow_book(self, reader_id: str, isbn: str) -> Tuple[bool, str]:
+        result = super().borrow_book(reader_id, isbn)
+        self._maybe_snapshot()
+        return result
+    
+    def return_book(self, reader_id: str, isbn: str) -> Tuple[bool, float]:
+        result = super().return_book(reader_id, isbn)
+        self._maybe_snapshot()
+        return result
+    
+    def apply_batch(self, ops, with_messages: bool = False) -> List[Tuple[bool, Any]]:
+        results = super().apply_batch(ops, with_messages)
+        self._maybe_snapshot()
+        return results
+    
+    # Операции пишутся в журнал под теми же блокировками, под которыми
+    # применяются, поэтому снимок (под всеми блокировками) не может попасть
+    # между изменением состояния и его записью
+    
+    def _load_book(self, book: Book) -> bool:
+        fields = {'isbn': book.isbn, 'title': book.title, 'author': book.author, 'year': book.year,
+                  'copies': book.total_copies, 'available': book.available_copies}
+        result = super()._load_book(book)
+        self._log('add_book', fields)
+        return result
+    
+    def _register_reader(self, reader: Reader) -> bool:
+        result = super()._register_reader(reader)
+        if result:
+            self._log('register', {
+                'reader_id': reader.reader_id, 'name': reader.name, 'email': reader.email,
+                'borrowed': reader.borrowed_books,
+                'history': [[isbn, action, _to_micros(timestamp)] for isbn, action, timestamp in reader.history],
+            })
+        return result
+    
+    def _borrow_book(self, reader_id: str, isbn: str, now: Optional[datetime] = None,
+                     with_message: bool = True) -> Tuple[bool, Optional[str]]:
+        if now is None:
+            now = self._now()
+        copies = self._available_copies(isbn)
+        result = super()._borrow_book(reader_id, isbn, now, with_message)
+        if result[0] or self._available_copies(isbn) != copies:
+            self._log('borrow', {'ts': _to_micros(now), 'reader_id': reader_id, 'isbn': isbn})
+        return result
+    
+    def _return_book(self, reader_id: str, isbn: str, now: Optional[datetime] = None) -> Tuple[bool, float]:
+        if now is None:
+            now = self._now()
+        copies = self._available_copies(isbn)
+        result = super()._return_book(reader_id, isbn, now)
+        if result[0] or self._available_copies(isbn) != copies:
+            self._log('return', {'ts': _to_micros(now), 'reader_id': reader_id, 'isbn': isbn})
+        return result
+    
+    def _available_copies(self, isbn: str) -> Optional[int]:
+        """Число доступных копий книги (None - книги нет): неуспешная операция может его изменить"""
+        book = self.books.get(isbn)
+        return book.available_copies if book is not None else None
+    
+    def _log(self, op: str, fields: Dict[str, Any]) -> None:
+        """Дописывание операции в журнал"""
+        with self._journal_lock:
+            self._lsn += 1
+            record = {'lsn': self._lsn, 'op': op, **fields}
+            self._journal.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._since_snapshot += 1
+    
+    def _maybe_snapshot(self) -> None:
+        """Снимок, если с прошлого набралось snapshot_every операций"""
+        if self.snapshot_every is not None and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+    
+    # ============= СНИМКИ =============
+    
+    def snapshot(self) -> int:
+        """
+        Сохранение состояния в снимок и очистка журнала
+        Снимок пишется во временный файл и атомарно подменяет старый.
+        Возвращает LSN снимка
+        """
+        with self._lock_all(), self._journal_lock:
+            temp_path = self._snapshot_path + ".tmp"
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            
+            connection = sqlite3.connect(temp_path)
+            try:
+                self._write_snapshot(connection)
+                connection.commit()
+            finally:
+                connection.close()
+            os.replace(temp_path, self._snapshot_path)
+            
+            # Сбой до очистки не страшен: операции с LSN снимка и меньше не проигрываются
+            self._journal.truncate(0)
+            self._since_snapshot = 0
+            return self._lsn
+    
+    def _write_snapshot(self, connection: sqlite3.Connection) -> None:
+        connection.executescript(_SNAPSHOT_SCHEMA)
+        connection.executemany("INSERT INTO meta VALUES (?, ?)",
+                               [('lsn', self._lsn), ('loan_seq', self._loan_seq)])
+        connection.executemany(
+            "INSERT INTO books VALUES (?, ?, ?, ?, ?, ?)",
+            ((book.isbn, book.title, book.author, book.year, book.total_copies, book.available_copies)
+             for book in self.books.values()))
+        connection.executemany(
+            "INSERT INTO readers VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((reader.reader_id, reader.name, reader.email, json.dumps(reader.borrowed_books),
+              *reader.history.to_bytes(self._isbn_table))
+             for reader in self.readers.values()))
+        # Таблица ISBN библиотеки только растет, поэтому копия после журналов читателей покрывает их все
+        connection.executemany("INSERT INTO isbns VALUES (?, ?)", enumerate(self._isbn_table))
+        connection.executemany(
+            "INSERT INTO loans VALUES (?, ?, ?, ?)",
+            ((seq, reader_id, isbn, _to_micros(due_date))
+             for due_date, seq, reader_id, isbn in self._due_entries.values()))
+        connection.executemany(
+            "INSERT INTO popularity VALUES (?, ?, ?)",
+            ((count, position, isbn)
+             for count in self._popularity_levels
+             for position, isbn in enumerate(self._popularity[count])))
+    
+    def _restore_snapshot(self) -> None:
+        """Загрузка состояния из снимка"""
+        connection = sqlite3.connect(self._snapshot_path)
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+            self._lsn = meta['lsn']
+            self._loan_seq = meta['loan_seq']
+            
+            books = []
+            for isbn, title, author, year, total, available in connection.execute(
+                    "SELECT * FROM books ORDER BY rowid"):
+                book = Book._trusted(isbn, title, author, year, total)
+                book.available_copies = available
+                self.books[isbn] = book
+                self._book_order[isbn] = len(self._books_by_order)
+                self._books_by_order.append(book)
+                books.append(book)
+            self._index_books(books)
+            
+            remap = self._isbn_table.intern_many(
+                isbn for isbn, in connection.execute("SELECT isbn FROM isbns ORDER BY id"))
+            for reader_id, name, email, borrowed, *history in connection.execute(
+                    "SELECT * FROM readers ORDER BY rowid"):
+                reader = Reader._trusted(reader_id, name, email)
+                reader.borrowed_books = json.loads(borrowed)
+                reader.history = ReaderHistory.from_bytes(*history, self._isbn_table, remap)
+                self.readers[reader_id] = reader
+            
+            for seq, reader_id, isbn, due in connection.execute("SELECT * FROM loans ORDER BY seq"):
+                due_date = _from_micros(due)
+                entry = [due_date, seq, reader_id, isbn]
+                self.active_loans[(reader_id, isbn)] = due_date
+                self._due_heap.append(entry)
+                self._due_entries[(reader_id, isbn)] = entry
+                self._loans_by_reader.setdefault(reader_id, {})[isbn] = due_date
+            heapq.heapify(self._due_heap)
+            
+            for count, _, isbn in connection.execute(
+                    "SELECT * FROM popularity ORDER BY count, position"):
+                self._borrow_counts[isbn] = count
+                self._popularity.setdefault(count, {})[isbn] = None
+            self._popularity_levels = sorted(self._popularity)
+        finally:
+            connection.close()
+    
+    # ============= ВОССТАНОВЛЕНИЕ =============
+    
+    def _replay_journal(self) -> None:
+        """Проигрывание операций журнала после снимка; оборванная последняя запись отбрасывается"""
+        new_books: List[Book] = []
+        with open(self._journal_path, 'rb+') as journal:
+            valid_size = 0
+            for line in journal:
+                if not line.endswith(b'\n'):
+                    break
+                valid_size += len(line)
+                record = _decode_record(line.decode('utf-8'))
+                if record['lsn'] <= self._lsn:
+                    continue
+                self._lsn = record['lsn']
+                self._since_snapshot += 1
+                self._apply(record, new_books)
+            journal.truncate(valid_size)
+        self._index_books(new_books)
+    
+    def _apply(self, record: Dict[str, Any], new_books: List[Book]) -> None:
+        """Применение записи журнала без повторной записи (индексы книг строятся после проигрывания)"""
+        op = record['op']
+        if op == 'borrow':
+            super()._borrow_book(record['reader_id'], record['isbn'], _from_micros(record['ts']))
+        elif op == 'return':
+            super()._return_book(record['reader_id'], record['isbn'], _from_micros(record['ts']))
+        elif op == 'add_book':
+            book = Book._trusted(record['isbn'], record['title'], record['author'], record['year'], record['copies'])
+            book.available_copies = record['available']
+            if super()._load_book(book):
+                new_books.append(book)
+        elif op == 'register':
+            reader = Reader._trusted(record['reader_id'], record['name'], record['email'])
+            reader.borrowed_books = list(record['borrowed'])
+            reader.history = ReaderHistory(
+                ((isbn, action, _from_micros(micros)) for isbn, action, micros in record['history']),
+                self._isbn_table)
+            super()._register_reader(reader)
+        else:
+            raise ValueError(f"Неизвестная операция в журнале: {op}")
@@ -0,0 +1,550 @@
+"""
+Библиотека в SQLite: тот же API, что у Library, но книги, читатели, займы и
+счетчики выдач хранятся в базе sqlite3 (в файле или в памяти)
+
+Поиск по подстроке автора и названия идет по триграммному индексу FTS5,
+просрочки - по индексу сроков займов, штрафы читателя - по индексу займов
+читателя, популярность - по индексу (число выдач, момент достижения).
+Книги и читатели, полученные из библиотеки, - живые объекты: пока на объект
+есть ссылки, библиотека возвращает и изменяет именно его (карта идентичности),
+а изменения, сделанные операциями библиотеки, сразу пишутся в базу.
+"""
+
+import json
+import sqlite3
+import threading
+import weakref
+from array import array
+from collections.abc import Mapping
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from library_system import (
+    Book, Reader, Library, ReaderHistory, _from_micros, _to_micros,
+    BookNotAvailableError, ReaderNotFoundError
+)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    seq INTEGER PRIMARY KEY,
+    isbn TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    total_copies INTEGER NOT NULL,
+    available_copies INTEGER NOT NULL
+);
+-- Триграммный индекс по автору и названию в нижнем регистре, rowid = books.seq
+CREATE VIRTUAL TABLE IF NOT EXISTS book_search USING fts5(author, title, tokenize = 'trigram case_sensitive 1');
+CREATE TABLE IF NOT EXISTS readers (
+    seq INTEGER PRIMARY KEY,
+    reader_id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    borrowed TEXT NOT NULL,
+    borrowed_count INTEGER NOT NULL DEFAULT 0,
+    returned_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS history (
+    reader_id TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    action INTEGER NOT NULL,
+    ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_reader ON history (reader_id);
+-- UNIQUE дает и индекс займов по reader_id
+CREATE TABLE IF NOT EXISTS loans (
+    seq INTEGER PRIMARY KEY,
+    reader_id TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    due INTEGER NOT NULL,
+    UNIQUE (reader_id, isbn)
+);
+CREATE INDEX IF NOT EXISTS loans_due ON loans (due);
+CREATE TABLE IF NOT EXISTS popularity (
+    isbn TEXT PRIMARY KEY,
+    borrow_count INTEGER NOT NULL,
+    reached INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS popularity_rank ON popularity (borrow_count DESC, reached);
+"""
+
+
+# Столбцы счетчиков readers по кодам действий ReaderHistory.ACTIONS
+_COUNT_COLUMNS = ('borrowed_count', 'returned_count')
+
+
+class _StoredHistory(ReaderHistory):
+    """
+    Журнал читателя из базы: события читаются из таблицы history при первом
+    обращении к ним, а счетчики берутся из строки читателя. Выдачи и возвраты
+    сами пишут события в базу, поэтому до загрузки append только обновляет
+    счетчики и не читает журнал
+    """
+    
+    __slots__ = ('_library', '_reader_id')
+    
+    def __init__(self, library: 'SQLiteLibrary', reader_id: str, borrowed_count: int, returned_count: int):
+        super().__init__(isbn_table=library._isbn_table)
+        self._library: Optional['SQLiteLibrary'] = library  # None - события загружены
+        self._reader_id = reader_id
+        self.borrowed_count = borrowed_count
+        self.returned_count = returned_count
+    
+    def _load(self) -> None:
+        """Загрузка событий из базы (один раз)"""
+        library = self._library
+        if library is None:
+            return
+        with library._db_lock:
+            events = library._db.execute("SELECT isbn, action, ts FROM history WHERE reader_id = ? ORDER BY rowid",
+                                         (self._reader_id,)).fetchall()
+        if events:
+            # Столбцы журнала собираются напрямую, без промежуточных datetime
+            isbns, actions, times = zip(*events)
+            self._columns = (self.isbn_table.intern_many(isbns), array('B', actions), array('q', times))
+        self._library = None
+    
+    def append(self, event: Tuple[str, str, datetime]) -> None:
+        if self._library is not None:
+            code = self._ACTION_CODES.get(event[1])
+            if code is None:
+                raise ValueError(f"Неизвестное действие: {event[1]}")
+            if code == 0:
+                self.borrowed_count += 1
+            else:
+                self.returned_count += 1
+            return
+        super().append(event)
+    
+    def rebind(self, isbn_table) -> None:
+        self._load()
+        super().rebind(isbn_table)
+    
+    def to_bytes(self, isbn_table=None) -> Tuple[bytes, bytes, bytes]:
+        self._load()
+        return super().to_bytes(isbn_table)
+    
+    def __len__(self) -> int:
+        self._load()
+        return super().__len__()
+    
+    def __getitem__(self, index):
+        self._load()
+        return super().__getitem__(index)
+
+
+class _TableView(Mapping):
+    """
+    Таблица базы как словарь только для чтения: ключ -> объект
+    Обход идет в порядке вставки (seq) и читает строки пачками
+    """
+    
+    FETCH_SIZE = 1000
+    
+    def __init__(self, library: 'SQLiteLibrary', table: str, key_columns: Tuple[str, ...],
+                 load: Callable[[tuple], Any]):
+        self._library = library
+        self._load = load
+        self._compound = len(key_columns) > 1
+        where = " AND ".join(f"{column} = ?" for column in key_columns)
+        self._select_one = f"SELECT * FROM {table} WHERE {where}"
+        self._select_all = f"SELECT * FROM {table} ORDER BY seq"
+        self._count = f"SELECT count(*) FROM {table}"
+        self._key_slice = slice(1, 1 + len(key_columns))
+    
+    def _params(self, key) -> Optional[tuple]:
+        if self._compound:
+            return key if isinstance(key, tuple) and len(key) == self._key_slice.stop - 1 else None
+        return (key,)
+    
+    def __getitem__(self, key):
+        params = self._params(key)
+        with self._library._db_lock:
+            row = self._library._db.execute(self._select_one, params).fetchone() if params else None
+            if row is None:
+                raise KeyError(key)
+            return self._load(row)
+    
+    def __contains__(self, key) -> bool:
+        params = self._params(key)
+        with self._library._db_lock:
+            return params is not None and self._library._db.execute(self._select_one, params).fetchone() is not None
+    
+    def __len__(self) -> int:
+        with self._library._db_lock:
+            return self._library._db.execute(self._count).fetchone()[0]
+    
+    def _rows(self) -> Iterator[Tuple[Any, Any]]:
+        """Пары (ключ, объект) в порядке вставки"""
+        with self._library._db_lock:
+            cursor = self._library._db.execute(self._select_all)
+        while True:
+            with self._library._db_lock:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+                if not rows:
+                    return
+                pairs = [(row[1] if not self._compound else row[self._key_slice], self._load(row))
+                         for row in rows]
+            yield from pairs
+    
+    def __iter__(self) -> Iterator:
+        return (key for key, _ in self._rows())
+    
+    def values(self) -> Iterator:
+        return (value for _, value in self._rows())
+    
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return self._rows()
+
+
+class SQLiteLibrary(Library):
+    """
+    Библиотека с хранением в SQLite
+    path - файл базы (по умолчанию база в памяти); при повторном открытии
+    файла состояние библиотеки продолжается с того же места.
+    thread_safe=True разрешает вызовы из разных потоков: операции идут по
+    очереди через одно соединение
+    """
+    
+    def __init__(self, name: str, thread_safe: bool = False, path: str = ":memory:"):
+        super().__init__(name)
+        self.thread_safe = thread_safe
+        self.path = path
+        self._db_lock = threading.RLock() if thread_safe else nullcontext()
+        self._db = sqlite3.connect(path, check_same_thread=not thread_safe)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._add_reader_counters()
+        self._reached = self._db.execute("SELECT coalesce(max(reached), 0) FROM popularity").fetchone()[0]
+        
+        # Карты идентичности: живые объекты, выданные библиотекой
+        self._book_cache: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._reader_cache: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        
+        self.books = _TableView(self, "books", ("isbn",), self._book_from_row)
+        self.readers = _TableView(self, "readers", ("reader_id",), self._reader_from_row)
+        self.active_loans = _TableView(self, "loans", ("reader_id", "isbn"), lambda row: _from_micros(row[3]))
+    
+    def _add_reader_counters(self) -> None:
+        """Счетчики выдач и возвратов в readers для баз, созданных до их появления"""
+        columns = {column for _, column, *_ in self._db.execute("PRAGMA table_info(readers)")}
+        if _COUNT_COLUMNS[0] in columns:
+            return
+        with self._db:
+            for action, column in enumerate(_COUNT_COLUMNS):
+                self._db.execute(f"ALTER TABLE readers ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+                self._db.execute(
+                    f"UPDATE readers SET {column} = "
+                    f"(SELECT count(*) FROM history WHERE history.reader_id = readers.reader_id AND action = ?)",
+                    (action,))
+    
+    def close(self) -> None:
+        """Закрытие соединения с базой"""
+        self._db.close()
+    
+    def __enter__(self) -> 'SQLiteLibrary':
+        return self
+    
+    def __exit__(self, *exc_info) -> bool:
+        self.close()
+        return False
+    
+    # ============= ОБЪЕКТЫ =============
+    
+    def _book_from_row(self, row: tuple) -> Book:
+        _, isbn, title, author, year, total_copies, available_copies = row
+        book = self._book_cache.get(isbn)
+        if book is None:
+            book = Book._trusted(isbn, title, author, year, total_copies)
+            book.available_copies = available_copies
+            self._book_cache[isbn] = book
+        return book
+    
+    def _reader_from_row(self, row: tuple) -> Reader:
+        _, reader_id, name, email, borrowed, borrowed_count, returned_count = row
+        reader = self._reader_cache.get(reader_id)
+        if reader is None:
+            reader = Reader._trusted(reader_id, name, email)
+            reader.borrowed_books = json.loads(borrowed)
+            reader.history = _StoredHistory(self, reader_id, borrowed_count, returned_count)
+            self._reader_cache[reader_id] = reader
+        return reader
+    
+    def _get_book(self, isbn: str) -> Optional[Book]:
+        book = self._book_cache.get(isbn)
+        if book is None:
+            row = self._db.execute("SELECT * FROM books WHERE isbn = ?", (isbn,)).fetchone()
+            book = self._book_from_row(row) if row else None
+        return book
+    
+    def _get_reader(self, reader_id: str) -> Optional[Reader]:
+        reader = self._reader_cache.get(reader_id)
+        if reader is None:
+            row = self._db.execute("SELECT * FROM readers WHERE reader_id = ?", (reader_id,)).fetchone()
+            reader = self._reader_from_row(row) if row else None
+        return reader
+    
+    def _save_copies(self, book: Book) -> None:
+        self._db.execute("UPDATE books SET total_copies = ?, available_copies = ? WHERE isbn = ?",
+                         (book.total_copies, book.available_copies, book.isbn))
+    
+    def _save_borrowed(self, reader: Reader, action: int) -> None:
+        """Сохранение взятых книг читателя и счетчика действия action"""
+        column = _COUNT_COLUMNS[action]
+        self._db.execute(f"UPDATE readers SET borrowed = ?, {column} = {column} + 1 WHERE reader_id = ?",
+                         (json.dumps(reader.borrowed_books), reader.reader_id))
+    
+    def _log_event(self, reader_id: str, isbn: str, action: int, now: datetime) -> None:
+        self._db.execute("INSERT INTO history VALUES (?, ?, ?, ?)", (reader_id, isbn, action, _to_micros(now)))
+    
+    # ============= КАТАЛОГ И ЧИТАТЕЛИ =============
+    
+    def add_book(self, book: Book) -> bool:
+        """Добавление книги в библиотеку"""
+        with self._db_lock, self._db:
+            return self._add_book(book)
+    
+    def bulk_load_books(self, books: Iterable[Book]) -> int:
+        """Массовое добавление книг одной транзакцией, возвращает число новых книг"""
+        with self._db_lock, self._db:
+            return sum(self._add_book(book) for book in books)
+    
+    def _add_book(self, book: Book) -> bool:
+        existing = self._get_book(book.isbn)
+        if existing is not None:
+            # Если книга уже есть, увеличиваем количество копий
+            existing.total_copies += book.total_copies
+            existing.available_copies += book.available_copies
+            self._save_copies(existing)
+            return False
+        
+        cursor = self._db.execute(
+            "INSERT INTO books (isbn, title, author, year, total_copies, available_copies) VALUES (?, ?, ?, ?, ?, ?)",
+            (book.isbn, book.title, book.author, book.year, book.total_copies, book.available_copies))
+        self._db.execute("INSERT INTO book_search (rowid, author, title) VALUES (?, ?, ?)",
+                         (cursor.lastrowid, book.author.lower(), book.title.lower()))
+        self._book_cache[book.isbn] = book
+        return True
+    
+    def register_reader(self, reader: Reader) -> bool:
+        """Регистрация читателя"""
+        with self._db_lock, self._db:
+            return self._register_reader(reader)
+    
+    def bulk_register_readers(self, readers: Iterable[Reader]) -> int:
+        """Массовая регистрация читателей одной транзакцией, возвращает число новых читателей"""
+        with self._db_lock, self._db:
+            return sum(self._register_reader(reader) for reader in readers)
+    
+    def _register_reader(self, reader: Reader) -> bool:
+        if self._get_reader(reader.reader_id) is not None:
+            return False
+        
+        self._db.execute(
+            "INSERT INTO readers (reader_id, name, email, borrowed, borrowed_count, returned_count) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (reader.reader_id, reader.name, reader.email, json.dumps(reader.borrowed_books),
+             reader.history.borrowed_count, reader.history.returned_count))
+        for isbn, action, timestamp in reader.history:
+            code = ReaderHistory.ACTIONS.index(action)
+            self._log_event(reader.reader_id, isbn, code, timestamp)
+            # Учитываем выдачи, сделанные читателю до регистрации
+            if code == 0:
+                self._count_borrow(isbn)
+        reader.history.rebind(self._isbn_table)
+        self._reader_cache[reader.reader_id] = reader
+        return True
+    
+    def _count_borrow(self, isbn: str) -> None:
+        """Увеличение счетчика выдач книги с запоминанием момента достижения"""
+        self._reached += 1
+        self._db.execute(
+            "INSERT INTO popularity VALUES (?, 1, ?) "
+            "ON CONFLICT (isbn) DO UPDATE SET borrow_count = borrow_count + 1, reached = excluded.reached",
+            (isbn, self._reached))
+    
+    # ============= ПОИСК =============
+    
+    def find_books_by_author(self, author: str) -> List[Book]:
+        """Поиск книг по автору"""
+        return self._search("author", author)
+    
+    def find_books_by_title(self, title: str) -> List[Book]:
+        """Поиск книг по названию"""
+        return self._search("title", title)
+    
+    def _search(self, column: str, query: str) -> List[Book]:
+        """Поиск по подстроке: от трех символов - по триграммам, короче - перебором"""
+        query = query.lower()
+        with self._db_lock:
+            if len(query) >= 3:
+                rows = self._db.execute(
+                    f"SELECT books.* FROM book_search JOIN books ON books.seq = book_search.rowid "
+                    f"WHERE book_search.{column} MATCH ? ORDER BY books.seq",
+                    ('"' + query.replace('"', '""') + '"',))
+            else:
+                rows = self._db.execute(
+                    f"SELECT books.* FROM book_search JOIN books ON books.seq = book_search.rowid "
+                    f"WHERE instr(book_search.{column}, ?) ORDER BY books.seq",
+                    (query,))
+            return [self._book_from_row(row) for row in rows]
+    
+    def get_available_books(self) -> List[Book]:
+        """Получение списка доступных книг"""
+        with self._db_lock:
+            rows = self._db.execute("SELECT * FROM books WHERE available_copies > 0 ORDER BY seq")
+            return [self._book_from_row(row) for row in rows]
+    
+    # ============= ВЫДАЧА И ВОЗВРАТ =============
+    
+    def borrow_book(self, reader_id: str, isbn: str) -> Tuple[bool, str]:
+        """
+        Выдача книги читателю
+        Возвращает (успех, сообщение)
+        """
+        with self._db_lock, self._db:
+            return self._borrow_book(reader_id, isbn)
+    
+    def _borrow_book(self, reader_id: str, isbn: str, now: Optional[datetime] = None,
+                     with_message: bool = True) -> Tuple[bool, Optional[str]]:
+        reader = self._get_reader(reader_id)
+        if reader is None:
+            raise ReaderNotFoundError(f"Читатель {reader_id} не найден")
+        
+        book = self._get_book(isbn)
+        if book is None:
+            return False, f"Книга с ISBN {isbn} не найдена" if with_message else None
+        
+        if not reader.can_borrow():
+            return False, f"Читатель достиг лимита книг ({Reader.MAX_BOOKS})" if with_message else None
+        
+        if not book.is_available():
+            raise BookNotAvailableError(f"Книга '{book.title}' недоступна")
+        
+        # Проверка не взял ли уже эту книгу
+        if (reader_id, isbn) in self.active_loans:
+            return False, "Эта книга уже взята данным читателем" if with_message else None
+        
+        # Выполняем операцию
+        if now is None:
+            now = self._now()
+        if book.borrow() and reader.add_borrowed_book(isbn, now):
+            due_date = now + timedelta(days=self.LOAN_PERIOD_DAYS)
+            self._save_copies(book)
+            self._save_borrowed(reader, 0)
+            self._log_event(reader_id, isbn, 0, now)
+            self._db.execute("INSERT INTO loans (reader_id, isbn, due) VALUES (?, ?, ?)",
+                             (reader_id, isbn, _to_micros(due_date)))
+            self._count_borrow(isbn)
+            return True, f"Книга выдана до {due_date.strftime('%Y-%m-%d')}" if with_message else None
+        
+        self._save_copies(book)
+        return False, "Ошибка при выдаче книги" if with_message else None
+    
+    def return_book(self, reader_id: str, isbn: str) -> Tuple[bool, float]:
+        """
+        Возврат книги
+        Возвращает (успех, штраф)
+        """
+        with self._db_lock, self._db:
+            return self._return_book(reader_id, isbn)
+    
+    def _return_book(self, reader_id: str, isbn: str, now: Optional[datetime] = None) -> Tuple[bool, float]:
+        reader = self._get_reader(reader_id)
+        if reader is None:
+            raise ReaderNotFoundError(f"Читатель {reader_id} не найден")
+        
+        book = self._get_book(isbn)
+        if book is None:
+            return False, 0.0
+        
+        loan = self._db.execute("SELECT due FROM loans WHERE reader_id = ? AND isbn = ?",
+                                (reader_id, isbn)).fetchone()
+        if loan is None:
+            return False, 0.0
+        
+        # Расчет штрафа
+        if now is None:
+            now = self._now()
+        fine = self.calculate_fine(_from_micros(loan[0]), now)
+        
+        # Возврат книги
+        if book.return_book() and reader.remove_borrowed_book(isbn, now):
+            self._save_copies(book)
+            self._save_borrowed(reader, 1)
+            self._log_event(reader_id, isbn, 1, now)
+            self._db.execute("DELETE FROM loans WHERE reader_id = ? AND isbn = ?", (reader_id, isbn))
+            return True, fine
+        
+        self._save_copies(book)
+        return False, 0.0
+    
+    def apply_batch(self, ops: Iterable[Tuple[str, str, str]],
+                    with_messages: bool = False) -> List[Tuple[bool, Any]]:
+        """Пакетное применение выдач и возвратов одной транзакцией (см. Library.apply_batch)"""
+        with self._db_lock, self._db:
+            return super().apply_batch(ops, with_messages)
+    
+    # ============= ОТЧЕТЫ =============
+    
+    def get_overdue_loans(self) -> List[Tuple[str, str, int, float]]:
+        """
+        Получение списка просроченных займов
+        Возвращает список (reader_id, isbn, days_overdue, fine)
+        """
+        now = self._now()
+        with self._db_lock:
+            rows = self._db.execute("SELECT seq, reader_id, isbn, due FROM loans WHERE due < ?",
+                                    (_to_micros(now),)).fetchall()
+        
+        overdue = []
+        for seq, reader_id, isbn, due in rows:
+            due_date = _from_micros(due)
+            overdue.append((seq, (reader_id, isbn, (now - due_date).days, self.calculate_fine(due_date, now))))
+        
+        # Порядок как у сортировки займов по дням просрочки: при равенстве - по времени выдачи
+        overdue.sort(key=lambda item: (-item[1][2], item[0]))
+        return [loan for _, loan in overdue]
+    
+    def get_reader_stats(self, reader_id: str) -> dict:
+        """Получение статистики читателя"""
+        with self._db_lock:
+            row = self._db.execute("SELECT name, borrowed, borrowed_count, returned_count FROM readers "
+                                   "WHERE reader_id = ?", (reader_id,)).fetchone()
+            if row is None:
+                raise ReaderNotFoundError(f"Читатель {reader_id} не найден")
+            name, borrowed, borrowed_count, returned_count = row
+            
+            now = self._now()
+            total_fine = sum(
+                self.calculate_fine(_from_micros(due), now)
+                for due, in self._db.execute("SELECT due FROM loans WHERE reader_id = ?", (reader_id,))
+            )
+            
+            return {
+                'name': name,
+                'currently_borrowed': len(json.loads(borrowed)),
+                'total_borrowed': borrowed_count,
+                'total_returned': returned_count,
+                'current_fines': total_fine
+            }
+    
+    def get_popular_books(self, top_n: int = 5) -> List[Tuple[Book, int]]:
+        """
+        Получение самых популярных книг (по количеству выдач)
+        При равном числе выдач выше та книга, что набрала его раньше
+        """
+        query = ("SELECT books.*, popularity.borrow_count FROM popularity JOIN books USING (isbn) "
+                 "ORDER BY popularity.borrow_count DESC, popularity.reached")
+        with self._db_lock:
+            if top_n >= 0:
+                rows = self._db.execute(query + " LIMIT ?", (top_n,))
+            else:
+                rows = self._db.execute(query)
+            ranking = [(self._book_from_row(row[:-1]), row[-1]) for row in rows]
+        return ranking if top_n >= 0 else ranking[:top_n]
@@ -3,8 +3,17 @@
 Модуль для работы с книгами, читателями и операциями выдачи/возврата
 """
 
+import bisect
+import csv
+import heapq
+import json
+import threading
+from array import array
+from collections.abc import Sequence
+from contextlib import ExitStack, contextmanager, nullcontext
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Tuple
+from itertools import batched, islice
+from typing import Any, Callable, Optional, ContextManager, Iterable, Iterator, List, Dict, TextIO, Tuple
 
 
 class BookNotAvailableError(Exception):
@@ -17,16 +26,340 @@ class ReaderNotFoundError(Exception):
     pass
 
 
+class _SubstringIndex:
+    """
+    Триграммный индекс для регистронезависимого поиска подстроки
+    
+    Строки индексируются под целыми номерами документов; для каждой триграммы
+    (в нижнем регистре) хранится отсортированный массив номеров array('I') -
+    4 байта на вхождение. Сами строки индекс не копирует: кандидатов после
+    пересечения списков проверяет точным сравнением со строкой, которую
+    возвращает text_of(номер) - семантика совпадает с `query in text`.
+    """
+    
+    N = 3
+    
+    def __init__(self, text_of: Callable[[int], str]):
+        self._text_of = text_of  # номер документа -> исходная строка
+        self._postings: Dict[str, array] = {}  # триграмма -> номера документов
+        self._docs = array('I')  # все номера документов
+        self._short = array('I')  # номера документов со строкой короче N символов
+    
+    @staticmethod
+    def _merge(postings: array, doc_ids: List[int]) -> None:
+        """Добавление номеров в отсортированный массив"""
+        doc_ids.sort()
+        if not postings or postings[-1] < doc_ids[0]:
+            postings.extend(doc_ids)
+            return
+        # Номера пришли не по порядку (параллельные add_book) - вставка на место
+        for doc_id in doc_ids:
+            postings.insert(bisect.bisect_left(postings, doc_id), doc_id)
+    
+    def add(self, doc_id: int, text: str) -> None:
+        """Добавление строки в индекс"""
+        self.add_many(((doc_id, text),))
+    
+    def add_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        """Добавление пар (номер, строка): триграммы копятся в списках и сливаются в индекс один раз"""
+        n = self.N
+        docs: List[int] = []
+        short: List[int] = []
+        fresh: Dict[str, List[int]] = {}
+        for doc_id, text in items:
+            docs.append(doc_id)
+            text = text.lower()
+            if len(text) < n:
+                short.append(doc_id)
+                continue
+            for gram in {text[i:i + n] for i in range(len(text) - n + 1)}:
+                doc_ids = fresh.get(gram)
+                if doc_ids is None:
+                    fresh[gram] = [doc_id]
+                else:
+                    doc_ids.append(doc_id)
+        
+        if docs:
+            self._merge(self._docs, docs)
+        if short:
+            self._merge(self._short, short)
+        for gram, doc_ids in fresh.items():
+            postings = self._postings.get(gram)
+            if postings is None:
+                self._postings[gram] = postings = array('I')
+            self._merge(postings, doc_ids)
+    
+    def search(self, query: str) -> List[int]:
+        """Номера строк, содержащих query (без учета регистра), по возрастанию"""
+        query = query.lower()
+        if not query:
+            return list(self._docs)
+        
+        text_of = self._text_of
+        if len(query) < self.N:
+            # Короткий запрос: объединяем списки всех триграмм, содержащих его
+            candidates = {doc_id for doc_id in self._short if query in text_of(doc_id).lower()}
+            for gram, postings in self._postings.items():
+                if query in gram:
+                    candidates.update(postings)
+            return sorted(candidates)
+        
+        grams = {query[i:i + self.N] for i in range(len(query) - self.N + 1)}
+        postings = []
+        for gram in grams:
+            doc_ids = self._postings.get(gram)
+            if not doc_ids:
+                return []
+            postings.append(doc_ids)
+        postings.sort(key=len)
+        
+        # Пересечение от короткого списка к длинным: немногих кандидатов ищем в
+        # длинном списке бинарным поиском, иначе пересекаем множеством
+        candidates = postings[0]
+        for doc_ids in postings[1:]:
+            if len(candidates) * 16 < len(doc_ids):
+                candidates = [doc_id for doc_id in candidates if _sorted_contains(doc_ids, doc_id)]
+            else:
+                candidates = set(candidates).intersection(doc_ids)
+            if not candidates:
+                return []
+        candidates = sorted(candidates)
+        if len(grams) == 1 and len(query) == self.N:
+            return candidates
+        return [doc_id for doc_id in candidates if query in text_of(doc_id).lower()]
+
+
+def _sorted_contains(values: array, value: int) -> bool:
+    """Есть ли value в отсортированном массиве values"""
+    position = bisect.bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+
+class _StripedLocks:
+    """
+    Полосатые блокировки для потокобезопасного режима библиотеки
+    
+    Читатели и книги хешируются в фиксированные наборы блокировок, поэтому
+    операции над разными читателями и книгами не ждут друг друга. Порядок
+    захвата всегда один: читатель, затем книга, затем общая блокировка
+    индексов - взаимная блокировка потоков невозможна.
+    """
+    
+    def __init__(self, stripes: int):
+        if stripes < 1:
+            raise ValueError("Число полос блокировок должно быть положительным")
+        self._reader_locks = [threading.Lock() for _ in range(stripes)]
+        self._book_locks = [threading.Lock() for _ in range(stripes)]
+        self.shared = threading.Lock()  # общие индексы: куча сроков, популярность
+    
+    def reader(self, reader_id: str) -> threading.Lock:
+        return self._reader_locks[hash(reader_id) % len(self._reader_locks)]
+    
+    def book(self, isbn: str) -> threading.Lock:
+        return self._book_locks[hash(isbn) % len(self._book_locks)]
+    
+    @contextmanager
+    def all(self) -> Iterator[None]:
+        """Захват всех блокировок в общем порядке (согласованный снимок состояния)"""
+        with ExitStack() as stack:
+            for lock in (*self._reader_locks, *self._book_locks, self.shared):
+                stack.enter_context(lock)
+            yield
+
+
+_NO_LOCK = nullcontext()
+
+
+class IsbnTable:
+    """
+    Таблица ISBN журналов читателей: ISBN <-> номер
+    У каждой библиотеки своя таблица (живет и удаляется вместе с ней); журнал,
+    созданный вне библиотеки, заводит собственную и переводится в таблицу
+    библиотеки при регистрации читателя (см. ReaderHistory.rebind)
+    
+    Выдачи разных читателей идут под разными блокировками, поэтому добавление
+    ISBN защищено собственной блокировкой таблицы; поиск известного ISBN идет
+    без нее: номер публикуется в словаре только после записи ISBN в список.
+    """
+    
+    __slots__ = ('_ids', '_isbns', '_lock')
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._isbns: List[str] = []
+        self._lock = threading.Lock()
+    
+    def intern(self, isbn: str) -> int:
+        """Номер ISBN (недостающий ISBN добавляется)"""
+        isbn_id = self._ids.get(isbn)
+        if isbn_id is None:
+            with self._lock:
+                isbn_id = self._ids.get(isbn)
+                if isbn_id is None:
+                    isbn_id = len(self._isbns)
+                    self._isbns.append(isbn)
+                    self._ids[isbn] = isbn_id
+        return isbn_id
+    
+    def intern_many(self, isbns: Iterable[str]) -> array:
+        """Номера ISBN по порядку (недостающие ISBN добавляются)"""
+        return array('I', map(self.intern, isbns))
+    
+    def __getitem__(self, isbn_id: int) -> str:
+        return self._isbns[isbn_id]
+    
+    def __len__(self) -> int:
+        return len(self._isbns)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._isbns)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_micros(moment: datetime) -> int:
+    """Время в микросекундах от эпохи (формат времени журналов, снимков и базы SQLite)"""
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> datetime:
+    """Время из микросекунд от эпохи"""
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+class ReaderHistory(Sequence):
+    """
+    Компактный журнал операций читателя (только добавление)
+    
+    Снаружи выглядит как список кортежей (isbn, action, timestamp), но хранит
+    события в трех массивах: номер ISBN в таблице IsbnTable (4 байта), код действия
+    (1 байт) и время в микросекундах от эпохи (8 байт) - 13 байт на событие
+    против ~110 байт у кортежа с datetime, т.е. ~13 МБ вместо ~107 МБ на миллион
+    событий. Счетчики выдач и возвратов ведутся при добавлении. Массивы
+    создаются при первом событии, так что пустой журнал почти ничего не стоит.
+    """
+    
+    ACTIONS = ('borrowed', 'returned')
+    _ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+    
+    __slots__ = ('_columns', '_table', 'borrowed_count', 'returned_count')
+    
+    def __init__(self, events: Iterable[Tuple[str, str, datetime]] = (),
+                 isbn_table: Optional[IsbnTable] = None):
+        self._columns: Optional[Tuple[array, array, array]] = None  # (isbn_id, action, time)
+        self._table = isbn_table  # создается при первом событии, если не передана
+        self.borrowed_count = 0
+        self.returned_count = 0
+        for event in events:
+            self.append(event)
+    
+    @property
+    def isbn_table(self) -> IsbnTable:
+        """Таблица, в которой записаны номера ISBN журнала"""
+        if self._table is None:
+            self._table = IsbnTable()
+        return self._table
+    
+    def append(self, event: Tuple[str, str, datetime]) -> None:
+        """Добавление события (isbn, action, timestamp)"""
+        isbn, action, timestamp = event
+        code = self._ACTION_CODES.get(action)
+        if code is None:
+            raise ValueError(f"Неизвестное действие: {action}")
+        
+        isbn_id = self.isbn_table.intern(isbn)
+        
+        if self._columns is None:
+            self._columns = (array('I'), array('B'), array('q'))
+        isbn_column, action_column, time_column = self._columns
+        isbn_column.append(isbn_id)
+        action_column.append(code)
+        time_column.append(_to_micros(timestamp))
+        
+        if code == 0:
+            self.borrowed_count += 1
+        else:
+            self.returned_count += 1
+    
+    def _isbn_column_in(self, isbn_table: IsbnTable) -> array:
+        """Столбец номеров ISBN, переведенный в таблицу isbn_table"""
+        isbn_column = self._columns[0]
+        if isbn_table is self._table:
+            return isbn_column
+        remap = isbn_table.intern_many(self._table)
+        return array('I', map(remap.__getitem__, isbn_column))
+    
+    def rebind(self, isbn_table: IsbnTable) -> None:
+        """Перевод номеров ISBN журнала в таблицу isbn_table (например, таблицу библиотеки)"""
+        if self._columns is not None:
+            self._columns = (self._isbn_column_in(isbn_table), *self._columns[1:])
+        self._table = isbn_table
+    
+    def to_bytes(self, isbn_table: Optional[IsbnTable] = None) -> Tuple[bytes, bytes, bytes]:
+        """
+        Столбцы журнала (номер ISBN, действие, время) в машинном представлении
+        Номера ISBN - в таблице isbn_table (по умолчанию - в таблице журнала)
+        """
+        if self._columns is None:
+            return b'', b'', b''
+        _, action_column, time_column = self._columns
+        isbn_column = self._isbn_column_in(isbn_table) if isbn_table is not None else self._columns[0]
+        return isbn_column.tobytes(), action_column.tobytes(), time_column.tobytes()
+    
+    @classmethod
+    def from_bytes(cls, isbn_ids: bytes, actions: bytes, times: bytes, isbn_table: IsbnTable,
+                   remap: Optional[Sequence[int]] = None) -> 'ReaderHistory':
+        """
+        Журнал из столбцов to_bytes() с номерами ISBN в таблице isbn_table
+        remap переводит номера из сохраненной таблицы в номера isbn_table
+        (см. IsbnTable.intern_many), если журнал сохранялся в другом процессе
+        """
+        history = cls(isbn_table=isbn_table)
+        if not actions:
+            return history
+        isbn_column, action_column, time_column = array('I'), array('B'), array('q')
+        isbn_column.frombytes(isbn_ids)
+        action_column.frombytes(actions)
+        time_column.frombytes(times)
+        if remap is not None:
+            isbn_column = array('I', map(remap.__getitem__, isbn_column))
+        history._columns = (isbn_column, action_column, time_column)
+        history.borrowed_count = action_column.count(0)
+        history.returned_count = len(action_column) - history.borrowed_count
+        return history
+    
+    def __len__(self) -> int:
+        return len(self._columns[1]) if self._columns is not None else 0
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._columns is None:
+            raise IndexError("history index out of range")
+        isbn_column, action_column, time_column = self._columns
+        return (self._table[isbn_column[index]],
+                self.ACTIONS[action_column[index]],
+                _from_micros(time_column[index]))
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ReaderHistory, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self):
+        return f"ReaderHistory({list(self)!r})"
+
+
 class Book:
     """Класс для представления книги"""
     
+    # __weakref__ - для карт идентичности хранилищ (см. library_sqlite)
+    __slots__ = ('isbn', 'title', 'author', 'year', 'total_copies', 'available_copies', '__weakref__')
+    
     def __init__(self, isbn: str, title: str, author: str, year: int, copies: int = 1):
-        if not isbn or not title or not author:
-            raise ValueError("ISBN, название и автор обязательны")
-        if year < 1000 or year > datetime.now().year:
-            raise ValueError(f"Некорректный год издания: {year}")
-        if copies < 0:
-            raise ValueError("Количество копий не может быть отрицательным")
+        self._validate(isbn, title, author, year, copies)
         
         self.isbn = isbn
         self.title = title
@@ -35,6 +368,29 @@ class Book:
         self.total_copies = copies
         self.available_copies = copies
     
+    @staticmethod
+    def _validate(isbn: str, title: str, author: str, year: int, copies: int,
+                  current_year: Optional[int] = None) -> None:
+        """Проверка полей книги (при массовой загрузке текущий год передается заранее)"""
+        if not isbn or not title or not author:
+            raise ValueError("ISBN, название и автор обязательны")
+        if year < 1000 or year > (current_year if current_year is not None else datetime.now().year):
+            raise ValueError(f"Некорректный год издания: {year}")
+        if copies < 0:
+            raise ValueError("Количество копий не может быть отрицательным")
+    
+    @classmethod
+    def _trusted(cls, isbn: str, title: str, author: str, year: int, copies: int) -> 'Book':
+        """Создание книги из уже проверенных полей"""
+        book = cls.__new__(cls)
+        book.isbn = isbn
+        book.title = title
+        book.author = author
+        book.year = year
+        book.total_copies = copies
+        book.available_copies = copies
+        return book
+    
     def is_available(self) -> bool:
         """Проверка доступности книги"""
         return self.available_copies > 0
@@ -62,35 +418,53 @@ class Reader:
     
     MAX_BOOKS = 5
     
+    __slots__ = ('reader_id', 'name', 'email', 'borrowed_books', 'history', '__weakref__')
+    
     def __init__(self, reader_id: str, name: str, email: str):
-        if not reader_id or not name or not email:
-            raise ValueError("ID, имя и email обязательны")
-        if '@' not in email:
-            raise ValueError("Некорректный email")
+        self._validate(reader_id, name, email)
         
         self.reader_id = reader_id
         self.name = name
         self.email = email
         self.borrowed_books: List[str] = []
-        self.history: List[Tuple[str, str, datetime]] = []  # (isbn, action, timestamp)
+        self.history = ReaderHistory()  # (isbn, action, timestamp)
+    
+    @staticmethod
+    def _validate(reader_id: str, name: str, email: str) -> None:
+        """Проверка полей читателя"""
+        if not reader_id or not name or not email:
+            raise ValueError("ID, имя и email обязательны")
+        if '@' not in email:
+            raise ValueError("Некорректный email")
+    
+    @classmethod
+    def _trusted(cls, reader_id: str, name: str, email: str) -> 'Reader':
+        """Создание читателя из уже проверенных полей"""
+        reader = cls.__new__(cls)
+        reader.reader_id = reader_id
+        reader.name = name
+        reader.email = email
+        reader.borrowed_books = []
+        reader.history = ReaderHistory()
+        return reader
     
     def can_borrow(self) -> bool:
         """Проверка может ли читатель взять еще книгу"""
         return len(self.borrowed_books) < self.MAX_BOOKS
     
-    def add_borrowed_book(self, isbn: str) -> bool:
-        """Добавление книги в список взятых"""
+    def add_borrowed_book(self, isbn: str, timestamp: Optional[datetime] = None) -> bool:
+        """Добавление книги в список взятых (по умолчанию - с текущим временем)"""
         if self.can_borrow() and isbn not in self.borrowed_books:
             self.borrowed_books.append(isbn)
-            self.history.append((isbn, 'borrowed', datetime.now()))
+            self.history.append((isbn, 'borrowed', timestamp if timestamp is not None else datetime.now()))
             return True
         return False
     
-    def remove_borrowed_book(self, isbn: str) -> bool:
-        """Удаление книги из списка взятых"""
+    def remove_borrowed_book(self, isbn: str, timestamp: Optional[datetime] = None) -> bool:
+        """Удаление книги из списка взятых (по умолчанию - с текущим временем)"""
         if isbn in self.borrowed_books:
             self.borrowed_books.remove(isbn)
-            self.history.append((isbn, 'returned', datetime.now()))
+            self.history.append((isbn, 'returned', timestamp if timestamp is not None else datetime.now()))
             return True
         return False
     
@@ -103,44 +477,153 @@ class Library:
     
     LOAN_PERIOD_DAYS = 14
     FINE_PER_DAY = 10.0
+    LOCK_STRIPES = 64
+    BATCH_OPERATIONS = ('borrow', 'return')
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, thread_safe: bool = False):
+        """
+        thread_safe=True включает полосатые блокировки по читателям и книгам:
+        выдачи и возвраты можно вызывать из разных потоков без общей блокировки
+        """
         if not name:
             raise ValueError("Название библиотеки обязательно")
         
         self.name = name
+        self.thread_safe = thread_safe
+        self._locks = _StripedLocks(self.LOCK_STRIPES) if thread_safe else None
+        self._shared_lock = self._locks.shared if thread_safe else _NO_LOCK
         self.books: Dict[str, Book] = {}
         self.readers: Dict[str, Reader] = {}
         self.active_loans: Dict[Tuple[str, str], datetime] = {}  # (reader_id, isbn) -> due_date
+        
+        # Поисковые индексы, поддерживаются в add_book
+        self._book_order: Dict[str, int] = {}  # isbn -> порядковый номер добавления
+        self._books_by_order: List[Book] = []  # порядковый номер -> книга
+        self._author_index = _SubstringIndex(lambda doc_id: self._books_by_order[doc_id].author)
+        self._title_index = _SubstringIndex(lambda doc_id: self._books_by_order[doc_id].title)
+        
+        # Индексы займов, поддерживаются в borrow_book/return_book
+        self._due_heap: List[list] = []  # куча [due_date, seq, reader_id, isbn]
+        self._due_entries: Dict[Tuple[str, str], list] = {}  # (reader_id, isbn) -> элемент кучи
+        self._stale_due_entries = 0  # элементы кучи, займы которых уже закрыты
+        self._loan_seq = 0
+        self._loans_by_reader: Dict[str, Dict[str, datetime]] = {}  # reader_id -> {isbn: due_date}
+        
+        # Счетчики выдач и уровни популярности: число выдач -> ISBN в порядке достижения
+        self._borrow_counts: Dict[str, int] = {}
+        self._popularity: Dict[int, Dict[str, None]] = {}
+        self._popularity_levels: List[int] = []  # непустые уровни по возрастанию
+        
+        # Таблица ISBN журналов зарегистрированных читателей
+        self._isbn_table = IsbnTable()
+    
+    def _lock_reader(self, reader_id: str) -> ContextManager:
+        """Блокировка читателя (в потокобезопасном режиме)"""
+        return self._locks.reader(reader_id) if self._locks else _NO_LOCK
+    
+    def _lock_book(self, isbn: str) -> ContextManager:
+        """Блокировка книги (в потокобезопасном режиме)"""
+        return self._locks.book(isbn) if self._locks else _NO_LOCK
+    
+    def _lock_all(self) -> ContextManager:
+        """Все блокировки сразу (в потокобезопасном режиме)"""
+        return self._locks.all() if self._locks else _NO_LOCK
+    
+    def _now(self) -> datetime:
+        """Текущее время для операций библиотеки"""
+        return datetime.now()
     
     def add_book(self, book: Book) -> bool:
         """Добавление книги в библиотеку"""
+        with self._lock_book(book.isbn):
+            if not self._load_book(book):
+                return False
+            with self._shared_lock:
+                self._index_books([book])
+            return True
+    
+    def _load_book(self, book: Book) -> bool:
+        """Добавление книги в каталог без поисковых индексов (под блокировкой книги), True - новая книга"""
         if book.isbn in self.books:
             # Если книга уже есть, увеличиваем количество копий
             existing = self.books[book.isbn]
             existing.total_copies += book.total_copies
             existing.available_copies += book.available_copies
             return False
-        else:
+        with self._shared_lock:
             self.books[book.isbn] = book
-            return True
+            self._book_order[book.isbn] = len(self._books_by_order)
+            self._books_by_order.append(book)
+        return True
+    
+    def _index_books(self, books: List[Book]) -> None:
+        """Добавление книг в поисковые индексы (под общей блокировкой)"""
+        doc_ids = [self._book_order[book.isbn] for book in books]
+        self._author_index.add_many(zip(doc_ids, (book.author for book in books)))
+        self._title_index.add_many(zip(doc_ids, (book.title for book in books)))
     
     def register_reader(self, reader: Reader) -> bool:
         """Регистрация читателя"""
+        with self._lock_reader(reader.reader_id):
+            return self._register_reader(reader)
+    
+    def _register_reader(self, reader: Reader) -> bool:
         if reader.reader_id in self.readers:
             return False
         self.readers[reader.reader_id] = reader
+        reader.history.rebind(self._isbn_table)
+        
+        # Учитываем выдачи, сделанные читателю до регистрации
+        if reader.history.borrowed_count:
+            with self._shared_lock:
+                for isbn, action, _ in reader.history:
+                    if action == 'borrowed':
+                        self._count_borrow(isbn)
         return True
     
+    def bulk_load_books(self, books: Iterable[Book]) -> int:
+        """
+        Массовое добавление книг из итератора (например, read_books_csv)
+        Копии уже известных ISBN суммируются, как в add_book, а поисковые
+        индексы строятся один раз после загрузки. Если итератор прерывается
+        ошибкой, уже добавленные книги все равно попадают в индексы.
+        Возвращает число новых книг
+        """
+        new_books = []
+        try:
+            for book in books:
+                with self._lock_book(book.isbn):
+                    if self._load_book(book):
+                        new_books.append(book)
+        finally:
+            with self._shared_lock:
+                self._index_books(new_books)
+        return len(new_books)
+    
+    def bulk_register_readers(self, readers: Iterable[Reader]) -> int:
+        """
+        Массовая регистрация читателей из итератора (например, read_readers_csv)
+        Уже зарегистрированные ID пропускаются. Возвращает число новых читателей
+        """
+        registered = 0
+        for reader in readers:
+            with self._lock_reader(reader.reader_id):
+                registered += self._register_reader(reader)
+        return registered
+    
     def find_books_by_author(self, author: str) -> List[Book]:
         """Поиск книг по автору"""
-        return [book for book in self.books.values() 
-                if author.lower() in book.author.lower()]
+        with self._shared_lock:
+            return self._books_in_order(self._author_index.search(author))
     
     def find_books_by_title(self, title: str) -> List[Book]:
         """Поиск книг по названию"""
-        return [book for book in self.books.values() 
-                if title.lower() in book.title.lower()]
+        with self._shared_lock:
+            return self._books_in_order(self._title_index.search(title))
+    
+    def _books_in_order(self, doc_ids: List[int]) -> List[Book]:
+        """Книги по номерам в порядке добавления в каталог"""
+        return [self._books_by_order[doc_id] for doc_id in doc_ids]
     
     def get_available_books(self) -> List[Book]:
         """Получение списка доступных книг"""
@@ -151,38 +634,56 @@ class Library:
         Выдача книги читателю
         Возвращает (успех, сообщение)
         """
+        if self._locks is None:
+            return self._borrow_book(reader_id, isbn)
+        with self._locks.reader(reader_id), self._locks.book(isbn):
+            return self._borrow_book(reader_id, isbn)
+    
+    def _borrow_book(self, reader_id: str, isbn: str, now: Optional[datetime] = None,
+                     with_message: bool = True) -> Tuple[bool, Optional[str]]:
         if reader_id not in self.readers:
             raise ReaderNotFoundError(f"Читатель {reader_id} не найден")
         
         if isbn not in self.books:
-            return False, f"Книга с ISBN {isbn} не найдена"
+            return False, f"Книга с ISBN {isbn} не найдена" if with_message else None
         
         reader = self.readers[reader_id]
         book = self.books[isbn]
         
         if not reader.can_borrow():
-            return False, f"Читатель достиг лимита книг ({Reader.MAX_BOOKS})"
+            return False, f"Читатель достиг лимита книг ({Reader.MAX_BOOKS})" if with_message else None
         
         if not book.is_available():
             raise BookNotAvailableError(f"Книга '{book.title}' недоступна")
         
         # Проверка не взял ли уже эту книгу
         if (reader_id, isbn) in self.active_loans:
-            return False, "Эта книга уже взята данным читателем"
+            return False, "Эта книга уже взята данным читателем" if with_message else None
         
         # Выполняем операцию
-        if book.borrow() and reader.add_borrowed_book(isbn):
-            due_date = datetime.now() + timedelta(days=self.LOAN_PERIOD_DAYS)
+        if now is None:
+            now = self._now()
+        if book.borrow() and reader.add_borrowed_book(isbn, now):
+            due_date = now + timedelta(days=self.LOAN_PERIOD_DAYS)
             self.active_loans[(reader_id, isbn)] = due_date
-            return True, f"Книга выдана до {due_date.strftime('%Y-%m-%d')}"
+            with self._shared_lock:
+                self._track_loan(reader_id, isbn, due_date)
+                self._count_borrow(isbn)
+            return True, f"Книга выдана до {due_date.strftime('%Y-%m-%d')}" if with_message else None
         
-        return False, "Ошибка при выдаче книги"
+        return False, "Ошибка при выдаче книги" if with_message else None
     
     def return_book(self, reader_id: str, isbn: str) -> Tuple[bool, float]:
         """
         Возврат книги
         Возвращает (успех, штраф)
         """
+        if self._locks is None:
+            return self._return_book(reader_id, isbn)
+        with self._locks.reader(reader_id), self._locks.book(isbn):
+            return self._return_book(reader_id, isbn)
+    
+    def _return_book(self, reader_id: str, isbn: str, now: Optional[datetime] = None) -> Tuple[bool, float]:
         if reader_id not in self.readers:
             raise ReaderNotFoundError(f"Читатель {reader_id} не найден")
         
@@ -197,19 +698,100 @@ class Library:
         book = self.books[isbn]
         
         # Расчет штрафа
+        if now is None:
+            now = self._now()
         due_date = self.active_loans[loan_key]
-        fine = self.calculate_fine(due_date)
+        fine = self.calculate_fine(due_date, now)
         
         # Возврат книги
-        if book.return_book() and reader.remove_borrowed_book(isbn):
+        if book.return_book() and reader.remove_borrowed_book(isbn, now):
             del self.active_loans[loan_key]
+            with self._shared_lock:
+                self._untrack_loan(reader_id, isbn)
             return True, fine
         
         return False, 0.0
     
-    def calculate_fine(self, due_date: datetime) -> float:
-        """Расчет штрафа за просрочку"""
-        now = datetime.now()
+    def apply_batch(self, ops: Iterable[Tuple[str, str, str]],
+                    with_messages: bool = False) -> List[Tuple[bool, Any]]:
+        """
+        Пакетное применение выдач и возвратов
+        ops - операции ('borrow' или 'return', reader_id, isbn); пакет целиком
+        проверяется до применения, все операции получают одно время, а
+        сообщения о выдаче строятся только при with_messages=True.
+        Возвращает результат каждой операции: (успех, сообщение или None) для
+        выдачи и (успех, штраф) для возврата. ReaderNotFoundError и
+        BookNotAvailableError не прерывают пакет, а становятся результатом (False, ошибка)
+        """
+        ops = list(ops)
+        for position, op in enumerate(ops):
+            if len(op) != 3 or op[0] not in self.BATCH_OPERATIONS:
+                raise ValueError(
+                    f"Операция {position}: ожидается ('borrow' | 'return', reader_id, isbn), получено {op!r}")
+        
+        now = self._now()
+        results: List[Tuple[bool, Any]] = []
+        for action, reader_id, isbn in ops:
+            try:
+                with self._lock_reader(reader_id), self._lock_book(isbn):
+                    if action == 'borrow':
+                        results.append(self._borrow_book(reader_id, isbn, now, with_messages))
+                    else:
+                        results.append(self._return_book(reader_id, isbn, now))
+            except (ReaderNotFoundError, BookNotAvailableError) as error:
+                results.append((False, error))
+        return results
+    
+    def _track_loan(self, reader_id: str, isbn: str, due_date: datetime) -> None:
+        """Добавление займа в кучу сроков и индекс по читателю"""
+        entry = [due_date, self._loan_seq, reader_id, isbn]
+        self._loan_seq += 1
+        heapq.heappush(self._due_heap, entry)
+        self._due_entries[(reader_id, isbn)] = entry
+        self._loans_by_reader.setdefault(reader_id, {})[isbn] = due_date
+    
+    def _untrack_loan(self, reader_id: str, isbn: str) -> None:
+        """Удаление займа из индексов (в куче - ленивое, с периодическим сжатием)"""
+        entry = self._due_entries.pop((reader_id, isbn))
+        entry[2] = entry[3] = None
+        self._stale_due_entries += 1
+        
+        reader_loans = self._loans_by_reader[reader_id]
+        del reader_loans[isbn]
+        if not reader_loans:
+            del self._loans_by_reader[reader_id]
+        
+        heap = self._due_heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._stale_due_entries -= 1
+        if self._stale_due_entries * 2 > len(heap):
+            self._due_heap = [item for item in heap if item[2] is not None]
+            heapq.heapify(self._due_heap)
+            self._stale_due_entries = 0
+    
+    def _count_borrow(self, isbn: str) -> None:
+        """Увеличение счетчика выдач книги с переносом на следующий уровень популярности"""
+        count = self._borrow_counts.get(isbn, 0)
+        if count:
+            level = self._popularity[count]
+            del level[isbn]
+            if not level:
+                del self._popularity[count]
+                del self._popularity_levels[bisect.bisect_left(self._popularity_levels, count)]
+        
+        count += 1
+        self._borrow_counts[isbn] = count
+        level = self._popularity.get(count)
+        if level is None:
+            level = self._popularity[count] = {}
+            bisect.insort(self._popularity_levels, count)
+        level[isbn] = None
+    
+    def calculate_fine(self, due_date: datetime, now: Optional[datetime] = None) -> float:
+        """Расчет штрафа за просрочку (на момент now, по умолчанию - на текущий)"""
+        if now is None:
+            now = self._now()
         if now <= due_date:
             return 0.0
         
@@ -221,16 +803,32 @@ class Library:
         Получение списка просроченных займов
         Возвращает список (reader_id, isbn, days_overdue, fine)
         """
-        now = datetime.now()
+        now = self._now()
         overdue = []
         
-        for (reader_id, isbn), due_date in self.active_loans.items():
-            if now > due_date:
-                days = (now - due_date).days
-                fine = self.calculate_fine(due_date)
-                overdue.append((reader_id, isbn, days, fine))
+        # Обход кучи от корня: открываем потомков только у просроченных
+        # элементов, поэтому стоимость O(k log k) по числу просроченных
+        with self._shared_lock:
+            heap = self._due_heap
+            frontier = [(heap[0][0], heap[0][1], 0)] if heap else []
+            while frontier:
+                due_date, seq, i = heapq.heappop(frontier)
+                if not now > due_date:
+                    break
+                
+                reader_id, isbn = heap[i][2], heap[i][3]
+                if reader_id is not None:
+                    days = (now - due_date).days
+                    fine = self.calculate_fine(due_date, now)
+                    overdue.append((seq, (reader_id, isbn, days, fine)))
+                
+                for child in (2 * i + 1, 2 * i + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
         
-        return sorted(overdue, key=lambda x: x[2], reverse=True)
+        # Порядок как у сортировки займов по дням просрочки: при равенстве - по времени выдачи
+        overdue.sort(key=lambda item: (-item[1][2], item[0]))
+        return [loan for _, loan in overdue]
     
     def get_reader_stats(self, reader_id: str) -> Dict:
         """Получение статистики читателя"""
@@ -238,41 +836,162 @@ class Library:
             raise ReaderNotFoundError(f"Читатель {reader_id} не найден")
         
         reader = self.readers[reader_id]
-        borrowed_count = len([h for h in reader.history if h[1] == 'borrowed'])
-        returned_count = len([h for h in reader.history if h[1] == 'returned'])
-        
-        # Расчет общего штрафа
-        total_fine = sum(
-            self.calculate_fine(due_date) 
-            for (rid, isbn), due_date in self.active_loans.items() 
-            if rid == reader_id
-        )
-        
-        return {
-            'name': reader.name,
-            'currently_borrowed': len(reader.borrowed_books),
-            'total_borrowed': borrowed_count,
-            'total_returned': returned_count,
-            'current_fines': total_fine
-        }
+        with self._lock_reader(reader_id):
+            borrowed_count = reader.history.borrowed_count
+            returned_count = reader.history.returned_count
+            
+            # Расчет общего штрафа
+            now = self._now()
+            total_fine = sum(
+                self.calculate_fine(due_date, now) 
+                for due_date in self._loans_by_reader.get(reader_id, {}).values()
+            )
+            
+            return {
+                'name': reader.name,
+                'currently_borrowed': len(reader.borrowed_books),
+                'total_borrowed': borrowed_count,
+                'total_returned': returned_count,
+                'current_fines': total_fine
+            }
     
     def get_popular_books(self, top_n: int = 5) -> List[Tuple[Book, int]]:
-        """Получение самых популярных книг (по количеству выдач)"""
-        borrow_counts: Dict[str, int] = {}
-        
-        for reader in self.readers.values():
-            for isbn, action, _ in reader.history:
-                if action == 'borrowed':
-                    borrow_counts[isbn] = borrow_counts.get(isbn, 0) + 1
-        
-        sorted_books = sorted(
-            [(self.books[isbn], count) for isbn, count in borrow_counts.items() 
-             if isbn in self.books],
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
-        return sorted_books[:top_n]
+        """
+        Получение самых популярных книг (по количеству выдач)
+        При равном числе выдач выше та книга, что набрала его раньше
+        """
+        with self._shared_lock:
+            ranking = self._iter_popular_books()
+            if top_n < 0:
+                return list(ranking)[:top_n]
+            return list(islice(ranking, top_n))
+    
+    def _iter_popular_books(self) -> Iterator[Tuple[Book, int]]:
+        """Книги каталога по убыванию числа выдач"""
+        for count in reversed(self._popularity_levels):
+            for isbn in self._popularity[count]:
+                if isbn in self.books:
+                    yield self.books[isbn], count
+
+
+BOOK_FIELDS = ('isbn', 'title', 'author', 'year', 'copies')
+READER_FIELDS = ('reader_id', 'name', 'email')
+
+
+def _csv_rows(file: TextIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Строки CSV с заголовком в виде (номер строки, словарь)"""
+    rows = csv.DictReader(file)
+    for row in rows:
+        yield rows.line_num, row
+
+
+def _jsonl_rows(file: TextIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Объекты JSON Lines в виде (номер строки, словарь), пустые строки пропускаются"""
+    for line_num, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Строка {line_num}: некорректный JSON ({error.msg})") from error
+
+
+def _books_from_rows(rows: Iterator[Tuple[int, Dict[str, Any]]], batch_size: int) -> Iterator[Book]:
+    """Проверка строк пачками и создание книг без повторной проверки в конструкторе"""
+    for batch in batched(rows, batch_size):
+        current_year = datetime.now().year
+        books = []
+        for line_num, row in batch:
+            try:
+                isbn, title, author = row['isbn'], row['title'], row['author']
+                year = int(row['year'])
+                copies = row.get('copies')
+                copies = 1 if copies is None or copies == '' else int(copies)
+                Book._validate(isbn, title, author, year, copies, current_year)
+            except KeyError as error:
+                raise ValueError(f"Строка {line_num}: отсутствует поле {error}") from error
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"Строка {line_num}: {error}") from error
+            books.append(Book._trusted(isbn, title, author, year, copies))
+        yield from books
+
+
+def _readers_from_rows(rows: Iterator[Tuple[int, Dict[str, Any]]], batch_size: int) -> Iterator[Reader]:
+    """Проверка строк пачками и создание читателей без повторной проверки в конструкторе"""
+    for batch in batched(rows, batch_size):
+        readers = []
+        for line_num, row in batch:
+            try:
+                reader_id, name, email = row['reader_id'], row['name'], row['email']
+                Reader._validate(reader_id, name, email)
+            except KeyError as error:
+                raise ValueError(f"Строка {line_num}: отсутствует поле {error}") from error
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"Строка {line_num}: {error}") from error
+            readers.append(Reader._trusted(reader_id, name, email))
+        yield from readers
+
+
+def read_books_csv(file: TextIO, batch_size: int = 10_000) -> Iterator[Book]:
+    """Потоковое чтение книг из CSV с заголовком isbn,title,author,year,copies"""
+    return _books_from_rows(_csv_rows(file), batch_size)
+
+
+def read_books_jsonl(file: TextIO, batch_size: int = 10_000) -> Iterator[Book]:
+    """Потоковое чтение книг из JSON Lines с полями isbn, title, author, year, copies"""
+    return _books_from_rows(_jsonl_rows(file), batch_size)
+
+
+def read_readers_csv(file: TextIO, batch_size: int = 10_000) -> Iterator[Reader]:
+    """Потоковое чтение читателей из CSV с заголовком reader_id,name,email"""
+    return _readers_from_rows(_csv_rows(file), batch_size)
+
+
+def read_readers_jsonl(file: TextIO, batch_size: int = 10_000) -> Iterator[Reader]:
+    """Потоковое чтение читателей из JSON Lines с полями reader_id, name, email"""
+    return _readers_from_rows(_jsonl_rows(file), batch_size)
+
+
+def write_books_csv(books: Iterable[Book], file: TextIO) -> int:
+    """Потоковая выгрузка книг в CSV, возвращает число записанных книг"""
+    writer = csv.writer(file)
+    writer.writerow(BOOK_FIELDS)
+    count = 0
+    for book in books:
+        writer.writerow((book.isbn, book.title, book.author, book.year, book.total_copies))
+        count += 1
+    return count
+
+
+def write_books_jsonl(books: Iterable[Book], file: TextIO) -> int:
+    """Потоковая выгрузка книг в JSON Lines, возвращает число записанных книг"""
+    count = 0
+    for book in books:
+        record = dict(zip(BOOK_FIELDS, (book.isbn, book.title, book.author, book.year, book.total_copies)))
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_readers_csv(readers: Iterable[Reader], file: TextIO) -> int:
+    """Потоковая выгрузка читателей в CSV, возвращает число записанных читателей"""
+    writer = csv.writer(file)
+    writer.writerow(READER_FIELDS)
+    count = 0
+    for reader in readers:
+        writer.writerow((reader.reader_id, reader.name, reader.email))
+        count += 1
+    return count
+
+
+def write_readers_jsonl(readers: Iterable[Reader], file: TextIO) -> int:
+    """Потоковая выгрузка читателей в JSON Lines, возвращает число записанных читателей"""
+    count = 0
+    for reader in readers:
+        record = dict(zip(READER_FIELDS, (reader.reader_id, reader.name, reader.email)))
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
 
 
 def create_sample_library() -> Library:
@@ -1,5 +1,9 @@
+import io
 import pytest
-from complex_func import analyze_text_statistics
+import tracemalloc
+import complex_func
+from complex_func import (CountMinSketch, HeavyHitters, HyperLogLog, TextStatsAccumulator, analyze_text_statistics,
+                          analyze_text_statistics_parallel, analyze_text_stream)
 
 
 def test_basic_text_analysis():
@@ -241,4 +245,277 @@ def test_return_structure():
     assert isinstance(result["unique_words_count"], int)
     assert isinstance(result["unique_words_percentage"], float)
     assert isinstance(result["top_3_words"], list)
-    assert isinstance(result["word_frequency"], dict)
\ No newline at end of file
+    assert isinstance(result["word_frequency"], dict)
+
+
+def test_mixed_marks_start_new_sentences():
+    """Тест: схлопываются только одинаковые знаки, "?!" - два предложения"""
+    result = analyze_text_statistics("Really?! Yes... Ok")
+    
+    assert result["total_sentences"] == 4
+
+
+def test_ties_keep_first_occurrence():
+    """Тест: при равной длине берется первое слово, частоты идут в порядке появления"""
+    result = analyze_text_statistics("bb aa cc dd a b. Cc aa bb")
+    
+    assert result["longest_word"] == "bb"
+    assert result["shortest_word"] == "a"
+    assert list(analyze_text_statistics("bb aa cc", min_word_length=1)["word_frequency"]) == ["bb", "aa", "cc"]
+
+
+def test_numeric_only_chars_split_words():
+    """Тест: символы вроде ½ не буквы и не цифры - они разделяют слова"""
+    result = analyze_text_statistics("a½b Ⅻ x² 3")
+    
+    assert result["total_words"] == 4
+    assert result["word_frequency"] == {}
+    assert result["unique_words_count"] == 4
+
+
+def test_long_text_split_into_chunks(monkeypatch):
+    """Тест: разбор кусками не разрезает слова и серии знаков на границах"""
+    text = "Привет, мир!!! Python3 это язык... Да?! " * 50
+    expected = analyze_text_statistics(text)
+    
+    monkeypatch.setattr(complex_func, "SCAN_CHUNK_SIZE", 7)
+    assert analyze_text_statistics(text) == expected
+    assert expected["total_sentences"] == 200
+    assert expected["word_frequency"]["python3"] == 50
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 1000])
+def test_stream_matches_full_text(chunk_size):
+    """Тест: потоковый анализ совпадает с анализом всего текста при любых границах кусков"""
+    text = "  Привет, мир!!! Python3 - это язык... ΟΔΟΣ ΟΔΟΣ.Α Да?! Ok  \n\t "
+    
+    for min_word_length in (1, 3):
+        expected = analyze_text_statistics(text, min_word_length)
+        result = analyze_text_stream(io.StringIO(text), min_word_length, chunk_size=chunk_size)
+        assert result == expected
+        assert list(result["word_frequency"]) == list(expected["word_frequency"])
+
+
+def test_stream_reads_file(tmp_path):
+    """Тест: анализ файла с диска по кускам"""
+    path = tmp_path / "text.txt"
+    path.write_text("Hello world! Python is great. " * 1000, encoding="utf-8")
+    
+    with open(path, encoding="utf-8") as file:
+        result = analyze_text_stream(file, chunk_size=100)
+    
+    assert result["total_sentences"] == 2000
+    assert result["word_frequency"]["python"] == 1000
+    assert result["total_characters"] == 30 * 1000 - 1
+
+
+def test_stream_errors():
+    """Тест: пустой поток, бинарный файл и неположительный размер куска"""
+    with pytest.raises(ValueError):
+        analyze_text_stream(io.StringIO(""))
+    
+    with pytest.raises(ValueError):
+        analyze_text_stream(io.StringIO(" \n\t "), chunk_size=2)
+    
+    with pytest.raises(TypeError):
+        analyze_text_stream(io.BytesIO(b"text"))
+    
+    with pytest.raises(ValueError):
+        analyze_text_stream(io.StringIO("text"), chunk_size=0)
+
+
+@pytest.mark.parametrize("shards", [1, 3, 7, 50])
+def test_parallel_matches_serial(shards):
+    """Тест: параллельный анализ по частям совпадает с последовательным"""
+    text = "Привет, мир!!! Python3 - это язык... ΟΔΟΣ ΟΔΟΣ.Α Да?! Ok bb aa " * 20
+    
+    expected = analyze_text_statistics(text, 2)
+    result = analyze_text_statistics_parallel(text, 2, max_workers=2, shards=shards)
+    
+    assert result == expected
+    assert list(result["word_frequency"]) == list(expected["word_frequency"])
+
+
+def test_parallel_errors():
+    """Тест: проверки входных данных параллельной версии"""
+    with pytest.raises(TypeError):
+        analyze_text_statistics_parallel(123)
+    
+    with pytest.raises(ValueError):
+        analyze_text_statistics_parallel("  ")
+    
+    with pytest.raises(ValueError):
+        analyze_text_statistics_parallel("text", shards=-1)
+    
+    with pytest.raises(ValueError, match="Число частей"):
+        analyze_text_statistics_parallel("text", shards=0)
+    
+    with pytest.raises(ValueError, match="Число процессов"):
+        analyze_text_statistics_parallel("text", max_workers=0)
+
+
+def test_count_min_sketch_bounds():
+    """Тест: оценка Count-Min Sketch не меньше частоты и завышена не больше error * total"""
+    sketch = CountMinSketch(error=0.01, error_probability=0.01)
+    counts = {f"w{i}": i % 50 + 1 for i in range(2000)}
+    for word, count in counts.items():
+        sketch.add(word, count)
+    
+    errors = [sketch.estimate(word) - count for word, count in counts.items()]
+    assert min(errors) >= 0
+    assert sum(error > 0.01 * sketch.total for error in errors) <= 0.01 * len(counts)
+    assert sketch.memory_size() == 8 * sketch.width * sketch.depth
+
+
+def test_heavy_hitters_keep_frequent_items():
+    """Тест: частые элементы остаются среди кандидатов при потоке редких"""
+    hitters = HeavyHitters(CountMinSketch(error=0.001), capacity=10)
+    for i in range(5000):
+        hitters.add(f"rare{i}")
+        hitters.add("top", 3)
+        if i % 2:
+            hitters.add("second")
+    
+    assert [item for item, _ in hitters.most_common(2)] == ["top", "second"]
+    assert hitters.most_common(1)[0][1] >= 15000
+    assert len(hitters.counts) == 10
+
+
+def test_hyperloglog_estimate():
+    """Тест: оценка HyperLogLog в пределах нескольких стандартных ошибок"""
+    counter = HyperLogLog(error=0.01)
+    for i in range(50000):
+        counter.add(f"word{i}")
+        counter.add(f"word{i // 2}")
+    
+    assert abs(len(counter) - 50000) <= 0.05 * 50000
+    assert counter.memory_size() == 2 ** counter.precision
+    assert len(HyperLogLog()) == 0
+
+
+def test_approximate_mode_matches_exact_fields():
+    """Тест: в приближенном режиме точные поля совпадают, частоты и уникальные слова оцениваются"""
+    words = [f"word{i % 997}" for i in range(20000)] + ["python"] * 3000 + ["data"] * 2000 + ["ok"] * 1500
+    text = ". ".join(" ".join(words[i:i + 10]) for i in range(0, len(words), 10)) + "!"
+    
+    exact = analyze_text_statistics(text)
+    approximate = analyze_text_statistics(text, approximate=True, top_candidates=20)
+    
+    for key in ("total_characters", "total_words", "total_sentences", "longest_word", "shortest_word",
+                "average_word_length"):
+        assert approximate[key] == exact[key]
+    assert [item["word"] for item in approximate["top_3_words"][:2]] == ["python", "data"]
+    assert approximate["top_3_words"][0]["count"] >= 3000
+    assert len(approximate["word_frequency"]) == 20
+    assert "ok" not in approximate["word_frequency"]
+    assert abs(approximate["unique_words_count"] - exact["unique_words_count"]) <= 0.05 * exact["unique_words_count"]
+
+
+def test_approximate_mode_errors():
+    """Тест: приближенный режим без слов и с недопустимыми параметрами"""
+    result = analyze_text_statistics("!!! ...", approximate=True)
+    assert result == analyze_text_statistics("!!! ...")
+    
+    with pytest.raises(ValueError):
+        analyze_text_statistics("text", approximate=True, frequency_error=0)
+    
+    with pytest.raises(ValueError):
+        analyze_text_statistics("text", approximate=True, unique_error=1.5)
+    
+    with pytest.raises(ValueError):
+        analyze_text_statistics("text", approximate=True, top_candidates=0)
+
+
+def test_accumulator_snapshot_after_each_feed():
+    """Тест: после каждого feed снимок равен анализу всего текста до этого момента"""
+    parts = ["  Привет, ми", "р!", "!! Python", "3 - это язык..", ". ΟΔΟ", "Σ ΟΔΟΣ.Α Да?", "! Ok", " \n", "bb aa"]
+    accumulator = TextStatsAccumulator(min_word_length=2)
+    text = ""
+    
+    for part in parts:
+        accumulator.feed(part)
+        text += part
+        snapshot = accumulator.snapshot()
+        assert snapshot == analyze_text_statistics(text, 2)
+        assert list(snapshot["word_frequency"]) == list(analyze_text_statistics(text, 2)["word_frequency"])
+
+
+def test_accumulator_snapshot_does_not_change_state():
+    """Тест: снимок с недописанным словом не мешает дописать его дальше"""
+    accumulator = TextStatsAccumulator()
+    accumulator.feed("Hello wor")
+    
+    assert accumulator.snapshot()["word_frequency"] == {"hello": 1, "wor": 1}
+    accumulator.feed("ld. Hello")
+    assert accumulator.snapshot()["word_frequency"] == {"hello": 2, "world": 1}
+    assert accumulator.snapshot()["total_sentences"] == 2
+
+
+def test_accumulator_updates_top_and_lengths_incrementally():
+    """Тест: топ-3, самое длинное и короткое слово обновляются по новым словам, включая недописанное"""
+    accumulator = TextStatsAccumulator()
+    accumulator.feed("beta alpha gamma alpha beta deltaword")
+    
+    snapshot = accumulator.snapshot()
+    assert snapshot["top_3_words"] == [{"word": "alpha", "count": 2}, {"word": "beta", "count": 2},
+                                       {"word": "deltaword", "count": 1}]
+    assert (snapshot["longest_word"], snapshot["shortest_word"]) == ("deltaword", "beta")
+    
+    accumulator.feed("s gamma gamma ox")
+    snapshot = accumulator.snapshot()
+    assert snapshot["top_3_words"] == [{"word": "gamma", "count": 3}, {"word": "alpha", "count": 2},
+                                       {"word": "beta", "count": 2}]
+    assert (snapshot["longest_word"], snapshot["shortest_word"]) == ("deltawords", "ox")
+    
+    accumulator.feed("en oxen")
+    assert accumulator.snapshot() == analyze_text_statistics(
+        "beta alpha gamma alpha beta deltawords gamma gamma oxen oxen")
+
+
+def test_accumulator_snapshot_is_independent_copy():
+    """Тест: изменение возвращенного снимка не влияет на следующие"""
+    accumulator = TextStatsAccumulator()
+    accumulator.feed("one two three two ")
+    expected = analyze_text_statistics("one two three two ")
+    
+    snapshot = accumulator.snapshot()
+    snapshot["word_frequency"].clear()
+    snapshot["top_3_words"].clear()
+    
+    assert accumulator.snapshot() == expected
+
+
+def test_accumulator_errors():
+    """Тест: снимок пустого документа и добавление не строки"""
+    accumulator = TextStatsAccumulator()
+    with pytest.raises(ValueError):
+        accumulator.snapshot()
+    
+    accumulator.feed("   ")
+    accumulator.feed("")
+    with pytest.raises(ValueError):
+        accumulator.snapshot()
+    
+    with pytest.raises(TypeError):
+        accumulator.feed(b"text")
+
+
+def test_chunk_cache_released_after_analysis():
+    """Тест: разборы кусков не остаются в памяти после анализа, длинные куски не запоминаются"""
+    text = " ".join(f"{i:06d}" + "x" * 2000 for i in range(500)) + " short short"
+    
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        analyze_text_statistics(text)
+        analyze_text_statistics(text, approximate=True)
+        accumulator = TextStatsAccumulator()
+        accumulator.feed(text)
+        accumulator.snapshot()
+        assert list(accumulator._chunk_cache) == ["short"]
+        del accumulator
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    assert after - before < 100_000
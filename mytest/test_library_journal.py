@@ -0,0 +1,264 @@
+"""
+Тесты журналируемой библиотеки: журнал операций, снимки и восстановление
+"""
+import json
+import sqlite3
+import threading
+import pytest
+from datetime import datetime, timedelta
+from library_system import Book, Reader, BookNotAvailableError
+from library_journal import JournaledLibrary
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Фикстура с управляемым временем library_system.datetime.now()"""
+    class Clock:
+        current = datetime(2025, 10, 1, 12, 0, 0)
+        
+        @classmethod
+        def now(cls):
+            return cls.current
+        
+        @classmethod
+        def advance(cls, **kwargs):
+            cls.current += timedelta(**kwargs)
+    
+    monkeypatch.setattr('library_system.datetime', Clock)
+    return Clock
+
+
+def library_state(library):
+    """Все наблюдаемое состояние библиотеки для сравнения"""
+    return (
+        [(b.isbn, b.title, b.author, b.year, b.total_copies, b.available_copies) for b in library.books.values()],
+        [(r.reader_id, r.name, r.email, list(r.borrowed_books), list(r.history))
+         for r in library.readers.values()],
+        list(library.active_loans.items()),
+        library.get_overdue_loans(),
+        [(book.isbn, count) for book, count in library.get_popular_books(top_n=100)],
+        [book.isbn for book in library.find_books_by_author("толстой")],
+        {reader_id: library.get_reader_stats(reader_id) for reader_id in library.readers},
+    )
+
+
+def run_operations(library, clock):
+    """Наполнение библиотеки: книги, читатели, выдачи, возвраты и просрочки"""
+    library.add_book(Book("978-1", "Война и мир", "Лев Толстой", 1869, 2))
+    library.add_book(Book("978-2", "Анна Каренина", "Лев Толстой", 1877, 1))
+    library.add_book(Book("978-3", "Идиот", "Фёдор Достоевский", 1869, 3))
+    library.add_book(Book("978-1", "Война и мир", "Лев Толстой", 1869, 1))
+    for i in range(1, 4):
+        library.register_reader(Reader(f"R00{i}", f"Читатель {i}", f"reader{i}@example.com"))
+    
+    for reader_id, isbn in [("R001", "978-1"), ("R002", "978-1"), ("R003", "978-3"), ("R001", "978-2")]:
+        clock.advance(hours=5)
+        library.borrow_book(reader_id, isbn)
+    clock.advance(days=20)
+    library.return_book("R002", "978-1")
+    library.borrow_book("R003", "978-1")
+    clock.advance(days=3)
+
+
+# ============= ТЕСТЫ ЖУРНАЛА =============
+
+class TestJournaledLibrary:
+    """Тесты журнала операций и восстановления"""
+    
+    def test_should_recover_state_from_journal(self, tmp_path, clock):
+        """Тест: после перезапуска состояние восстанавливается из журнала"""
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as library:
+            run_operations(library, clock)
+            expected = library_state(library)
+            lsn = library.lsn
+        
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as restored:
+            assert library_state(restored) == expected
+            assert restored.lsn == lsn
+    
+    def test_should_recover_from_snapshot_and_tail(self, tmp_path, clock):
+        """Тест: восстановление из снимка проигрывает только хвост журнала"""
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=4) as library:
+            run_operations(library, clock)
+            expected = library_state(library)
+            lsn = library.lsn
+        
+        records = [json.loads(line) for line in (tmp_path / JournaledLibrary.JOURNAL_FILE).read_text().splitlines()]
+        assert (tmp_path / JournaledLibrary.SNAPSHOT_FILE).exists()
+        assert 0 < len(records) < 4
+        assert records[-1]['lsn'] == lsn
+        
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=4) as restored:
+            assert library_state(restored) == expected
+            
+            # Восстановленная библиотека продолжает работать как обычная
+            clock.advance(days=1)
+            restored.return_book("R003", "978-1")
+            restored.return_book("R001", "978-2")
+            restored.borrow_book("R002", "978-2")
+            expected = library_state(restored)
+        
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert library_state(restored) == expected
+    
+    def test_snapshot_should_clear_journal(self, tmp_path, clock):
+        """Тест: ручной снимок очищает журнал и сохраняет LSN"""
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as library:
+            run_operations(library, clock)
+            assert library.snapshot() == library.lsn
+            expected = library_state(library)
+        
+        assert (tmp_path / JournaledLibrary.JOURNAL_FILE).read_bytes() == b''
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert library_state(restored) == expected
+    
+    def test_should_skip_operations_covered_by_snapshot(self, tmp_path, clock):
+        """Тест: сбой между снимком и очисткой журнала не дублирует операции"""
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as library:
+            run_operations(library, clock)
+            journal = (tmp_path / JournaledLibrary.JOURNAL_FILE).read_bytes()
+            library.snapshot()
+            expected = library_state(library)
+        
+        (tmp_path / JournaledLibrary.JOURNAL_FILE).write_bytes(journal)
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert library_state(restored) == expected
+    
+    def test_should_drop_torn_last_record(self, tmp_path, clock):
+        """Тест: оборванная при сбое последняя запись отбрасывается"""
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as library:
+            run_operations(library, clock)
+            expected = library_state(library)
+        
+        journal_path = tmp_path / JournaledLibrary.JOURNAL_FILE
+        journal_path.write_bytes(journal_path.read_bytes() + b'{"lsn": 99, "op": "bor')
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as restored:
+            assert library_state(restored) == expected
+            restored.return_book("R001", "978-1")
+        
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert "978-1" not in restored.readers["R001"].borrowed_books
+    
+    def test_should_not_log_failed_operations(self, tmp_path, clock):
+        """Тест: неуспешные операции не попадают в журнал"""
+        with JournaledLibrary("Библиотека", str(tmp_path)) as library:
+            library.add_book(Book("978-1", "Война и мир", "Лев Толстой", 1869, 1))
+            library.register_reader(Reader("R001", "Читатель", "r1@example.com"))
+            library.register_reader(Reader("R002", "Читатель", "r2@example.com"))
+            library.borrow_book("R001", "978-1")
+            lsn = library.lsn
+            
+            assert library.register_reader(Reader("R001", "Дубликат", "dup@example.com")) is False
+            assert library.borrow_book("R001", "978-404")[0] is False
+            assert library.return_book("R002", "978-1")[0] is False
+            with pytest.raises(BookNotAvailableError):
+                library.borrow_book("R002", "978-1")
+            
+            assert library.lsn == lsn
+    
+    def test_should_replay_failed_borrow_that_changed_copies(self, tmp_path, clock):
+        """Тест: неуспешная выдача, уменьшившая число копий, восстанавливается так же"""
+        reader = Reader("R001", "Читатель", "r1@example.com")
+        reader.borrowed_books.append("978-1")
+        
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as library:
+            library.add_book(Book("978-1", "Война и мир", "Лев Толстой", 1869, 1))
+            library.register_reader(reader)
+            assert library.borrow_book("R001", "978-1") == (False, "Ошибка при выдаче книги")
+            assert library.books["978-1"].available_copies == 0
+            expected = library_state(library)
+        
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as restored:
+            assert library_state(restored) == expected
+            assert restored.books["978-1"].available_copies == 0
+    
+    def test_should_replay_bulk_load_and_reader_history(self, tmp_path, clock):
+        """Тест: массовая загрузка и история читателя до регистрации восстанавливаются"""
+        reader = Reader("R001", "Читатель", "r1@example.com")
+        reader.add_borrowed_book("978-2")
+        
+        with JournaledLibrary("Библиотека", str(tmp_path)) as library:
+            library.bulk_load_books([Book(f"978-{i}", f"Книга {i}", "Лев Толстой", 1900, 1) for i in range(5)])
+            library.bulk_load_books([Book("978-0", "Книга 0", "Лев Толстой", 1900, 2)])
+            library.bulk_register_readers([reader])
+            expected = library_state(library)
+        
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert library_state(restored) == expected
+            assert restored.books["978-0"].total_copies == 3
+    
+    def test_snapshot_should_store_only_own_isbns(self, tmp_path, clock):
+        """Тест: снимок хранит только ISBN из журналов читателей этой библиотеки"""
+        other = Reader("R009", "Читатель", "r9@example.com")
+        other.add_borrowed_book("978-9")
+        
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=None) as library:
+            run_operations(library, clock)
+            library.snapshot()
+        
+        connection = sqlite3.connect(tmp_path / JournaledLibrary.SNAPSHOT_FILE)
+        try:
+            isbns = [isbn for isbn, in connection.execute("SELECT isbn FROM isbns ORDER BY id")]
+        finally:
+            connection.close()
+        assert isbns == ["978-1", "978-3", "978-2"]
+    
+    def test_should_recover_batch_operations(self, tmp_path, clock):
+        """Тест: операции пакета журналируются с общим временем пакета"""
+        with JournaledLibrary("Библиотека", str(tmp_path)) as library:
+            run_operations(library, clock)
+            clock.advance(days=1)
+            library.apply_batch([('return', "R001", "978-1"), ('borrow', "R002", "978-3"), ('borrow', "R404", "978-3")])
+            expected = library_state(library)
+        
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert library_state(restored) == expected
+            assert restored.active_loans[("R002", "978-3")] == clock.current + timedelta(days=14)
+    
+    def test_should_reject_unknown_operation(self, tmp_path):
+        """Тест: неизвестная операция в журнале - ошибка восстановления"""
+        (tmp_path / JournaledLibrary.JOURNAL_FILE).write_text('{"lsn": 1, "op": "burn"}\n')
+        
+        with pytest.raises(ValueError, match="Неизвестная операция в журнале: burn"):
+            JournaledLibrary("Библиотека", str(tmp_path))
+    
+    def test_should_reject_non_positive_snapshot_interval(self, tmp_path):
+        """Тест: интервал снимков должен быть положительным"""
+        with pytest.raises(ValueError, match="Интервал снимков должен быть положительным"):
+            JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=0)
+    
+    def test_thread_safe_mode_should_recover_after_concurrent_operations(self, tmp_path):
+        """Тест: операции из нескольких потоков со снимками восстанавливаются полностью"""
+        with JournaledLibrary("Библиотека", str(tmp_path), snapshot_every=50, thread_safe=True) as library:
+            for i in range(20):
+                library.add_book(Book(f"978-{i}", f"Книга {i}", "Автор", 2000, 2))
+            for i in range(10):
+                library.register_reader(Reader(f"R{i}", f"Читатель {i}", f"r{i}@example.com"))
+            
+            def worker(offset):
+                for step in range(100):
+                    reader_id, isbn = f"R{(offset + step) % 10}", f"978-{(offset * 7 + step) % 20}"
+                    try:
+                        if not library.borrow_book(reader_id, isbn)[0]:
+                            library.return_book(reader_id, isbn)
+                    except BookNotAvailableError:
+                        pass
+            
+            threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            expected_books = {isbn: book.available_copies for isbn, book in library.books.items()}
+            expected_loans = dict(library.active_loans)
+        
+        with JournaledLibrary("Библиотека", str(tmp_path)) as restored:
+            assert {isbn: book.available_copies for isbn, book in restored.books.items()} == expected_books
+            assert dict(restored.active_loans) == expected_loans
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
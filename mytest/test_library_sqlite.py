@@ -0,0 +1,216 @@
+"""
+Тесты библиотеки в SQLite
+Основные тесты test_library_system прогоняются без изменений с SQLiteLibrary
+вместо Library, плюс тесты хранения и индексов
+"""
+import io
+import pytest
+import sqlite3
+import threading
+from datetime import datetime
+import test_library_system as base
+from test_library_system import sample_book, sample_reader, empty_library, library_with_data, mock_datetime_now
+from library_system import Book, Reader, read_books_csv
+from library_sqlite import SQLiteLibrary
+
+
+@pytest.fixture(autouse=True)
+def sqlite_library(monkeypatch):
+    """Фикстура: тесты основного модуля создают SQLiteLibrary вместо Library"""
+    monkeypatch.setattr(base, 'Library', SQLiteLibrary)
+
+
+# ============= ТЕСТЫ ОСНОВНОГО МОДУЛЯ НА SQLITE =============
+
+class TestSQLiteLibrary(base.TestLibrary):
+    """Тесты класса Library на SQLiteLibrary"""
+
+
+class TestSQLiteIntegration(base.TestIntegration):
+    """Интеграционные тесты на SQLiteLibrary"""
+
+
+class TestSQLiteEdgeCases(base.TestEdgeCases):
+    """Граничные случаи на SQLiteLibrary"""
+
+
+class TestSQLiteThreadSafeLibrary(base.TestThreadSafeLibrary):
+    """Стресс-тесты потокобезопасного режима на SQLiteLibrary"""
+    
+    def test_concurrent_first_borrows_should_intern_isbns_once(self, fast_thread_switching):
+        """Тест: выдачи из разных потоков попадают в журналы и счетчики читателей без потерь"""
+        library = SQLiteLibrary("Библиотека", thread_safe=True)
+        isbns = [f"978-{i}" for i in range(300)]
+        for isbn in isbns:
+            library.add_book(Book(isbn, "Книга", "Автор", 2020, 8))
+        for i in range(8):
+            library.register_reader(Reader(f"R{i}", f"Читатель {i}", f"r{i}@example.com"))
+        
+        barrier = threading.Barrier(8)
+        
+        def worker(reader_id):
+            barrier.wait()
+            for isbn in isbns:
+                library.borrow_book(reader_id, isbn)
+                library.return_book(reader_id, isbn)
+        
+        threads = [threading.Thread(target=worker, args=(f"R{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for reader_id in library.readers:
+            stats = library.get_reader_stats(reader_id)
+            assert (stats['total_borrowed'], stats['total_returned']) == (len(isbns), len(isbns))
+            history = library.readers[reader_id].history
+            assert [isbn for isbn, action, _ in history if action == 'borrowed'] == isbns
+
+
+class TestSQLiteBulkImportExport(base.TestBulkImportExport):
+    """Тесты массовой загрузки на SQLiteLibrary"""
+    
+    def test_bulk_load_books_should_index_books_loaded_before_error(self, empty_library):
+        """Тест: загрузка идет одной транзакцией - ошибка в файле откатывает и каталог, и поиск"""
+        data = ("isbn,title,author,year,copies\n"
+                "1,Война и мир,Лев Толстой,1869,1\n"
+                "2,Книга,Автор,999,1\n")
+        
+        with pytest.raises(ValueError, match="Строка 3"):
+            empty_library.bulk_load_books(read_books_csv(io.StringIO(data), batch_size=1))
+        
+        assert "1" not in empty_library.books
+        assert empty_library.find_books_by_author("толстой") == []
+
+
+# ============= ТЕСТЫ ХРАНЕНИЯ =============
+
+class TestSQLiteStorage:
+    """Тесты хранения в файле и индексов"""
+    
+    def test_should_keep_state_after_reopen(self, tmp_path, monkeypatch):
+        """Тест: состояние библиотеки сохраняется в файле базы"""
+        class MockDatetime:
+            @staticmethod
+            def now():
+                return datetime(2025, 10, 1, 12, 0, 0)
+        
+        monkeypatch.setattr('library_system.datetime', MockDatetime)
+        path = str(tmp_path / "library.sqlite3")
+        with SQLiteLibrary("Библиотека", path=path) as library:
+            library.add_book(Book("978-1", "Война и мир", "Лев Толстой", 1869, 2))
+            library.add_book(Book("978-2", "Анна Каренина", "Лев Толстой", 1877, 1))
+            library.register_reader(Reader("R001", "Читатель", "r1@example.com"))
+            library.borrow_book("R001", "978-2")
+            library.borrow_book("R001", "978-1")
+            library.return_book("R001", "978-2")
+        
+        class MockDatetimeLater:
+            @staticmethod
+            def now():
+                return datetime(2025, 10, 25, 12, 0, 0)
+        
+        monkeypatch.setattr('library_system.datetime', MockDatetimeLater)
+        with SQLiteLibrary("Библиотека", path=path) as library:
+            assert list(library.books) == ["978-1", "978-2"]
+            assert library.books["978-1"].available_copies == 1
+            reader = library.readers["R001"]
+            assert reader.borrowed_books == ["978-1"]
+            assert [action for _, action, _ in reader.history] == ['borrowed', 'borrowed', 'returned']
+            assert library.active_loans == {("R001", "978-1"): datetime(2025, 10, 15, 12, 0, 0)}
+            assert library.get_overdue_loans() == [("R001", "978-1", 10, 100.0)]
+            assert [(book.isbn, count) for book, count in library.get_popular_books()] == [("978-2", 1), ("978-1", 1)]
+            assert [book.isbn for book in library.find_books_by_author("толстой")] == ["978-1", "978-2"]
+            
+            # Счетчики популярности продолжаются после повторного открытия
+            library.borrow_book("R001", "978-2")
+            assert library.get_popular_books(top_n=1)[0][0].isbn == "978-2"
+    
+    def test_should_return_same_object_while_referenced(self, empty_library):
+        """Тест: пока на книгу есть ссылка, библиотека возвращает тот же объект"""
+        book = Book("978-1", "Книга", "Автор", 2020, 1)
+        empty_library.add_book(book)
+        
+        assert empty_library.books["978-1"] is book
+        assert empty_library.find_books_by_title("книга")[0] is book
+    
+    def test_should_reload_objects_from_database(self):
+        """Тест: объекты без ссылок загружаются из базы заново с актуальным состоянием"""
+        library = SQLiteLibrary("Библиотека")
+        library.add_book(Book("978-1", "Книга", "Автор", 2020, 2))
+        library.register_reader(Reader("R001", "Читатель", "r1@example.com"))
+        library.borrow_book("R001", "978-1")
+        
+        assert library.books["978-1"].available_copies == 1
+        assert library.readers["R001"].borrowed_books == ["978-1"]
+        assert library.get_reader_stats("R001")['total_borrowed'] == 1
+    
+    def test_borrow_and_return_should_not_read_history(self):
+        """Тест: выдача, возврат и статистика не читают журнал читателя из базы"""
+        library = SQLiteLibrary("Библиотека")
+        library.add_book(Book("978-1", "Книга", "Автор", 2020, 1))
+        library.register_reader(Reader("R001", "Читатель", "r1@example.com"))
+        for _ in range(3):
+            library.borrow_book("R001", "978-1")
+            library.return_book("R001", "978-1")
+        
+        statements = []
+        library._db.set_trace_callback(statements.append)
+        reader = library.readers["R001"]
+        library.borrow_book("R001", "978-1")
+        stats = library.get_reader_stats("R001")
+        library._db.set_trace_callback(None)
+        
+        assert not [statement for statement in statements if "FROM history" in statement]
+        assert (stats['total_borrowed'], stats['total_returned']) == (4, 3)
+        assert (reader.history.borrowed_count, reader.history.returned_count) == (4, 3)
+        assert [action for _, action, _ in reader.history] == ['borrowed', 'returned'] * 3 + ['borrowed']
+        
+        # Загруженный журнал пополняется дальше в памяти
+        library.return_book("R001", "978-1")
+        assert len(reader.history) == 8
+        assert reader.history[-1][:2] == ("978-1", 'returned')
+    
+    def test_should_add_reader_counters_to_old_database(self, tmp_path):
+        """Тест: база без счетчиков читателей дополняется ими по журналу"""
+        path = str(tmp_path / "library.sqlite3")
+        with SQLiteLibrary("Библиотека", path=path) as library:
+            library.add_book(Book("978-1", "Книга", "Автор", 2020, 1))
+            library.register_reader(Reader("R001", "Читатель", "r1@example.com"))
+            library.borrow_book("R001", "978-1")
+            library.return_book("R001", "978-1")
+            library.borrow_book("R001", "978-1")
+        
+        connection = sqlite3.connect(path)
+        connection.execute("ALTER TABLE readers DROP COLUMN borrowed_count")
+        connection.execute("ALTER TABLE readers DROP COLUMN returned_count")
+        connection.close()
+        
+        with SQLiteLibrary("Библиотека", path=path) as library:
+            stats = library.get_reader_stats("R001")
+            assert (stats['total_borrowed'], stats['total_returned']) == (2, 1)
+            library.return_book("R001", "978-1")
+            assert library.get_reader_stats("R001")['total_returned'] == 2
+    
+    @pytest.mark.parametrize("query, index", [
+        ("SELECT * FROM loans WHERE due < 0", "loans_due"),
+        ("SELECT due FROM loans WHERE reader_id = 'R001'", "sqlite_autoindex_loans_1"),
+        ("SELECT * FROM popularity ORDER BY borrow_count DESC, reached LIMIT 5", "popularity_rank"),
+        ("SELECT isbn FROM history WHERE reader_id = 'R001'", "history_reader"),
+    ])
+    def test_queries_should_use_indexes(self, empty_library, query, index):
+        """Тест: запросы отчетов идут по индексам, а не полным перебором"""
+        plan = " ".join(row[-1] for row in empty_library._db.execute("EXPLAIN QUERY PLAN " + query))
+        
+        assert index in plan
+    
+    def test_search_should_use_trigram_index(self, empty_library):
+        """Тест: поиск от трех символов идет по триграммному индексу"""
+        plan = " ".join(row[-1] for row in empty_library._db.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM book_search WHERE author MATCH '\"толст\"'"))
+        
+        assert "VIRTUAL TABLE INDEX" in plan
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -2,12 +2,18 @@
 Полное решение тестов для системы управления библиотекой
 Покрытие: 40+ тестов, все требования выполнены
 """
+import io
 import pytest
+import random
+import sys
+import threading
 from datetime import datetime, timedelta
 from library_system import (
-    Book, Reader, Library,
+    Book, IsbnTable, Reader, Library, ReaderHistory, _SubstringIndex,
     BookNotAvailableError, ReaderNotFoundError,
-    create_sample_library
+    create_sample_library,
+    read_books_csv, read_books_jsonl, read_readers_csv, read_readers_jsonl,
+    write_books_csv, write_books_jsonl, write_readers_csv, write_readers_jsonl
 )
 
 
@@ -162,6 +168,12 @@ class TestBook:
         
         assert result is False
         assert sample_book.available_copies == sample_book.total_copies
+    
+    def test_book_should_not_have_instance_dict(self, sample_book):
+        """Тест: книга хранит поля в слотах, без словаря атрибутов"""
+        assert not hasattr(sample_book, '__dict__')
+        with pytest.raises(AttributeError):
+            sample_book.publisher = "Издательство"
 
 
 # ============= ТЕСТЫ КЛАССА READER =============
@@ -277,6 +289,107 @@ class TestReader:
         result = sample_reader.remove_borrowed_book("978-0-123456-78-9")
         
         assert result is False
+    
+    def test_reader_should_not_have_instance_dict(self, sample_reader):
+        """Тест: читатель хранит поля в слотах, без словаря атрибутов"""
+        assert not hasattr(sample_reader, '__dict__')
+        assert not hasattr(sample_reader.history, '__dict__')
+        with pytest.raises(AttributeError):
+            sample_reader.phone = "+7 900 000-00-00"
+
+
+class TestReaderHistory:
+    """Тесты для компактного журнала операций читателя"""
+    
+    def test_should_return_events_as_tuples(self):
+        """Тест: события читаются обратно без потерь, включая микросекунды"""
+        events = [
+            ("978-1", "borrowed", datetime(2025, 10, 1, 12, 30, 15, 123456)),
+            ("978-2", "borrowed", datetime(1969, 7, 20, 20, 17, 40)),
+            ("978-1", "returned", datetime(2025, 10, 20, 9, 0, 0)),
+        ]
+        history = ReaderHistory(events)
+        
+        assert len(history) == 3
+        assert list(history) == events
+        assert history == events
+        assert history[-1] == events[-1]
+        assert history[1:] == events[1:]
+    
+    def test_should_keep_running_counters(self):
+        """Тест: счетчики выдач и возвратов обновляются при добавлении"""
+        history = ReaderHistory()
+        history.append(("978-1", "borrowed", datetime(2025, 10, 1)))
+        history.append(("978-2", "borrowed", datetime(2025, 10, 2)))
+        history.append(("978-1", "returned", datetime(2025, 10, 3)))
+        
+        assert history.borrowed_count == 2
+        assert history.returned_count == 1
+    
+    def test_should_raise_error_for_unknown_action(self):
+        """Тест: неизвестное действие вызывает ValueError"""
+        history = ReaderHistory()
+        
+        with pytest.raises(ValueError, match="Неизвестное действие"):
+            history.append(("978-1", "lost", datetime(2025, 10, 1)))
+        assert history == []
+    
+    def test_should_raise_index_error_out_of_range(self):
+        """Тест: обращение за пределы журнала вызывает IndexError"""
+        with pytest.raises(IndexError):
+            ReaderHistory()[0]
+    
+    def test_should_keep_events_after_rebind(self):
+        """Тест: перевод журнала в другую таблицу ISBN не меняет событий"""
+        events = [("978-1", "borrowed", datetime(2025, 10, 1)), ("978-2", "borrowed", datetime(2025, 10, 2))]
+        history = ReaderHistory(events)
+        table = IsbnTable()
+        table.intern("978-2")
+        
+        history.rebind(table)
+        history.append(("978-1", "returned", datetime(2025, 10, 3)))
+        
+        assert history.isbn_table is table
+        assert list(table) == ["978-2", "978-1"]
+        assert history == events + [("978-1", "returned", datetime(2025, 10, 3))]
+    
+    def test_libraries_should_not_share_isbn_tables(self):
+        """Тест: у каждой библиотеки своя таблица ISBN журналов читателей"""
+        first, second = Library("Первая"), Library("Вторая")
+        for library, isbn in ((first, "978-1"), (second, "978-2")):
+            reader = Reader("R001", "Иван Петров", "ivan@example.com")
+            reader.history.append((isbn, "borrowed", datetime(2025, 10, 1)))
+            library.register_reader(reader)
+        
+        assert list(first._isbn_table) == ["978-1"]
+        assert list(second._isbn_table) == ["978-2"]
+
+
+class TestSubstringIndex:
+    """Тесты триграммного индекса поиска"""
+    
+    def test_should_keep_postings_sorted_for_out_of_order_ids(self):
+        """Тест: номера, добавленные не по порядку (параллельные add_book), остаются отсортированными"""
+        texts = ["Толстой", "Толстая", "Достоевский", "То"]
+        index = _SubstringIndex(texts.__getitem__)
+        for doc_id in (2, 0, 3, 1):
+            index.add(doc_id, texts[doc_id])
+        
+        assert index.search("") == [0, 1, 2, 3]
+        assert index.search("толст") == [0, 1]
+        assert index.search("то") == [0, 1, 2, 3]
+        assert index.search("ая") == [1]
+        assert index.search("ой") == [0]
+        assert all(list(postings) == sorted(postings) for postings in index._postings.values())
+    
+    def test_should_not_copy_texts(self):
+        """Тест: кандидаты проверяются по исходным строкам, а не по копиям в индексе"""
+        texts = ["Война и мир"]
+        index = _SubstringIndex(texts.__getitem__)
+        index.add(0, texts[0])
+        texts[0] = "Анна Каренина"
+        
+        assert index.search("война и") == []
 
 
 # ============= ТЕСТЫ КЛАССА LIBRARY =============
@@ -366,6 +479,49 @@ class TestLibrary:
         books = library_with_data.find_books_by_title(query)
         assert len(books) == expected_count
     
+    @pytest.mark.parametrize("query", ["", "р", "ОР", "ул", "аргарит", "1984", "Дж.", "к. р"])
+    def test_find_books_should_match_linear_scan(self, library_with_data, query):
+        """Тест: поиск по индексу совпадает с полным перебором каталога"""
+        books = list(library_with_data.books.values())
+        
+        assert library_with_data.find_books_by_author(query) == [
+            book for book in books if query.lower() in book.author.lower()
+        ]
+        assert library_with_data.find_books_by_title(query) == [
+            book for book in books if query.lower() in book.title.lower()
+        ]
+    
+    def test_find_books_should_match_linear_scan_on_large_catalog(self, empty_library):
+        """Тест: пересечение длинных и коротких списков триграмм совпадает с перебором"""
+        for i in range(300):
+            empty_library.add_book(Book(f"978-{i}", f"Том {i} {'тайна' if i % 3 else 'сад'}",
+                                        f"Автор {i % 7}", 2020, 1))
+        books = list(empty_library.books.values())
+        
+        for query in ["том 1", "тайна", "том 29", "ом 2", "автор 3", "сад"]:
+            assert empty_library.find_books_by_title(query) == [
+                book for book in books if query in book.title.lower()
+            ]
+            assert empty_library.find_books_by_author(query) == [
+                book for book in books if query in book.author.lower()
+            ]
+    
+    def test_find_books_should_keep_catalog_order(self, empty_library):
+        """Тест: результаты поиска идут в порядке добавления книг"""
+        for i in (3, 1, 2):
+            empty_library.add_book(Book(f"978-{i}", f"Том {i}", "Автор", 2020, 1))
+        
+        books = empty_library.find_books_by_title("том")
+        
+        assert [book.isbn for book in books] == ["978-3", "978-1", "978-2"]
+    
+    def test_find_books_should_not_duplicate_on_extra_copies(self, empty_library):
+        """Тест: повторное добавление книги не дублирует результаты поиска"""
+        empty_library.add_book(Book("978-1", "Книга", "Автор", 2020, 1))
+        empty_library.add_book(Book("978-1", "Книга", "Автор", 2020, 2))
+        
+        assert len(empty_library.find_books_by_author("автор")) == 1
+    
     def test_get_available_books_should_return_only_available(self, library_with_data):
         """Тест: get_available_books() возвращает только доступные книги"""
         available = library_with_data.get_available_books()
@@ -504,6 +660,88 @@ class TestLibrary:
         assert success is True
         assert fine == pytest.approx(60.0)  # 6 дней * 10.0
     
+    def test_apply_batch_should_match_separate_calls(self, library_with_data, mock_datetime_now, monkeypatch):
+        """Тест: пакет дает те же результаты и состояние, что и поочередные вызовы"""
+        monkeypatch.setattr('library_system.datetime', mock_datetime_now)
+        ops = [
+            ('borrow', "R001", "978-0-545-01022-1"), ('borrow', "R002", "978-0-545-01022-1"),
+            ('borrow', "R001", "978-0-545-01022-1"), ('borrow', "R003", "978-404"),
+            ('return', "R001", "978-0-545-01022-1"), ('return', "R003", "978-5-17-084716-3"),
+            ('borrow', "R003", "978-5-389-01006-7"),
+        ]
+        expected_library = Library("Эталон")
+        for book in library_with_data.books.values():
+            expected_library.add_book(Book(book.isbn, book.title, book.author, book.year, book.total_copies))
+        for reader in library_with_data.readers.values():
+            expected_library.register_reader(Reader(reader.reader_id, reader.name, reader.email))
+        expected = [
+            expected_library.borrow_book(reader_id, isbn) if action == 'borrow'
+            else expected_library.return_book(reader_id, isbn)
+            for action, reader_id, isbn in ops
+        ]
+        
+        assert library_with_data.apply_batch(ops, with_messages=True) == expected
+        assert dict(library_with_data.active_loans) == dict(expected_library.active_loans)
+        assert [(b.isbn, b.available_copies) for b in library_with_data.books.values()] == \
+            [(b.isbn, b.available_copies) for b in expected_library.books.values()]
+        assert [(b.isbn, n) for b, n in library_with_data.get_popular_books()] == \
+            [(b.isbn, n) for b, n in expected_library.get_popular_books()]
+    
+    def test_apply_batch_should_skip_messages_by_default(self, library_with_data):
+        """Тест: без with_messages сообщения о выдаче не строятся"""
+        results = library_with_data.apply_batch([
+            ('borrow', "R001", "978-0-545-01022-1"),
+            ('borrow', "R001", "978-0-545-01022-1"),
+            ('return', "R001", "978-0-545-01022-1"),
+        ])
+        
+        assert results == [(True, None), (False, None), (True, 0.0)]
+    
+    def test_apply_batch_should_use_one_timestamp(self, library_with_data, monkeypatch):
+        """Тест: все операции пакета получают одно время"""
+        calls = []
+        
+        class MockDatetime:
+            @staticmethod
+            def now():
+                calls.append(1)
+                return datetime(2025, 10, 1, 12, 0, len(calls))
+        
+        monkeypatch.setattr('library_system.datetime', MockDatetime)
+        library_with_data.apply_batch([
+            ('borrow', "R001", "978-0-545-01022-1"),
+            ('borrow', "R002", "978-5-17-084716-3"),
+            ('return', "R001", "978-0-545-01022-1"),
+        ])
+        
+        assert len(calls) == 1
+        assert library_with_data.active_loans[("R002", "978-5-17-084716-3")] == datetime(2025, 10, 15, 12, 0, 1)
+        assert [event[2] for event in library_with_data.readers["R001"].history] == [datetime(2025, 10, 1, 12, 0, 1)] * 2
+    
+    def test_apply_batch_should_capture_operation_errors(self, library_with_data):
+        """Тест: ошибки отдельных операций не прерывают пакет"""
+        library_with_data.borrow_book("R001", "978-5-389-01006-7")
+        library_with_data.borrow_book("R002", "978-5-389-01006-7")
+        
+        results = library_with_data.apply_batch([
+            ('borrow', "R999", "978-0-545-01022-1"),
+            ('borrow', "R003", "978-5-389-01006-7"),
+            ('borrow', "R003", "978-0-545-01022-1"),
+        ])
+        
+        assert isinstance(results[0][1], ReaderNotFoundError)
+        assert isinstance(results[1][1], BookNotAvailableError)
+        assert results[0][0] is results[1][0] is False
+        assert results[2] == (True, None)
+    
+    @pytest.mark.parametrize("bad_op", [('lend', "R001", "978-0-545-01022-1"), ('borrow', "R001")])
+    def test_apply_batch_should_reject_invalid_batch_before_applying(self, library_with_data, bad_op):
+        """Тест: некорректная операция отклоняет весь пакет до применения"""
+        with pytest.raises(ValueError, match="Операция 1"):
+            library_with_data.apply_batch([('borrow', "R001", "978-0-545-01022-1"), bad_op])
+        
+        assert len(library_with_data.active_loans) == 0
+    
     def test_calculate_fine_should_return_zero_for_on_time(self, empty_library):
         """Тест: calculate_fine() возвращает 0 для своевременного возврата"""
         due_date = datetime.now() + timedelta(days=1)
@@ -546,6 +784,63 @@ class TestLibrary:
         assert all(len(item) == 4 for item in overdue)
         assert all(item[2] > 0 for item in overdue)  # дни просрочки > 0
     
+    def test_get_overdue_loans_should_sort_and_skip_returned(self, empty_library, monkeypatch):
+        """Тест: get_overdue_loans() сортирует по дням и не видит возвращенные книги"""
+        for i in range(1, 5):
+            empty_library.add_book(Book(f"978-{i}", f"Книга {i}", "Автор", 2020, 1))
+            empty_library.register_reader(Reader(f"R00{i}", f"Читатель {i}", f"r{i}@example.com"))
+        
+        # Выдаем книги в разные дни: 1, 3, 3 и 10 октября
+        for day, i in [(3, 1), (1, 2), (3, 3), (10, 4)]:
+            class MockDatetime:
+                @staticmethod
+                def now(day=day):
+                    return datetime(2025, 10, day, 12, 0, 0)
+            
+            monkeypatch.setattr('library_system.datetime', MockDatetime)
+            empty_library.borrow_book(f"R00{i}", f"978-{i}")
+        
+        empty_library.return_book("R002", "978-2")
+        
+        class MockDatetimeOverdue:
+            @staticmethod
+            def now():
+                return datetime(2025, 10, 27, 12, 0, 0)
+        
+        monkeypatch.setattr('library_system.datetime', MockDatetimeOverdue)
+        
+        overdue = empty_library.get_overdue_loans()
+        
+        assert overdue == [
+            ("R001", "978-1", 10, pytest.approx(100.0)),
+            ("R003", "978-3", 10, pytest.approx(100.0)),
+            ("R004", "978-4", 3, pytest.approx(30.0)),
+        ]
+    
+    def test_get_reader_stats_should_sum_only_own_fines(self, library_with_data, monkeypatch):
+        """Тест: get_reader_stats() считает штрафы только по займам читателя"""
+        class MockDatetime:
+            @staticmethod
+            def now():
+                return datetime(2025, 10, 1, 12, 0, 0)
+        
+        monkeypatch.setattr('library_system.datetime', MockDatetime)
+        library_with_data.borrow_book("R001", "978-0-545-01022-1")
+        library_with_data.borrow_book("R001", "978-5-17-084716-3")
+        library_with_data.borrow_book("R002", "978-5-389-01006-7")
+        library_with_data.return_book("R001", "978-5-17-084716-3")
+        
+        class MockDatetimeOverdue:
+            @staticmethod
+            def now():
+                return datetime(2025, 10, 20, 12, 0, 0)
+        
+        monkeypatch.setattr('library_system.datetime', MockDatetimeOverdue)
+        
+        assert library_with_data.get_reader_stats("R001")['current_fines'] == pytest.approx(50.0)
+        assert library_with_data.get_reader_stats("R002")['current_fines'] == pytest.approx(50.0)
+        assert library_with_data.get_reader_stats("R003")['current_fines'] == 0.0
+    
     def test_get_reader_stats_should_return_correct_stats(self, library_with_data):
         """Тест: get_reader_stats() возвращает корректную статистику"""
         library_with_data.borrow_book("R001", "978-0-545-01022-1")
@@ -584,6 +879,51 @@ class TestLibrary:
         popular = empty_library.get_popular_books()
         
         assert popular == []
+    
+    def test_get_popular_books_should_match_history_replay(self, library_with_data):
+        """Тест: счетчики выдач совпадают с подсчетом по истории читателей"""
+        operations = [
+            ("R001", "978-5-389-01006-7"), ("R002", "978-5-17-084716-3"),
+            ("R003", "978-5-389-01006-7"), ("R001", "978-0-545-01022-1"),
+        ]
+        for _ in range(3):
+            for reader_id, isbn in operations:
+                library_with_data.borrow_book(reader_id, isbn)
+            for reader_id, isbn in operations[:3]:
+                library_with_data.return_book(reader_id, isbn)
+        
+        replay = {}
+        for reader in library_with_data.readers.values():
+            for isbn, action, _ in reader.history:
+                if action == 'borrowed':
+                    replay[isbn] = replay.get(isbn, 0) + 1
+        
+        popular = library_with_data.get_popular_books(top_n=10)
+        
+        assert {book.isbn: count for book, count in popular} == replay
+        assert [count for _, count in popular] == sorted(replay.values(), reverse=True)
+    
+    def test_get_popular_books_should_break_ties_by_first_reached(self, library_with_data):
+        """Тест: при равенстве выше книга, раньше набравшая число выдач"""
+        library_with_data.borrow_book("R001", "978-5-389-01006-7")
+        library_with_data.borrow_book("R002", "978-0-545-01022-1")
+        library_with_data.borrow_book("R003", "978-0-545-01022-1")
+        library_with_data.borrow_book("R003", "978-5-389-01006-7")
+        
+        popular = library_with_data.get_popular_books(top_n=1)
+        
+        assert [(book.isbn, count) for book, count in popular] == [("978-0-545-01022-1", 2)]
+    
+    def test_get_popular_books_should_count_history_before_registration(self, empty_library):
+        """Тест: выдачи читателя до регистрации тоже учитываются"""
+        empty_library.add_book(Book("978-1", "Книга", "Автор", 2020, 1))
+        reader = Reader("R001", "Читатель", "reader@example.com")
+        reader.add_borrowed_book("978-1")
+        
+        empty_library.register_reader(reader)
+        
+        popular = empty_library.get_popular_books()
+        assert [(book.isbn, count) for book, count in popular] == [("978-1", 1)]
 
 
 # ============= ИНТЕГРАЦИОННЫЕ ТЕСТЫ =============
@@ -925,6 +1265,268 @@ class TestEdgeCases:
         assert fine == pytest.approx(expected_fine)
 
 
+# ============= ТЕСТЫ ПОТОКОБЕЗОПАСНОГО РЕЖИМА =============
+
+class TestThreadSafeLibrary:
+    """Стресс-тесты библиотеки с полосатыми блокировками"""
+    
+    @pytest.fixture
+    def fast_thread_switching(self):
+        """Фикстура: частое переключение потоков для большего числа гонок"""
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        yield
+        sys.setswitchinterval(interval)
+    
+    def test_concurrent_borrow_and_return_keep_invariants(self, fast_thread_switching):
+        """Тест: параллельные выдачи и возвраты сохраняют число копий и займов"""
+        library = Library("Библиотека", thread_safe=True)
+        for i in range(10):
+            library.add_book(Book(f"978-{i}", f"Книга {i}", "Автор", 2020, 1 + i % 3))
+        for i in range(20):
+            library.register_reader(Reader(f"R{i}", f"Читатель {i}", f"r{i}@example.com"))
+        
+        errors = []
+        
+        def worker(seed):
+            rnd = random.Random(seed)
+            try:
+                for _ in range(2000):
+                    reader_id = f"R{rnd.randrange(20)}"
+                    isbn = f"978-{rnd.randrange(10)}"
+                    if rnd.random() < 0.5:
+                        try:
+                            library.borrow_book(reader_id, isbn)
+                        except BookNotAvailableError:
+                            pass
+                    else:
+                        library.return_book(reader_id, isbn)
+            except Exception as error:
+                errors.append(error)
+        
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        for isbn, book in library.books.items():
+            on_loan = sum(1 for _, loan_isbn in library.active_loans if loan_isbn == isbn)
+            assert 0 <= book.available_copies <= book.total_copies
+            assert book.available_copies + on_loan == book.total_copies
+        for reader_id, reader in library.readers.items():
+            loans = {isbn for rid, isbn in library.active_loans if rid == reader_id}
+            assert sorted(reader.borrowed_books) == sorted(loans)
+            assert len(reader.borrowed_books) <= Reader.MAX_BOOKS
+            stats = library.get_reader_stats(reader_id)
+            assert stats['total_borrowed'] - stats['total_returned'] == len(loans)
+        
+        total_borrowed = sum(reader.history.borrowed_count for reader in library.readers.values())
+        assert sum(count for _, count in library.get_popular_books(top_n=100)) == total_borrowed
+    
+    def test_concurrent_borrow_of_last_copy_succeeds_once(self, fast_thread_switching):
+        """Тест: последнюю копию получает ровно один из конкурирующих читателей"""
+        for _ in range(20):
+            library = Library("Библиотека", thread_safe=True)
+            library.add_book(Book("978-1", "Книга", "Автор", 2020, 1))
+            for i in range(8):
+                library.register_reader(Reader(f"R{i}", f"Читатель {i}", f"r{i}@example.com"))
+            
+            barrier = threading.Barrier(8)
+            results = []
+            
+            def worker(reader_id):
+                barrier.wait()
+                try:
+                    results.append(library.borrow_book(reader_id, "978-1")[0])
+                except BookNotAvailableError:
+                    results.append(False)
+            
+            threads = [threading.Thread(target=worker, args=(f"R{i}",)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            assert results.count(True) == 1
+            assert library.books["978-1"].available_copies == 0
+            assert len(library.active_loans) == 1
+    
+    def test_concurrent_first_borrows_should_intern_isbns_once(self, fast_thread_switching):
+        """Тест: первые выдачи новых книг из разных потоков дают каждому ISBN один номер"""
+        library = Library("Библиотека", thread_safe=True)
+        isbns = [f"978-{i}" for i in range(300)]
+        for isbn in isbns:
+            library.add_book(Book(isbn, "Книга", "Автор", 2020, 8))
+        for i in range(8):
+            library.register_reader(Reader(f"R{i}", f"Читатель {i}", f"r{i}@example.com"))
+        
+        barrier = threading.Barrier(8)
+        
+        def worker(reader_id):
+            barrier.wait()
+            for isbn in isbns:
+                library.borrow_book(reader_id, isbn)
+                library.return_book(reader_id, isbn)
+        
+        threads = [threading.Thread(target=worker, args=(f"R{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sorted(library._isbn_table) == sorted(isbns)
+        for reader in library.readers.values():
+            assert [isbn for isbn, action, _ in reader.history if action == 'borrowed'] == isbns
+
+
+# ============= ТЕСТЫ МАССОВОЙ ЗАГРУЗКИ И ВЫГРУЗКИ =============
+
+class TestBulkImportExport:
+    """Тесты массовой загрузки и потоковых импорта/экспорта"""
+    
+    @pytest.mark.parametrize("write, read", [
+        (write_books_csv, read_books_csv),
+        (write_books_jsonl, read_books_jsonl),
+    ])
+    def test_books_should_survive_round_trip(self, library_with_data, write, read):
+        """Тест: выгруженные книги загружаются обратно без изменений (включая книги без копий)"""
+        books = [*library_with_data.books.values(), Book("978-0", "Списанная книга", "Автор", 2000, 0)]
+        buffer = io.StringIO()
+        assert write(books, buffer) == 4
+        buffer.seek(0)
+        
+        library = Library("Копия")
+        assert library.bulk_load_books(read(buffer)) == 4
+        
+        for book in books:
+            loaded = library.books[book.isbn]
+            assert (loaded.title, loaded.author, loaded.year) == (book.title, book.author, book.year)
+            assert loaded.total_copies == loaded.available_copies == book.total_copies
+    
+    @pytest.mark.parametrize("write, read", [
+        (write_readers_csv, read_readers_csv),
+        (write_readers_jsonl, read_readers_jsonl),
+    ])
+    def test_readers_should_survive_round_trip(self, library_with_data, write, read):
+        """Тест: выгруженные читатели загружаются обратно без изменений"""
+        buffer = io.StringIO()
+        assert write(library_with_data.readers.values(), buffer) == 3
+        buffer.seek(0)
+        
+        library = Library("Копия")
+        assert library.bulk_register_readers(read(buffer)) == 3
+        
+        assert {r.reader_id: (r.name, r.email) for r in library.readers.values()} == \
+            {r.reader_id: (r.name, r.email) for r in library_with_data.readers.values()}
+        assert library.readers["R001"].borrowed_books == []
+    
+    def test_bulk_load_books_should_match_add_book(self, library_with_data):
+        """Тест: массовая загрузка эквивалентна поочередному add_book"""
+        books = [
+            Book("978-1", "Война и мир", "Лев Толстой", 1869, 2),
+            Book("978-2", "Анна Каренина", "Лев Толстой", 1877),
+            Book("978-1", "Война и мир", "Лев Толстой", 1869, 3),
+            Book("978-0-545-01022-1", "Гарри Поттер", "Дж.К. Роулинг", 2007, 1),
+        ]
+        expected = Library("Эталон")
+        for book in library_with_data.books.values():
+            expected.add_book(Book(book.isbn, book.title, book.author, book.year, book.total_copies))
+        for book in books:
+            expected.add_book(Book(book.isbn, book.title, book.author, book.year, book.total_copies))
+        
+        assert library_with_data.bulk_load_books(books) == 2
+        
+        assert list(library_with_data.books) == list(expected.books)
+        assert library_with_data.books["978-1"].total_copies == 5
+        assert library_with_data.books["978-0-545-01022-1"].available_copies == 4
+        for query in ["толстой", "ОЙ", "Р", ""]:
+            assert [b.isbn for b in library_with_data.find_books_by_author(query)] == \
+                [b.isbn for b in expected.find_books_by_author(query)]
+        assert [b.isbn for b in library_with_data.find_books_by_title("каренина")] == ["978-2"]
+    
+    def test_bulk_load_books_should_index_books_loaded_before_error(self, empty_library):
+        """Тест: книги, загруженные до ошибки в файле, доступны в поиске"""
+        data = ("isbn,title,author,year,copies\n"
+                "1,Война и мир,Лев Толстой,1869,1\n"
+                "2,Книга,Автор,999,1\n")
+        
+        with pytest.raises(ValueError, match="Строка 3"):
+            empty_library.bulk_load_books(read_books_csv(io.StringIO(data), batch_size=1))
+        
+        assert "1" in empty_library.books
+        assert [b.isbn for b in empty_library.find_books_by_author("толстой")] == ["1"]
+        assert [b.isbn for b in empty_library.find_books_by_title("мир")] == ["1"]
+    
+    def test_bulk_register_readers_should_skip_existing(self, library_with_data):
+        """Тест: уже зарегистрированные читатели пропускаются"""
+        readers = [
+            Reader("R001", "Другое имя", "other@example.com"),
+            Reader("R004", "Новый Читатель", "new@example.com"),
+        ]
+        
+        assert library_with_data.bulk_register_readers(readers) == 1
+        assert library_with_data.readers["R001"].name == "Иван Иванов"
+        assert "R004" in library_with_data.readers
+    
+    def test_bulk_register_readers_should_count_history(self, library_with_data):
+        """Тест: выдачи из истории читателей учитываются в популярности"""
+        reader = Reader("R004", "Новый Читатель", "new@example.com")
+        reader.add_borrowed_book("978-5-389-01006-7")
+        
+        library_with_data.bulk_register_readers([reader])
+        
+        popular = library_with_data.get_popular_books(top_n=1)
+        assert popular[0][0].isbn == "978-5-389-01006-7"
+        assert popular[0][1] == 1
+    
+    @pytest.mark.parametrize("row, error", [
+        ('978-2,Книга,Автор,999,1', "Строка 3: Некорректный год издания: 999"),
+        ('978-2,,Автор,2000,1', "Строка 3: ISBN, название и автор обязательны"),
+        ('978-2,Книга,Автор,2000,-1', "Строка 3: Количество копий не может быть отрицательным"),
+        ('978-2,Книга,Автор,год,1', "Строка 3: invalid literal"),
+    ])
+    def test_read_books_csv_should_report_line_number(self, row, error):
+        """Тест: ошибка в строке CSV сообщает номер строки"""
+        data = "isbn,title,author,year,copies\n978-1,Книга,Автор,2000,1\n" + row + "\n"
+        
+        with pytest.raises(ValueError, match=error):
+            list(read_books_csv(io.StringIO(data)))
+    
+    def test_read_books_csv_should_default_copies_to_one(self):
+        """Тест: без столбца copies книга получает одну копию"""
+        books = list(read_books_csv(io.StringIO("isbn,title,author,year\n978-1,Книга,Автор,2000\n")))
+        
+        assert books[0].total_copies == books[0].available_copies == 1
+    
+    def test_read_books_jsonl_should_report_missing_field_and_bad_json(self):
+        """Тест: отсутствующее поле и битый JSON сообщают номер строки"""
+        with pytest.raises(ValueError, match="Строка 2: отсутствует поле 'author'"):
+            list(read_books_jsonl(io.StringIO('{"isbn": "1", "title": "Книга", "author": "А", "year": 2000}\n'
+                                              '{"isbn": "2", "title": "Книга", "year": 2000}\n')))
+        with pytest.raises(ValueError, match="Строка 3: некорректный JSON"):
+            list(read_books_jsonl(io.StringIO('{"isbn": "1", "title": "Книга", "author": "А", "year": 2000}\n'
+                                              '\n{"isbn": \n')))
+    
+    def test_read_readers_should_validate_email(self):
+        """Тест: некорректный email отклоняется с номером строки"""
+        with pytest.raises(ValueError, match="Строка 2: Некорректный email"):
+            list(read_readers_jsonl(io.StringIO('{"reader_id": "R1", "name": "Имя", "email": "a@b"}\n'
+                                                '{"reader_id": "R2", "name": "Имя", "email": "no-at"}\n')))
+    
+    def test_readers_should_stream_lazily(self):
+        """Тест: чтение идет пачками, а не материализует весь файл"""
+        data = "reader_id,name,email\n" + "".join(f"R{i},Имя {i},r{i}@example.com\n" for i in range(10))
+        buffer = io.StringIO(data)
+        
+        readers = read_readers_csv(buffer, batch_size=2)
+        first = next(readers)
+        
+        assert first.reader_id == "R0"
+        assert buffer.tell() < len(data)
+
+
 # ============= ТЕСТЫ ВСПОМОГАТЕЛЬНЫХ ФУНКЦИЙ =============
 
 class TestHelperFunctions: